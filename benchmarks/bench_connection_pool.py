@@ -0,0 +1,130 @@
+"""
+Connection Pool Benchmark
+Compares per-call latency of the old connect-per-call pattern
+(connect, schema probes and migration attempts, query, close) with the
+pooled per-thread connection.
+
+Run: python -m benchmarks.bench_connection_pool [--calls 2000]
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from database import db
+
+QUERY = "SELECT id, name, category, price, is_available FROM menu_items WHERE is_available = 1 ORDER BY category, name"
+
+
+# Column migrations the pre-pool initializer attempted on every connection
+LEGACY_COLUMN_MIGRATIONS = [
+    "ALTER TABLE orders ADD COLUMN discount_percentage REAL DEFAULT 0",
+    "ALTER TABLE orders ADD COLUMN customer_address TEXT",
+    "ALTER TABLE orders ADD COLUMN order_note TEXT",
+    "ALTER TABLE orders ADD COLUMN amount_received REAL",
+    "ALTER TABLE orders ADD COLUMN balance_return REAL",
+    "ALTER TABLE menu_items ADD COLUMN is_deal INTEGER DEFAULT 0",
+    "ALTER TABLE deal_items ADD COLUMN item_name TEXT",
+]
+
+LEGACY_DEAL_ITEMS_TABLE = """
+    CREATE TABLE deal_items_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        deal_id INTEGER NOT NULL,
+        menu_item_id INTEGER,
+        item_name TEXT,
+        quantity INTEGER DEFAULT 1,
+        FOREIGN KEY (deal_id) REFERENCES menu_items(id) ON DELETE CASCADE,
+        FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
+    )
+"""
+
+
+def legacy_initialize(conn):
+    """
+    The schema work the pre-pool get_connection() did on every call against an
+    existing database: table probes, the menu seed check, one ALTER attempt
+    per column migration and the deal_items rebuild. db._initialize_db now
+    runs once per process, so it cannot stand in for this cost.
+    """
+    table_exists = "SELECT name FROM sqlite_master WHERE type='table' AND name=?"
+    conn.execute(table_exists, ("users",)).fetchone()
+    existing = {row[0] for row in conn.execute("SELECT name FROM menu_items")}
+    missing = [item for item in db.MENU_ITEMS if item[0] not in existing]
+    if missing:
+        conn.executemany("INSERT INTO menu_items (name, category, price, is_available) VALUES (?, ?, ?, 1)", missing)
+        conn.commit()
+    conn.execute(table_exists, ("deal_items",)).fetchone()
+    for statement in LEGACY_COLUMN_MIGRATIONS:
+        try:
+            conn.execute(statement)
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass  # column already exists
+    conn.execute("PRAGMA table_info(deal_items)").fetchall()
+    if conn.execute(table_exists, ("deal_items_new",)).fetchone() is None:
+        conn.execute(LEGACY_DEAL_ITEMS_TABLE)
+        conn.execute(
+            "INSERT INTO deal_items_new (id, deal_id, menu_item_id, item_name, quantity) "
+            "SELECT id, deal_id, menu_item_id, item_name, quantity FROM deal_items"
+        )
+        conn.execute("DROP TABLE deal_items")
+        conn.execute("ALTER TABLE deal_items_new RENAME TO deal_items")
+        conn.commit()
+
+
+def connect_per_call(calls):
+    """The pre-pool pattern: every slot call opens, initializes and closes a connection"""
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        conn = sqlite3.connect(str(db.DB_PATH))
+        conn.row_factory = sqlite3.Row
+        legacy_initialize(conn)
+        conn.execute(QUERY).fetchall()
+        conn.close()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def pooled(calls):
+    """The pooled pattern used by the backends"""
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        with db.connection() as conn:
+            conn.execute(QUERY).fetchall()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(label, timings):
+    timings = sorted(timings)
+    mean = sum(timings) / len(timings)
+    p50 = timings[len(timings) // 2]
+    p95 = timings[int(len(timings) * 0.95)]
+    print(f"{label:<20} mean {mean * 1e6:9.1f} us   p50 {p50 * 1e6:9.1f} us   p95 {p95 * 1e6:9.1f} us")
+    return mean
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.set_database_path(Path(tmp) / "bench.db")
+        # Create schema and seed menu once so both runs measure the steady state
+        db.get_connection()
+
+        print(f"Per-call latency over {args.calls} calls")
+        before = summarize("connect-per-call", connect_per_call(args.calls))
+        after = summarize("pooled", pooled(args.calls))
+        print(f"Speedup: {before / after:.1f}x")
+
+        db.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Database Profile Benchmark
+Measures order commit throughput and reader/writer concurrency for the
+"safe" and "fast" PRAGMA profiles, against the legacy rollback journal.
+
+Run: python -m benchmarks.bench_db_profiles [--orders 500] [--seconds 3]
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from database import db
+
+# Pre-WAL behaviour (SQLite defaults), for comparison only
+LEGACY_PROFILE = {"busy_timeout": 5000, "journal_mode": "DELETE", "synchronous": "FULL"}
+
+REPORT_SQL = """
+    SELECT order_type, date(created_at) AS day, COUNT(*) AS count, SUM(total) AS revenue
+    FROM orders
+    GROUP BY order_type, day
+"""
+
+
+def place_order(conn, created_at):
+    """One order with three line items, committed as one transaction"""
+    cursor = conn.execute(
+        "INSERT INTO orders (order_type, total, created_at) VALUES (?, ?, ?)",
+        ("Takeaway", 1200, created_at),
+    )
+    order_id = cursor.lastrowid
+    conn.executemany(
+        "INSERT INTO order_items (order_id, menu_item_id, quantity, price) VALUES (?, ?, ?, ?)",
+        [(order_id, item_id, 1, 400) for item_id in (1, 2, 3)],
+    )
+
+
+def preload_history(orders):
+    """Bulk-inserts historical orders so the report query has real work to do"""
+    start = datetime.now() - timedelta(days=365)
+    rows = [
+        (
+            random.choice(("Table", "Takeaway", "Delivery")),
+            random.randint(300, 5000),
+            (start + timedelta(minutes=random.randint(0, 365 * 24 * 60))).isoformat(),
+        )
+        for _ in range(orders)
+    ]
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO orders (order_type, total, created_at) VALUES (?, ?, ?)", rows
+        )
+
+
+def commit_throughput(orders):
+    start = time.perf_counter()
+    for _ in range(orders):
+        with db.connection() as conn:
+            place_order(conn, datetime.now().isoformat())
+    return orders / (time.perf_counter() - start)
+
+
+def concurrency(seconds):
+    """A cashier thread commits orders while a finance thread runs reports"""
+    stop = threading.Event()
+    write_latencies = []
+    reports = [0]
+
+    def writer():
+        while not stop.is_set():
+            start = time.perf_counter()
+            with db.connection() as conn:
+                place_order(conn, datetime.now().isoformat())
+            write_latencies.append(time.perf_counter() - start)
+
+    def reader():
+        while not stop.is_set():
+            with db.connection() as conn:
+                conn.execute(REPORT_SQL).fetchall()
+            reports[0] += 1
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    write_latencies.sort()
+    return {
+        "writes_per_sec": len(write_latencies) / seconds,
+        "write_p99_ms": write_latencies[int(len(write_latencies) * 0.99)] * 1000 if write_latencies else 0,
+        "write_max_ms": write_latencies[-1] * 1000 if write_latencies else 0,
+        "reports_per_sec": reports[0] / seconds,
+    }
+
+
+def run_profile(name, tmp, args):
+    db.set_performance_profile(name)
+    db.set_database_path(Path(tmp) / f"{name}.db")
+    preload_history(args.history)
+    throughput = commit_throughput(args.orders)
+    result = concurrency(args.seconds)
+    db.close_connections()
+    print(
+        f"{name:<8} {throughput:10.0f} orders/s   "
+        f"concurrent: {result['writes_per_sec']:8.0f} writes/s "
+        f"(p99 {result['write_p99_ms']:7.2f} ms, max {result['write_max_ms']:7.2f} ms)   "
+        f"{result['reports_per_sec']:6.1f} reports/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=500, help="orders committed for the throughput run")
+    parser.add_argument("--history", type=int, default=50000, help="historical orders preloaded")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration of the concurrency run")
+    args = parser.parse_args()
+
+    db.PERFORMANCE_PROFILES["legacy"] = LEGACY_PROFILE
+    original = db.PERFORMANCE_PROFILE
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("legacy", "safe", "fast"):
+                run_profile(name, tmp, args)
+    finally:
+        db.set_performance_profile(original)
+        del db.PERFORMANCE_PROFILES["legacy"]
+
+
+if __name__ == "__main__":
+    main()
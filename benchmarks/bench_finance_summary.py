@@ -0,0 +1,162 @@
+"""
+Finance Summary Benchmark
+Compares the finance page's former ten date-range queries (six KPIs and four
+chart series, one bridge call each) with the single FinanceBackend.summary
+call (read from the sales rollups), over a year of synthetic orders.
+Results are checked for equality.
+
+Run: python -m benchmarks.bench_finance_summary [--orders-per-day 200] [--repeat 20]
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from database import db
+from database.reports import apply_date_filter, finance_summary
+
+# The queries finance.js ran before the summary slot existed
+LEGACY_QUERIES = {
+    "total_orders": "SELECT COUNT(*) as count FROM orders WHERE 1=1 {date_filter}",
+    "total_revenue": "SELECT COALESCE(SUM(total), 0) as revenue FROM orders WHERE 1=1 {date_filter}",
+    "completed_orders": "SELECT COUNT(*) as count FROM orders WHERE order_status = 'completed' {date_filter}",
+    "pending_orders": "SELECT COUNT(*) as count FROM orders WHERE (order_status = 'pending' OR order_status IS NULL) {date_filter}",
+    "avg_order_value": "SELECT COALESCE(AVG(total), 0) as avg_value FROM orders WHERE 1=1 {date_filter}",
+    "total_payments": """
+        SELECT COALESCE(SUM(pt.amount), 0) as total_payments
+        FROM payment_transactions pt
+        JOIN orders o ON pt.order_id = o.id
+        WHERE 1=1 {date_filter:o}""",
+    "revenue_by_type": """
+        SELECT order_type, COALESCE(SUM(total), 0) as revenue
+        FROM orders WHERE 1=1 {date_filter} GROUP BY order_type""",
+    "orders_by_status": """
+        SELECT
+            CASE
+                WHEN order_status = 'completed' THEN 'Completed'
+                WHEN order_status = 'cancelled' THEN 'Cancelled'
+                ELSE 'Pending'
+            END as status,
+            COUNT(*) as count
+        FROM orders WHERE 1=1 {date_filter}
+        GROUP BY status""",
+    "daily_revenue": """
+        SELECT order_date as date, COALESCE(SUM(total), 0) as revenue
+        FROM orders WHERE 1=1 {date_filter}
+        GROUP BY order_date ORDER BY order_date""",
+    "daily_orders": """
+        SELECT order_date as date, COUNT(*) as count
+        FROM orders WHERE 1=1 {date_filter}
+        GROUP BY order_date ORDER BY order_date""",
+}
+
+STATUSES = ["completed"] * 7 + ["pending", None, "cancelled"]
+
+
+def generate_year(orders_per_day):
+    """Inserts a year of orders (with a payment for each completed one)"""
+    start = datetime.combine(date.today() - timedelta(days=365), datetime.min.time())
+    orders = []
+    for day in range(365):
+        for _ in range(orders_per_day):
+            created_at = start + timedelta(days=day, seconds=random.randint(0, 86399))
+            orders.append((
+                random.choice(("Table", "Takeaway", "Delivery")),
+                round(random.uniform(300, 5000), 2),
+                random.choice(STATUSES),
+                created_at.isoformat(),
+            ))
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO orders (order_type, total, order_status, created_at) VALUES (?, ?, ?, ?)",
+            orders,
+        )
+        conn.execute("""
+            INSERT INTO payment_transactions (order_id, amount, payment_method, payment_status, created_at)
+            SELECT id, total, 'cash', 'completed', created_at FROM orders WHERE order_status = 'completed'
+        """)
+    return len(orders)
+
+
+def legacy_summary(date_from, date_to):
+    """Ten queries, each on its own bridge call, folded into the summary shape"""
+    rows = {}
+    for key, sql in LEGACY_QUERIES.items():
+        query, params = apply_date_filter(sql, date_from, date_to)
+        with db.connection() as conn:
+            cursor = conn.execute(query, params)
+            columns = [d[0] for d in cursor.description]
+            rows[key] = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    revenue_by_day = {row["date"]: row["revenue"] for row in rows["daily_revenue"]}
+    return {
+        "total_orders": rows["total_orders"][0]["count"],
+        "total_revenue": rows["total_revenue"][0]["revenue"],
+        "completed_orders": rows["completed_orders"][0]["count"],
+        "pending_orders": rows["pending_orders"][0]["count"],
+        "avg_order_value": rows["avg_order_value"][0]["avg_value"],
+        "total_payments": rows["total_payments"][0]["total_payments"],
+        "revenue_by_type": rows["revenue_by_type"],
+        "orders_by_status": rows["orders_by_status"],
+        "daily": [
+            {"date": row["date"], "count": row["count"], "revenue": revenue_by_day[row["date"]]}
+            for row in rows["daily_orders"]
+        ],
+    }
+
+
+def single_pass_summary(date_from, date_to):
+    with db.connection() as conn:
+        return finance_summary(conn, date_from, date_to)
+
+
+def same(a, b):
+    """Structural equality, tolerant of float summation order"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return abs(a - b) <= 1e-6 * max(1.0, abs(a), abs(b))
+    return a == b
+
+
+def timed(func, date_from, date_to, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(date_from, date_to)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders-per-day", type=int, default=200, help="synthetic orders per day")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per range")
+    args = parser.parse_args()
+
+    today = date.today()
+    ranges = [
+        ("last 7 days", (today - timedelta(days=7)).isoformat(), today.isoformat()),
+        ("this month", today.replace(day=1).isoformat(), today.isoformat()),
+        ("last 365 days", (today - timedelta(days=365)).isoformat(), today.isoformat()),
+        ("all time", None, None),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.set_database_path(Path(tmp) / "finance.db")
+        total = generate_year(args.orders_per_day)
+        print(f"{total} synthetic orders over 365 days\n")
+        print(f"{'range':<15} {'10 queries':>12} {'summary':>12} {'speedup':>9}  match")
+        for label, date_from, date_to in ranges:
+            if not same(legacy_summary(date_from, date_to), single_pass_summary(date_from, date_to)):
+                raise SystemExit(f"summary mismatch for {label}")
+            legacy_ms = timed(legacy_summary, date_from, date_to, args.repeat)
+            summary_ms = timed(single_pass_summary, date_from, date_to, args.repeat)
+            print(f"{label:<15} {legacy_ms:9.2f} ms {summary_ms:9.2f} ms {legacy_ms / summary_ms:8.1f}x  yes")
+        db.close_connections()
+
+
+if __name__ == "__main__":
+    main()
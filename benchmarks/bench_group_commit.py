@@ -0,0 +1,114 @@
+"""
+Group Commit Load Test
+Several cashier threads place orders as fast as they can, each order either
+committed on its own (orders.place_order on the thread's connection) or
+handed to the group-commit writer (orders.write_order). Reports orders/s,
+per-order latency and the average number of orders per commit, for the
+"safe" (fsync per commit) and "fast" profiles.
+
+Run: python -m benchmarks.bench_group_commit [--cashiers 8] [--orders 200]
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from database import db, orders
+from database.group_commit import GroupCommitWriter
+
+ORDER = {
+    "order_type": "Takeaway",
+    "customer_name": "Load test",
+    "items": [
+        {"menu_item_id": 1, "quantity": 2, "price": 400},
+        {"menu_item_id": 2, "quantity": 1, "price": 650},
+        {"menu_item_id": 3, "quantity": 1, "price": 280},
+    ],
+}
+
+
+def run_cashiers(cashiers, per_cashier, place):
+    latencies = []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(cashiers + 1)
+
+    def cashier():
+        mine = []
+        start_gate.wait()
+        for _ in range(per_cashier):
+            start = time.perf_counter()
+            place()
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=cashier) for _ in range(cashiers)]
+    for t in threads:
+        t.start()
+    start_gate.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "orders_per_sec": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def direct_commit():
+    with db.connection() as conn:
+        orders.place_order(conn, ORDER)
+
+
+def order_count():
+    with db.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+
+def run_profile(name, tmp, args):
+    db.set_performance_profile(name)
+    expected = args.cashiers * args.orders
+
+    db.set_database_path(Path(tmp) / f"{name}_direct.db")
+    direct = run_cashiers(args.cashiers, args.orders, direct_commit)
+    assert order_count() == expected
+
+    db.set_database_path(Path(tmp) / f"{name}_group.db")
+    writer = GroupCommitWriter(window=args.window / 1000)
+    grouped = run_cashiers(args.cashiers, args.orders, lambda: writer.call(orders.write_order, ORDER))
+    writer.stop()
+    assert order_count() == expected
+    db.close_connections()
+
+    print(
+        f"{name:<5} direct {direct['orders_per_sec']:8.0f} orders/s "
+        f"(p50 {direct['p50_ms']:6.2f} ms, p99 {direct['p99_ms']:7.2f} ms)   "
+        f"group {grouped['orders_per_sec']:8.0f} orders/s "
+        f"(p50 {grouped['p50_ms']:6.2f} ms, p99 {grouped['p99_ms']:7.2f} ms, "
+        f"{writer.requests / writer.batches:5.1f} orders/commit)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cashiers", type=int, default=8, help="concurrent order-placing threads")
+    parser.add_argument("--orders", type=int, default=200, help="orders placed by each cashier")
+    parser.add_argument("--window", type=float, default=0.0, help="group-commit window in ms")
+    args = parser.parse_args()
+
+    original = db.PERFORMANCE_PROFILE
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("safe", "fast"):
+                run_profile(name, tmp, args)
+    finally:
+        db.set_performance_profile(original)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Logo Raster Benchmark
+Compares the former per-pixel GS v 0 conversion in PrinterBackend with the
+bulk-operation conversion in utils.escpos, cold and from its caches, and
+checks that the threshold mode produces byte-identical output.
+
+Run: python -m benchmarks.bench_logo_raster [--logo assets/receipt_logo.png] [--repeat 10]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from utils import escpos
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LOGO_WIDTH = 576
+
+
+def legacy_image_to_escpos(image_path, target_width=LOGO_WIDTH):
+    """The conversion PrinterBackend used before the cache (for comparison only)"""
+    img = Image.open(image_path)
+    if img.mode == "RGBA":
+        bg = Image.new("RGB", img.size, (255, 255, 255))
+        bg.paste(img, mask=img.split()[3])
+        img = bg
+    img = img.convert("L")
+    w, h = img.size
+    new_h = int(h * target_width / w)
+    img = img.resize((target_width, new_h), Image.Resampling.LANCZOS)
+    img = img.point(lambda p: 0 if p < 128 else 255, mode="1")
+
+    width, height = img.size
+    bytes_per_row = (width + 7) // 8
+    escpos_data = bytearray(b"\x1D\x76\x30\x00")
+    escpos_data.extend(bytes([bytes_per_row & 0xFF, (bytes_per_row >> 8) & 0xFF,
+                              height & 0xFF, (height >> 8) & 0xFF]))
+    pixels = img.load()
+    for y in range(height):
+        for x in range(0, width, 8):
+            byte = 0
+            for b in range(8):
+                if x + b < width and pixels[x + b, y] == 0:
+                    byte |= (1 << (7 - b))
+            escpos_data.append(byte)
+    return bytes(escpos_data)
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logo", default=str(BASE_DIR / "assets" / "receipt_logo.png"))
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    legacy = legacy_image_to_escpos(args.logo)
+    fresh = escpos.render_logo_raster(args.logo, LOGO_WIDTH)
+    if legacy != fresh:
+        raise SystemExit("threshold raster differs from the legacy conversion")
+    print(f"{args.logo}: {len(legacy)} raster bytes, output identical\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def disk_hit():
+            escpos.clear_logo_cache()
+            escpos.logo_raster(args.logo, LOGO_WIDTH, cache_dir=tmp)
+
+        escpos.logo_raster(args.logo, LOGO_WIDTH, cache_dir=tmp)  # populate both caches
+        results = [
+            ("legacy per-pixel loop", timed(lambda: legacy_image_to_escpos(args.logo), args.repeat)),
+            ("bulk, threshold", timed(lambda: escpos.render_logo_raster(args.logo, LOGO_WIDTH), args.repeat)),
+            ("bulk, Floyd-Steinberg", timed(
+                lambda: escpos.render_logo_raster(args.logo, LOGO_WIDTH, dither=True), args.repeat)),
+            ("disk cache hit", timed(disk_hit, args.repeat)),
+            ("memory cache hit", timed(
+                lambda: escpos.logo_raster(args.logo, LOGO_WIDTH, cache_dir=tmp), args.repeat * 100)),
+        ]
+
+    baseline = results[0][1]
+    for label, ms in results:
+        print(f"{label:<24} {ms:10.3f} ms   {baseline / ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
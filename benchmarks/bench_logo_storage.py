@@ -0,0 +1,66 @@
+"""
+Logo Storage Benchmark
+Counts the bytes each receipt sends to a fake printer sink when the logo is
+streamed as a raster every time versus stored once in the printer's download
+or NV graphics memory and recalled by key.
+
+Run: python -m benchmarks.bench_logo_storage [--receipts 100]
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from utils import escpos
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LOGO_WIDTH = 576
+
+SAMPLE_RECEIPT = "\n".join(
+    ["CraveHub Cafe", "Order #1234   Takeaway", "-" * 48]
+    + [f"{qty} x Item {n:<30} Rs. {qty * 450:>8.2f}" for n, qty in enumerate((1, 2, 1, 3, 1), 1)]
+    + ["-" * 48, f"{'Total':<36} Rs. {3600:>8.2f}", "", "Thank you for your business!"]
+)
+
+# Typical thermal printer links, bytes per second
+LINKS = [("serial 19200", 19200 / 10), ("serial 115200", 115200 / 10), ("USB full speed", 1_000_000)]
+
+
+class FakePrinter:
+    """Collects the bytes of each job instead of sending them to a device"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def write_job(self, data):
+        self.jobs.append(len(data))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logo", default=str(BASE_DIR / "assets" / "receipt_logo.png"))
+    parser.add_argument("--receipts", type=int, default=100)
+    args = parser.parse_args()
+
+    raster = escpos.logo_raster(args.logo, LOGO_WIDTH, cache_dir=None)
+    print(f"logo raster {len(raster)} bytes, receipt text {len(SAMPLE_RECEIPT)} chars, "
+          f"{args.receipts} receipts\n")
+    print(f"{'mode':<10} {'first':>9} {'each after':>11} {'total':>11}   "
+          + "   ".join(f"{name} /receipt" for name, _ in LINKS))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in escpos.LOGO_STORAGE_MODES:
+            store = escpos.LogoStore(mode, state_file=Path(tmp) / f"{mode}.json")
+            printer = FakePrinter()
+            for _ in range(args.receipts):
+                logo = store.logo_commands("Receipt Printer", raster)
+                printer.write_job(escpos.receipt_bytes(SAMPLE_RECEIPT, logo))
+
+            steady = printer.jobs[-1]
+            times = "   ".join(
+                f"{steady / rate * 1000:>{len(name) + 6}.1f} ms" for name, rate in LINKS
+            )
+            print(f"{mode:<10} {printer.jobs[0]:>9} {steady:>11} {sum(printer.jobs):>11}   {times}")
+
+
+if __name__ == "__main__":
+    main()
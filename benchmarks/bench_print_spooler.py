@@ -0,0 +1,91 @@
+"""
+Print Spooler Throughput Test
+Pushes receipt jobs through the background PrintSpooler to a local fake
+network printer (raw TCP) and checks every byte arrived in order. Also
+shows that submitting stays non-blocking when the printer is offline, with
+failed jobs reported after their retries.
+
+Run: python -m benchmarks.bench_print_spooler [--jobs 500]
+"""
+import argparse
+import socket
+import time
+
+from benchmarks.fake_printer import FakeNetworkPrinter
+from utils import escpos
+from utils.print_spooler import DONE, FAILED, PrintSpooler
+from utils.printer_transports import transport_from_uri
+
+
+def receipt(n):
+    lines = [f"Order #{n}", "-" * 48] + [f"{q} x Item {i:<30} Rs. {q * 450:>8.2f}" for i, q in enumerate((1, 2, 3), 1)]
+    return escpos.receipt_bytes("\n".join(lines))
+
+
+class StatusLog:
+    def __init__(self):
+        self.final = {}
+
+    def __call__(self, job_id, status, error):
+        if status in (DONE, FAILED):
+            self.final[job_id] = status
+
+
+def throughput(jobs):
+    printer = FakeNetworkPrinter()
+    log = StatusLog()
+    spooler = PrintSpooler(transport_from_uri(printer.uri), maxsize=jobs, on_status=log)
+    payloads = [receipt(n) for n in range(jobs)]
+
+    submit_times = []
+    start = time.perf_counter()
+    for data in payloads:
+        t = time.perf_counter()
+        spooler.submit(data)
+        submit_times.append(time.perf_counter() - t)
+    spooler.join()
+    elapsed = time.perf_counter() - start
+
+    expected = b"".join(payloads)
+    ok = printer.wait_for(len(expected)) and printer.received == expected
+    spooler.stop()
+    printer.close()
+
+    done = sum(1 for s in log.final.values() if s == DONE)
+    print(f"{jobs} jobs, {len(expected)} bytes: {jobs / elapsed:8.0f} jobs/s, "
+          f"max submit {max(submit_times) * 1000:.3f} ms, {done} done, bytes intact: {'yes' if ok else 'NO'}")
+    return ok and done == jobs
+
+
+def offline(jobs):
+    # A port with nothing listening
+    probe = socket.create_server(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    log = StatusLog()
+    spooler = PrintSpooler(transport_from_uri(f"tcp://127.0.0.1:{port}"), retries=2, backoff=0.01, on_status=log)
+    start = time.perf_counter()
+    for n in range(jobs):
+        spooler.submit(receipt(n))
+    submit_ms = (time.perf_counter() - start) * 1000
+    spooler.join()
+    spooler.stop()
+
+    failed = sum(1 for s in log.final.values() if s == FAILED)
+    print(f"offline printer: {jobs} jobs submitted in {submit_ms:.2f} ms, {failed} failed after retries")
+    return failed == jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=500)
+    args = parser.parse_args()
+
+    ok = throughput(args.jobs)
+    ok = offline(10) and ok
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
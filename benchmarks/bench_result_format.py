@@ -0,0 +1,104 @@
+"""
+Result Format Benchmark
+Compares the JSON layouts of database.result_format on a finance-style
+orders table: payload size, encode time (query + serialization, what a
+DatabaseBackend slot spends) and decode time. Decoding is timed with
+Python's json.loads and, when node is on PATH, with JSON.parse in
+JavaScript, as the pages receive it.
+
+Run: python -m benchmarks.bench_result_format [--orders 20000] [--repeat 20]
+"""
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.check_export_memory import generate
+from database import db
+from database.result_format import LAYOUTS, encode_result
+
+QUERY = """
+    SELECT id, order_type, customer_name, table_number, total, created_at, order_status, payment_status
+    FROM orders ORDER BY created_at DESC
+"""
+
+# Times JSON.parse for each payload file given on the command line; prints ms per file
+NODE_DECODE = """
+const fs = require("fs");
+const repeat = Number(process.argv[1]);
+for (const path of process.argv.slice(2)) {
+    const text = fs.readFileSync(path, "utf8");
+    const times = [];
+    for (let i = 0; i < repeat; i++) {
+        const start = process.hrtime.bigint();
+        JSON.parse(text);
+        times.push(Number(process.hrtime.bigint() - start) / 1e6);
+    }
+    times.sort((a, b) => a - b);
+    console.log(times[Math.floor(times.length / 2)]);
+}
+"""
+
+
+def median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def node_decode_ms(paths, repeat):
+    node = shutil.which("node")
+    if node is None:
+        return None
+    output = subprocess.run(
+        [node, "-e", NODE_DECODE, str(repeat), *map(str, paths)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return [float(line) for line in output.split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=20_000, help="rows in the result")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per measurement (median)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "formats.db"
+        generate(path, args.orders)
+        db.set_database_path(path)
+
+        results = []
+        with db.connection() as conn:
+            for layout in LAYOUTS:
+                text = encode_result(conn.execute(QUERY), layout)
+                encode = median_ms(lambda: encode_result(conn.execute(QUERY), layout), args.repeat)
+                decode = median_ms(lambda: json.loads(text), args.repeat)
+                payload = Path(tmp) / f"{layout}.json"
+                payload.write_text(text, encoding="utf-8")
+                results.append((layout, len(text.encode("utf-8")), encode, decode, payload))
+        db.close_connections()
+
+        js = node_decode_ms([r[4] for r in results], args.repeat)
+
+    base_size = results[0][1]
+    print(f"{args.orders:,} rows")
+    for i, (layout, size, encode, decode, _) in enumerate(results):
+        js_text = "" if js is None else f", JS parse {js[i]:6.2f} ms"
+        print(
+            f"{layout:<8} {size / 1024:8.0f} KiB ({size / base_size:4.0%})  "
+            f"encode {encode:6.2f} ms, Python decode {decode:6.2f} ms{js_text}"
+        )
+    if js is None:
+        print("(node not found: JavaScript decode not measured)")
+
+
+if __name__ == "__main__":
+    main()
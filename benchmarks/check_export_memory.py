@@ -0,0 +1,145 @@
+"""
+Export Memory Check
+Fills a scratch database with a few million synthetic rows (orders, two
+items each and a payment each), streams a full export to CSV and JSONL and
+fails (exit status 1) if the export's memory passes the ceiling. Memory is
+the growth of the process's peak RSS during the export, so it includes
+SQLite's page cache and any sorter as well as Python objects (tracemalloc
+peak on Windows, which has no getrusage). The export runs in a fresh
+process, so generating the data does not count.
+
+Runs under the "safe" profile by default: under "fast", up to mmap_size
+(256 MB) of the database file is mapped and shows up in RSS as file cache.
+
+Run: python -m benchmarks.check_export_memory [--orders 500000] [--ceiling-mb 32]
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: tracemalloc only
+    resource = None
+
+from database import db, export
+
+ITEMS_PER_ORDER = 2
+ORDER_TYPES = ("Table", "Takeaway", "Delivery")
+START = 1767225600  # 2026-01-01T00:00:00Z
+
+
+def _timestamp(n):
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(START + n * 7))
+
+
+def generate(path, order_count):
+    """Bulk-loads order_count orders with their items and payments"""
+    db.set_database_path(path)
+    with db.connection() as conn:
+        menu_ids = [row[0] for row in conn.execute("SELECT id FROM menu_items LIMIT 20")]
+        if not menu_ids:
+            conn.executemany(
+                "INSERT INTO menu_items (name, category, price) VALUES (?, 'Synthetic', ?)",
+                ((f"Item {i}", 100 + i * 10) for i in range(20)),
+            )
+            menu_ids = [row[0] for row in conn.execute("SELECT id FROM menu_items")]
+
+        conn.executemany(
+            "INSERT INTO orders (id, order_type, customer_name, total, order_status, payment_status, created_at) "
+            "VALUES (?, ?, ?, ?, 'completed', 'paid', ?)",
+            ((n, ORDER_TYPES[n % 3], f"Customer {n}", 500 + n % 700, _timestamp(n))
+             for n in range(1, order_count + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO order_items (order_id, menu_item_id, quantity, price) VALUES (?, ?, ?, ?)",
+            ((n, menu_ids[(n + i) % len(menu_ids)], 1 + i, 250)
+             for n in range(1, order_count + 1) for i in range(ITEMS_PER_ORDER)),
+        )
+        conn.executemany(
+            "INSERT INTO payment_transactions (order_id, amount, payment_method, payment_status, created_at) "
+            "VALUES (?, ?, 'cash', 'paid', ?)",
+            ((n, 500 + n % 700, _timestamp(n)) for n in range(1, order_count + 1)),
+        )
+    db.close_connections()
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+def _measure_export(path, profile, out_dir, fmt, batch_size, results):
+    """Child process: one full export, with its memory high-water mark"""
+    db.set_performance_profile(profile)
+    db.set_database_path(path)
+    with db.connection() as conn:
+        conn.execute("SELECT COUNT(*) FROM menu_items").fetchone()  # open and migrate first
+        before = _peak_rss_bytes()
+        if before is None:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = export.export_orders(conn, out_dir, fmt, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        if before is None:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            peak = _peak_rss_bytes() - before
+    db.close_connections()
+    results.put({"rows": result["rows"], "seconds": elapsed, "peak": peak})
+
+
+def measure_export(path, profile, out_dir, fmt, batch_size):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    child = context.Process(target=_measure_export, args=(path, profile, out_dir, fmt, batch_size, results))
+    child.start()
+    outcome = results.get()
+    child.join()
+    return outcome
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=500_000, help="synthetic orders to generate")
+    parser.add_argument("--batch-size", type=int, default=export.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--ceiling-mb", type=float, default=32, help="allowed peak memory growth")
+    parser.add_argument("--profile", default="safe", choices=sorted(db.PERFORMANCE_PROFILES))
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "export.db"
+        start = time.perf_counter()
+        generate(path, args.orders)
+        total_rows = args.orders * (2 + ITEMS_PER_ORDER)
+        print(f"generated {total_rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+        measure = "traced" if resource is None else "RSS growth"
+        for fmt in export.EXPORT_FORMATS:
+            out_dir = Path(tmp) / fmt
+            outcome = measure_export(path, args.profile, out_dir, fmt, args.batch_size)
+            rows = sum(outcome["rows"].values())
+            peak_mb = outcome["peak"] / 2**20
+            size_mb = sum(f.stat().st_size for f in out_dir.iterdir()) / 2**20
+
+            ok = rows == total_rows and peak_mb <= args.ceiling_mb
+            failed = failed or not ok
+            print(
+                f"{'ok' if ok else 'FAIL':<10} {fmt:<5} {rows:,} rows, {size_mb:7.1f} MB written "
+                f"in {outcome['seconds']:5.1f}s; peak {measure} {peak_mb:5.1f} MB"
+            )
+
+    print(f"\n{args.profile} profile, ceiling {args.ceiling_mb:g} MB")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Query Plan Check
+Runs EXPLAIN QUERY PLAN for every query the frontend ships and fails
+(exit status 1) if any of them falls back to a full table scan of
+orders or order_items. Scanning a covering index is accepted.
+
+Covered automatically: every SQL string literal in frontend/js (pages
+sending raw SQL), every query registered in database/queries.py, and the
+statements the backends compose (BACKEND_QUERIES; keep it in sync when a
+backend adds a query). tests/test_query_plans.py runs the same check
+under pytest.
+
+Run: python -m benchmarks.check_query_plans
+"""
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+from database import db
+from database import orders, queries, reports
+from database.reports import apply_date_filter
+
+FRONTEND_JS_DIR = Path(__file__).resolve().parent.parent / "frontend" / "js"
+
+WATCHED_TABLES = {"orders", "order_items"}
+
+
+def ranged(sql, date_from="2026-01-01", date_to="2026-01-31"):
+    """Expands {date_filter} the way DatabaseBackend.execute_date_range does"""
+    return apply_date_filter(sql, date_from, date_to)
+
+
+def order_page(filters, cursor=None):
+    """One OrderBackend.list_orders page query, as the order lists request it"""
+    sql, params, _ = orders.list_orders_query(filters, cursor, orders.DEFAULT_PAGE_SIZE)
+    return sql, params
+
+
+NEXT_PAGE = orders.encode_cursor("2026-01-15T12:00:00", 500, "next")
+PREV_PAGE = orders.encode_cursor("2026-01-15T12:00:00", 500, "prev")
+
+
+# Statements composed by the backends: (origin, sql, params)
+BACKEND_QUERIES = [
+    # FinanceBackend.summary (finance KPIs and charts)
+    ("finance: summary buckets", *ranged(reports.FINANCE_BUCKETS_SQL)),
+    ("finance: summary payments", *ranged(reports.FINANCE_PAYMENTS_SQL)),
+    # OrderBackend.list_orders (dashboard, finance, takeaway and delivery order lists)
+    ("orders page: all", *order_page({})),
+    ("orders page: all, older", *order_page({}, NEXT_PAGE)),
+    ("orders page: date range", *order_page({"date_from": "2026-01-01", "date_to": "2026-01-31"}, NEXT_PAGE)),
+    ("orders page: takeaway", *order_page({"order_type": "Takeaway"})),
+    ("orders page: delivery, newer", *order_page({"order_type": "Delivery"}, PREV_PAGE)),
+    # ReceiptBackend.get_order_bundle (receipts and order detail views)
+    ("order bundle: order", orders.ORDER_SQL, [1]),
+    ("order bundle: items", orders.ORDER_ITEMS_SQL, [1]),
+    ("order bundle: deal components", orders.ORDER_DEAL_ITEMS_SQL, [1]),
+]
+
+# JS comments and string literals ('...', "...", `...`), matched left to right
+# so quotes inside comments and SQL literals inside strings are skipped
+_JS_TOKEN_RE = re.compile(
+    r"//[^\n]*|/\*.*?\*/|`((?:[^`\\]|\\.)*)`|\"((?:[^\"\\\n]|\\.)*)\"|'((?:[^'\\\n]|\\.)*)'",
+    re.DOTALL,
+)
+_SQL_RE = re.compile(r"^\s*(?:SELECT\b.*\bFROM\b|INSERT\s+INTO\b|UPDATE\s+\w+\s+SET\b|DELETE\s+FROM\b|WITH\b)", re.DOTALL)
+# Parameters outside quoted SQL literals
+_SQL_PARAM_RE = re.compile(r"'(?:[^']|'')*'|(\?)|:(\w+)")
+
+
+def sample_params(sql):
+    """Placeholder values for a page statement: 1 for every ? or :name parameter"""
+    positional, named = 0, {}
+    for match in _SQL_PARAM_RE.finditer(sql):
+        if match.group(1):
+            positional += 1
+        elif match.group(2):
+            named[match.group(2)] = 1
+    return named if named else [1] * positional
+
+
+def page_queries(js_dir=FRONTEND_JS_DIR):
+    """(origin, sql, params) for every SQL string literal in the frontend scripts"""
+    found = []
+    for path in sorted(js_dir.glob("*.js")):
+        if path.name.endswith(".min.js"):
+            continue
+        source = path.read_text(encoding="utf-8")
+        for match in _JS_TOKEN_RE.finditer(source):
+            literal = next((group for group in match.groups() if group is not None), None)
+            if literal is None or not _SQL_RE.match(literal):
+                continue
+            origin = f"{path.name}:{source.count(chr(10), 0, match.start()) + 1}"
+            if "${" in literal:
+                # Interpolated SQL cannot be checked; register it in database/queries.py instead
+                found.append((origin, literal, None))
+            elif "{date_filter" in literal:
+                found.append((origin, *ranged(literal)))
+            else:
+                found.append((origin, literal, sample_params(literal)))
+    return found
+
+
+def frontend_queries():
+    """Every query the frontend ships: page SQL, the named-query registry and BACKEND_QUERIES"""
+    return [
+        *page_queries(),
+        # DatabaseBackend.run_named (dashboard KPIs and chart, open tables, order totals and cancels)
+        *(("named: " + q.name, *queries.bind(q, queries.sample_params(q))) for q in queries.QUERIES.values()),
+        *BACKEND_QUERIES,
+    ]
+
+
+# Scans that are not a problem, keyed by origin, with the reason
+ALLOWED_SCANS = {}
+
+# "SCAN orders" or "SCAN o" (alias) without an index; "SCAN x USING [COVERING] INDEX" is fine
+_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS (\w+))?$")
+
+
+def full_scans(conn, sql, params):
+    """Returns the watched tables the plan scans without an index"""
+    aliases = {}
+    for match in re.finditer(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.IGNORECASE):
+        table, alias = match.group(1), match.group(2)
+        aliases[table] = table
+        if alias and alias.upper() not in ("WHERE", "JOIN", "ON", "GROUP", "ORDER", "LEFT", "INNER"):
+            aliases[alias] = table
+
+    scans = []
+    for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+        detail = row[3]
+        match = _SCAN_RE.match(detail)
+        if match:
+            table = aliases.get(match.group(1), match.group(1))
+            if table in WATCHED_TABLES:
+                scans.append(detail)
+    return scans
+
+
+def check(conn, sql, params):
+    """Full scans of watched tables in sql's plan; raises ValueError for unchecked SQL"""
+    if params is None:
+        raise ValueError("SQL built by string interpolation cannot be plan-checked")
+    return full_scans(conn, sql, params)
+
+
+def main():
+    checked = frontend_queries()
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        db.set_database_path(Path(tmp) / "plans.db")
+        with db.connection() as conn:
+            for origin, sql, params in checked:
+                try:
+                    scans = check(conn, sql, params)
+                except Exception as e:
+                    print(f"{'ERROR':<10} {origin}  ({e})")
+                    failures += 1
+                    continue
+                if scans and origin in ALLOWED_SCANS:
+                    print(f"{'allowed':<10} {origin}  ({ALLOWED_SCANS[origin]})")
+                    continue
+                status = "FULL SCAN" if scans else "ok"
+                print(f"{status:<10} {origin}" + (f"  ({'; '.join(scans)})" if scans else ""))
+                failures += bool(scans)
+        db.close_connections()
+
+    print(f"\n{len(checked) - failures}/{len(checked)} queries avoid full scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
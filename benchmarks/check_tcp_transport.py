@@ -0,0 +1,123 @@
+"""
+Network Printer Transport Check
+Runs the persistent-socket TCP transport against a local socket server that
+records the bytes, and fails (exit status 1) if any scenario misbehaves:
+- back-to-back receipts are pipelined over one connection
+- a connection dropped by the printer is replaced transparently
+- an idle link is probed with DLE EOT and kept when the printer answers
+- a printer that stops answering the probe gets a fresh connection
+Also times the persistent transport against connect-per-job.
+
+Run: python -m benchmarks.check_tcp_transport [--jobs 300]
+"""
+import argparse
+import time
+
+from benchmarks.fake_printer import DLE_EOT, FakeNetworkPrinter
+from utils import escpos
+from utils.print_spooler import PrintSpooler
+from utils.printer_transports import PersistentTcpTransport, TcpTransport
+
+DLE_EOT_REQUEST = DLE_EOT + b"\x01"
+
+
+def receipt(n):
+    return escpos.receipt_bytes(f"Order #{n}\n" + "1 x Item Rs. 450.00\n" * 10)
+
+
+def job_bytes(printer):
+    """Received bytes with status probes removed"""
+    return printer.received.replace(DLE_EOT_REQUEST, b"")
+
+
+def check(name, ok, detail):
+    print(f"{'ok' if ok else 'FAIL':<6} {name}: {detail}")
+    return ok
+
+
+def pipelining(jobs):
+    printer = FakeNetworkPrinter(answer_status=True)
+    transport = PersistentTcpTransport(printer.host, printer.port)
+    payloads = [receipt(n) for n in range(jobs)]
+    for data in payloads:
+        transport.write(data)
+    expected = b"".join(payloads)
+    printer.wait_for(len(expected))
+    transport.close()
+    printer.close()
+    return check("pipelining", job_bytes(printer) == expected and len(printer.connections) == 1,
+                 f"{jobs} jobs over {len(printer.connections)} connection(s)")
+
+
+def reconnect_after_drop():
+    printer = FakeNetworkPrinter(answer_status=True)
+    transport = PersistentTcpTransport(printer.host, printer.port)
+    transport.write(receipt(1))
+    printer.wait_for(len(receipt(1)))
+    printer.drop_connections()
+    time.sleep(0.05)
+    transport.write(receipt(2))
+    expected = receipt(1) + receipt(2)
+    printer.wait_for(len(expected))
+    transport.close()
+    printer.close()
+    return check("printer dropped the connection", job_bytes(printer) == expected and transport.connects == 2,
+                 f"{transport.connects} connects, bytes intact: {job_bytes(printer) == expected}")
+
+
+def idle_probe(answer_status):
+    printer = FakeNetworkPrinter(answer_status=answer_status)
+    transport = PersistentTcpTransport(printer.host, printer.port, idle_probe=0.05, status_timeout=0.2)
+    transport.write(receipt(1))
+    time.sleep(0.1)
+    transport.write(receipt(2))
+    expected = receipt(1) + receipt(2)
+    printer.wait_for(len(expected) + len(DLE_EOT_REQUEST))
+    transport.close()
+    printer.close()
+    probes = printer.received.count(DLE_EOT_REQUEST)
+    expected_connects = 1 if answer_status else 2
+    label = "idle link, printer answers DLE EOT" if answer_status else "idle link, printer silent"
+    return check(label, job_bytes(printer) == expected and probes == 1 and transport.connects == expected_connects,
+                 f"{probes} probe(s), {transport.connects} connect(s)")
+
+
+def throughput(jobs):
+    payloads = [receipt(n) for n in range(jobs)]
+    expected = b"".join(payloads)
+    results = {}
+    for label, factory in (("connect per job", TcpTransport), ("persistent", PersistentTcpTransport)):
+        printer = FakeNetworkPrinter(answer_status=True)
+        spooler = PrintSpooler(factory(printer.host, printer.port), maxsize=jobs)
+        start = time.perf_counter()
+        for data in payloads:
+            spooler.submit(data)
+        spooler.join()
+        printer.wait_for(len(expected))
+        elapsed = time.perf_counter() - start
+        spooler.stop()
+        printer.close()
+        results[label] = jobs / elapsed
+        print(f"       {label:<16} {jobs / elapsed:8.0f} jobs/s over {len(printer.connections)} connection(s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=300)
+    args = parser.parse_args()
+
+    results = [
+        pipelining(args.jobs),
+        reconnect_after_drop(),
+        idle_probe(answer_status=True),
+        idle_probe(answer_status=False),
+    ]
+    throughput(args.jobs)
+    failures = results.count(False)
+    print(f"\n{len(results) - failures}/{len(results)} scenarios passed")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Synthetic Data Generator
+Bulk-loads a database with realistic order history at any scale (10k to
+5M orders): orders spread over --days days up to --end with lunch and dinner peaks
+and busier weekends, one to five items each weighted by menu category,
+deals with their components, discounts, cancellations, open tables and
+payments (some split between two methods). The same --seed and --end give
+the same data.
+
+Everything is written in one transaction with executemany. The per-row
+rollup and order-date triggers are suspended during the load and the
+rollups rebuilt once at the end (database.rollups), so the result is the
+same as placing the orders one by one, in a fraction of the time.
+
+Run: python -m benchmarks.datagen --out bench.db [--orders 100000] [--days 365] [--seed 1]
+"""
+import argparse
+import calendar
+import random
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+
+from database import db
+from database.rollups import rebuild_rollups
+
+# Local time of day (hour 0-23): late-night tail, lunch peak, dinner peak
+HOUR_WEIGHTS = (3, 1.5, 0.5, 0, 0, 0, 0, 0, 0, 0, 0.5, 2,
+                6, 9, 8, 4, 3, 3.5, 5, 8, 11, 12, 9, 5)
+# Monday .. Sunday
+WEEKDAY_WEIGHTS = (0.85, 0.8, 0.85, 0.9, 1.15, 1.3, 1.25)
+# Relative popularity of a category; its items share the weight
+CATEGORY_WEIGHTS = {
+    "Pizza": 24, "CraveHub Special": 12, "Burgers": 10, "Chinese/Oriental": 8,
+    "Bites & Platter": 7, "Appetizer": 7, "Sandwiches": 5, "Special Roll": 5,
+    "Oven Pasta": 5, "Starters": 4, "Ice Cream": 4, "Dessert": 3, "Soup": 3, "Steak": 3,
+}
+DEFAULT_CATEGORY_WEIGHT = 3
+
+ORDER_TYPES = (("Takeaway", 45), ("Table", 35), ("Delivery", 20))
+ITEMS_PER_ORDER = ((1, 35), (2, 30), (3, 18), (4, 10), (5, 7))
+QUANTITIES = ((1, 75), (2, 20), (3, 5))
+DISCOUNTS = ((0, 88), (5, 5), (10, 5), (15, 2))
+PAYMENT_METHODS = (("cash", 70), ("card", 25), ("online", 5))
+
+DEAL_SHARE = 0.08        # orders with a deal
+CANCELLED_SHARE = 0.03
+SPLIT_PAYMENT_SHARE = 0.05
+TABLES = 14
+OPEN_TABLE_WINDOW = 3600  # table orders this close to --end are still open
+UTC_OFFSET_HOURS = 5      # HOUR_WEIGHTS are local time (PKT); created_at is UTC
+
+# name, price, components (menu item name, quantity)
+DEALS = (
+    ("Deal 1", 399, (("Zinger burger", 1), ("Plain fries", 1))),
+    ("Deal 2", 750, (("Chicken Tikka - S", 2), ("Plain fries", 1))),
+    ("Deal 3", 2699, (("Chicken Tikka - L", 1), ("Chicken Fajita - L", 1), ("Hot Wings", 1))),
+    ("Family Deal", 3499, (("CraveHub Special - L", 1), ("Chicken Chowmein", 2), ("Nuggets", 2))),
+)
+
+TRIGGER_TABLES = ("orders", "order_items", "payment_transactions")
+FLUSH_ORDERS = 20_000
+
+_INSERT_ORDER = """
+    INSERT INTO orders (id, order_type, customer_name, customer_phone, customer_address, table_number,
+                        total, discount_percentage, order_status, payment_status, order_note, created_at,
+                        amount_received, balance_return, order_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_ITEM = "INSERT INTO order_items (order_id, menu_item_id, quantity, price) VALUES (?, ?, ?, ?)"
+_INSERT_PAYMENT = """
+    INSERT INTO payment_transactions (order_id, amount, payment_method, payment_status, created_at)
+    VALUES (?, ?, ?, 'paid', ?)
+"""
+
+
+def _picker(rng, values, weights):
+    """A function drawing one of values by weight (cheaper than random.choices per draw)"""
+    cum = list(accumulate(weights))
+    total, last = cum[-1], len(cum) - 1
+    return lambda: values[bisect_right(cum, rng.random() * total, 0, last)]
+
+
+def _weighted(rng, pairs):
+    values, weights = zip(*pairs)
+    return _picker(rng, values, weights)
+
+
+def _ensure_deals(conn):
+    """The deal menu items (adding DEALS when the menu has none): [(id, price)]"""
+    deals = [tuple(row) for row in conn.execute("SELECT id, price FROM menu_items WHERE is_deal = 1")]
+    if deals:
+        return deals
+    by_name = {row[0]: row[1] for row in conn.execute("SELECT name, id FROM menu_items")}
+    for name, price, components in DEALS:
+        deal_id = conn.execute(
+            "INSERT INTO menu_items (name, category, price, is_available, is_deal) VALUES (?, 'Deals', ?, 1, 1)",
+            (name, price),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO deal_items (deal_id, menu_item_id, item_name, quantity) VALUES (?, ?, ?, ?)",
+            ((deal_id, by_name.get(item), item, quantity) for item, quantity in components),
+        )
+        deals.append((deal_id, price))
+    return deals
+
+
+def _menu_pool(conn):
+    """Regular menu items with popularity weights: ([(id, price)], [weight])"""
+    rows = conn.execute("SELECT id, price, category FROM menu_items WHERE is_deal = 0 ORDER BY id").fetchall()
+    if not rows:
+        raise ValueError("The menu is empty")
+    per_category = {}
+    for row in rows:
+        per_category[row[2]] = per_category.get(row[2], 0) + 1
+    weights = [CATEGORY_WEIGHTS.get(row[2], DEFAULT_CATEGORY_WEIGHT) / per_category[row[2]] for row in rows]
+    return [(row[0], row[1]) for row in rows], weights
+
+
+def _orders_per_day(order_count, first_day, days):
+    """Splits order_count over the days by weekday weight (exact total)"""
+    weights = [WEEKDAY_WEIGHTS[(first_day + timedelta(days=d)).weekday()] for d in range(days)]
+    total = sum(weights)
+    counts, placed, acc = [], 0, 0.0
+    for weight in weights:
+        acc += weight
+        upto = round(order_count * acc / total)
+        counts.append(upto - placed)
+        placed = upto
+    return counts
+
+
+def _suspend_triggers(conn):
+    """Drops the triggers on the order tables; returns their SQL for _restore_triggers"""
+    placeholders = ",".join("?" * len(TRIGGER_TABLES))
+    triggers = conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ({placeholders})",
+        TRIGGER_TABLES,
+    ).fetchall()
+    for name, _ in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+    return [sql for _, sql in triggers]
+
+
+def _restore_triggers(conn, statements):
+    for sql in statements:
+        conn.execute(sql)
+
+
+def generate(path, order_count, days=365, seed=1, end=None):
+    """
+    Fills the database at path with order_count orders over the days days
+    ending with end (a date; default today, UTC). Returns the rows written
+    per table.
+    """
+    rng = random.Random(seed)
+    end = end or datetime.now(timezone.utc).date()
+    first_day = end - timedelta(days=days - 1)
+    # End of the last local day
+    end_ts = calendar.timegm((end + timedelta(days=1)).timetuple()) - UTC_OFFSET_HOURS * 3600
+
+    order_type_of = _weighted(rng, ORDER_TYPES)
+    item_count_of = _weighted(rng, ITEMS_PER_ORDER)
+    quantity_of = _weighted(rng, QUANTITIES)
+    discount_of = _weighted(rng, DISCOUNTS)
+    method_of = _weighted(rng, PAYMENT_METHODS)
+    hour_of = _picker(rng, range(24), HOUR_WEIGHTS)
+
+    db.set_database_path(path)
+    counts = {"orders": 0, "order_items": 0, "payment_transactions": 0}
+    with db.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        deals = _ensure_deals(conn)
+        menu_item_of = _picker(rng, *_menu_pool(conn))
+        triggers = _suspend_triggers(conn)
+
+        order_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM orders").fetchone()[0]
+        open_tables = set()
+        orders, items, payments = [], [], []
+
+        def flush():
+            conn.executemany(_INSERT_ORDER, orders)
+            conn.executemany(_INSERT_ITEM, items)
+            conn.executemany(_INSERT_PAYMENT, payments)
+            counts["orders"] += len(orders)
+            counts["order_items"] += len(items)
+            counts["payment_transactions"] += len(payments)
+            orders.clear()
+            items.clear()
+            payments.clear()
+
+        for day_index, day_count in enumerate(_orders_per_day(order_count, first_day, days)):
+            day_start = calendar.timegm((first_day + timedelta(days=day_index)).timetuple())
+            day_start -= UTC_OFFSET_HOURS * 3600
+            for seconds in sorted(hour_of() * 3600 + int(rng.random() * 3600) for _ in range(day_count)):
+                ts = day_start + seconds
+                created_at = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(ts))
+                order_id += 1
+
+                order_type = order_type_of()
+                lines = [(*menu_item_of(), quantity_of()) for _ in range(item_count_of())]
+                if rng.random() < DEAL_SHARE:
+                    deal_id, price = rng.choice(deals)
+                    lines.append((deal_id, price, 1))
+                discount = discount_of()
+                subtotal = sum(price * quantity for _, price, quantity in lines)
+                total = round(subtotal - subtotal * discount / 100, 2)
+
+                customer_name = phone = address = table_number = None
+                if order_type == "Table":
+                    table_number = rng.randint(1, TABLES)
+                else:
+                    customer_name = f"Customer {rng.randrange(1, max(order_count // 4, 2))}"
+                if order_type == "Delivery":
+                    phone = f"03{rng.randrange(10**9):09d}"
+                    address = f"House {rng.randint(1, 400)}, Street {rng.randint(1, 40)}"
+
+                if (order_type == "Table" and end_ts - ts <= OPEN_TABLE_WINDOW
+                        and table_number not in open_tables):
+                    open_tables.add(table_number)
+                    status, payment_status = "pending", "pending"
+                elif rng.random() < CANCELLED_SHARE:
+                    status, payment_status = "cancelled", "cancelled"
+                else:
+                    status, payment_status = "completed", "paid"
+
+                amount_received = balance_return = None
+                if payment_status == "paid":
+                    method = method_of()
+                    if rng.random() < SPLIT_PAYMENT_SHARE:
+                        first = round(total / 2, 2)
+                        payments.append((order_id, first, method, created_at))
+                        payments.append((order_id, round(total - first, 2), "card" if method == "cash" else "cash", created_at))
+                    else:
+                        payments.append((order_id, total, method, created_at))
+                    if method == "cash":
+                        amount_received = -(-total // 500) * 500  # next 500 note
+                        balance_return = round(amount_received - total, 2)
+
+                orders.append((
+                    order_id, order_type, customer_name, phone, address, table_number, total, discount,
+                    status, payment_status, None, created_at, amount_received, balance_return, created_at[:10],
+                ))
+                items.extend((order_id, menu_item_id, quantity, price) for menu_item_id, price, quantity in lines)
+                if len(orders) >= FLUSH_ORDERS:
+                    flush()
+        flush()
+
+        rebuild_rollups(conn)
+        _restore_triggers(conn, triggers)
+    db.close_connections()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="database file to create or extend")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365, help="days of history, up to and including --end")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="last day (YYYY-MM-DD, default today)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--profile", default=db.PERFORMANCE_PROFILE, choices=sorted(db.PERFORMANCE_PROFILES))
+    args = parser.parse_args()
+
+    db.set_performance_profile(args.profile)
+    start = time.perf_counter()
+    counts = generate(Path(args.out), args.orders, args.days, args.seed, args.end)
+    elapsed = time.perf_counter() - start
+    rows = sum(counts.values())
+    print(", ".join(f"{count:,} {table}" for table, count in counts.items()))
+    print(f"{rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
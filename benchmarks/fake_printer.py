@@ -0,0 +1,101 @@
+"""
+Local fake network printer for benchmarks: a raw TCP (port 9100 style)
+server that records every byte it receives, per connection.
+"""
+import socket
+import threading
+
+
+DLE_EOT = b"\x10\x04"
+STATUS_ONLINE = b"\x16"  # DLE EOT 1 reply: fixed bits set, no error flags
+
+
+class FakeNetworkPrinter:
+    """
+    Accepts any number of connections and records what each one sent.
+    With answer_status, replies to DLE EOT status requests like a real printer.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, answer_status=False):
+        self.answer_status = answer_status
+        self._sockets = []
+        self._server = socket.create_server((host, port))
+        self.host, self.port = self._server.getsockname()[:2]
+        self.connections = []  # bytearray per accepted connection
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._threads = []
+        self._accepter = threading.Thread(target=self._accept, daemon=True)
+        self._accepter.start()
+
+    @property
+    def uri(self):
+        return f"tcp://{self.host}:{self.port}"
+
+    @property
+    def received(self):
+        with self._lock:
+            return b"".join(bytes(c) for c in self.connections)
+
+    def _accept(self):
+        while not self._closed.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            buffer = bytearray()
+            with self._lock:
+                self.connections.append(buffer)
+                self._sockets.append(conn)
+            thread = threading.Thread(target=self._serve, args=(conn, buffer), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _serve(self, conn, buffer):
+        with conn:
+            while True:
+                try:
+                    chunk = conn.recv(65536)
+                except OSError:
+                    return
+                if not chunk:
+                    return
+                with self._lock:
+                    buffer.extend(chunk)
+                self.on_data(conn, chunk)
+
+    def on_data(self, conn, chunk):
+        if self.answer_status:
+            for _ in range(chunk.count(DLE_EOT)):
+                conn.sendall(STATUS_ONLINE)
+
+    def drop_connections(self):
+        """Closes every open connection from the printer side (e.g. printer rebooted)"""
+        with self._lock:
+            sockets, self._sockets = self._sockets, []
+        for conn in sockets:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def wait_for(self, total_bytes, timeout=10.0):
+        """Waits until at least total_bytes have arrived; returns True on success"""
+        deadline = threading.Event()
+        timer = threading.Timer(timeout, deadline.set)
+        timer.start()
+        try:
+            while not deadline.is_set():
+                with self._lock:
+                    if sum(len(c) for c in self.connections) >= total_bytes:
+                        return True
+                deadline.wait(0.005)
+            return False
+        finally:
+            timer.cancel()
+
+    def close(self):
+        self._closed.set()
+        self._server.close()
+        for thread in self._threads:
+            thread.join(1.0)
@@ -0,0 +1,321 @@
+"""
+Benchmark Suite
+Runs the application's hot paths through the real backend classes against
+a database from benchmarks.datagen, and reports per-call latency for each
+case (median, p95, p99, mean, min and max in ms):
+
+    dashboard_stats   DatabaseBackend: the dashboard KPI batch and daily chart, cold and cached
+    finance_summary   FinanceBackend.summary for the last 30 days and the whole history, cold
+    menu_load         MenuBackend.get_menu: rebuilt after a menu change, cached, not modified
+    receipt_bundle    ReceiptBackend.get_order_bundle for random orders
+    logo_raster       utils.escpos conversion (cold) and PrinterBackend's cached raster
+    order_placement   OrderBackend.place_order (takeaway orders through the group-commit writer)
+
+Results can be written as JSON (--json), together with the git commit, the
+environment, the data scale and the backends' slot metrics (utils.metrics).
+--compare BASELINE.json prints the change in median per case against an
+earlier run and exits with status 1 if a case got slower by more than
+--tolerance.
+
+A database given with --db is generated there when it does not exist and
+reused otherwise; order placement adds orders to it.
+
+Run: python -m benchmarks.run_suite [--orders 100000] [--db bench.db] [--json results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from benchmarks import datagen
+from database import db
+from database.group_commit import group_writer
+from utils.metrics import metrics
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_VERSION = 1
+
+# Medians closer than this (ms) are never reported as a regression
+NOISE_FLOOR_MS = 0.05
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    rank = lambda fraction: ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+    ms = lambda seconds: round(seconds * 1000, 4)
+    return {
+        "calls": len(ordered),
+        "median_ms": ms(statistics.median(ordered)),
+        "p95_ms": ms(rank(0.95)),
+        "p99_ms": ms(rank(0.99)),
+        "mean_ms": ms(statistics.fmean(ordered)),
+        "min_ms": ms(ordered[0]),
+        "max_ms": ms(ordered[-1]),
+    }
+
+
+def _check_reply(case, reply):
+    """Stops the run on an error reply, so a failing slot is not timed as a fast one"""
+    if not isinstance(reply, str):
+        return
+    result = json.loads(reply)
+    if isinstance(result, dict) and (result.get("success") is False or "error" in result):
+        raise SystemExit(f"{case}: {result.get('error')}")
+    for entry in result.get("results", ()) if isinstance(result, dict) else ():
+        if isinstance(entry, dict) and "error" in entry:
+            raise SystemExit(f"{case}: {entry['error']}")
+
+
+def timed(case, call, repeat, setup=None):
+    """Times call() repeat times after one untimed warm-up; setup() runs untimed before each call"""
+    samples = []
+    for i in range(repeat + 1):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        reply = call()
+        elapsed = time.perf_counter() - start
+        _check_reply(case, reply)
+        if i:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+# --------------------------------------------------
+# Cases: each returns {case: summary}
+# --------------------------------------------------
+def bench_dashboard_stats(repeat, rng):
+    from controllers.db_backend import DatabaseBackend
+    from database.query_cache import result_cache
+
+    backend = DatabaseBackend()
+    today = datetime.now(timezone.utc).date()
+    # As dashboard.js loadKPIs and loadCharts send them
+    kpis = json.dumps([
+        {"name": "dashboard.sales_in_range", "params": {"date_from": today.isoformat(), "date_to": today.isoformat()}},
+        {"name": "dashboard.total_orders"},
+        {"name": "dashboard.orders_last_30_days"},
+        {"name": "dashboard.top_item"},
+    ])
+    chart = json.dumps({"date_from": today.replace(day=1).isoformat(), "date_to": None})
+    return {
+        "kpis.cold": timed("kpis.cold", lambda: backend.execute_batch(kpis), repeat, result_cache.clear),
+        "kpis.cached": timed("kpis.cached", lambda: backend.execute_batch(kpis), repeat),
+        "daily_chart.cold": timed(
+            "daily_chart.cold", lambda: backend.run_named("dashboard.sales_by_day", chart), repeat, result_cache.clear
+        ),
+    }
+
+
+def bench_finance_summary(repeat, rng):
+    from controllers.finance_backend import FinanceBackend
+    from database.query_cache import result_cache
+
+    backend = FinanceBackend()
+    today = datetime.now(timezone.utc).date()
+    month_ago = (today - timedelta(days=29)).isoformat()
+    return {
+        "30_days.cold": timed(
+            "30_days.cold", lambda: backend.summary(month_ago, today.isoformat()), repeat, result_cache.clear
+        ),
+        "all.cold": timed("all.cold", lambda: backend.summary("", ""), repeat, result_cache.clear),
+    }
+
+
+def bench_menu_load(repeat, rng):
+    from controllers.menu_backend import MenuBackend
+
+    backend = MenuBackend()
+    with db.connection() as conn:
+        item = tuple(conn.execute("SELECT id, name, category, price FROM menu_items WHERE is_deal = 0").fetchone())
+    # Saving an item unchanged still bumps the menu version, so the next get_menu rebuilds its snapshot
+    change_menu = lambda: backend.update_item(*item)
+    results = {
+        "after_change": timed("after_change", lambda: backend.get_menu(-1), repeat, change_menu),
+        "cached": timed("cached", lambda: backend.get_menu(-1), repeat),
+    }
+    version = json.loads(backend.get_menu(-1))["version"]
+    results["not_modified"] = timed("not_modified", lambda: backend.get_menu(version), repeat)
+    return results
+
+
+def bench_receipt_bundle(repeat, rng):
+    from controllers.receipt_backend import ReceiptBackend
+
+    backend = ReceiptBackend()
+    with db.connection() as conn:
+        max_id = conn.execute("SELECT MAX(id) FROM orders").fetchone()[0]
+        deal_orders = [row[0] for row in conn.execute(
+            "SELECT oi.order_id FROM order_items oi JOIN menu_items mi ON mi.id = oi.menu_item_id "
+            "WHERE mi.is_deal = 1 LIMIT 1000"
+        )]
+    if not max_id:
+        raise SystemExit("receipt_bundle: the database has no orders")
+    results = {"random": timed("random", lambda: backend.get_order_bundle(rng.randint(1, max_id)), repeat)}
+    if deal_orders:
+        results["with_deal"] = timed("with_deal", lambda: backend.get_order_bundle(rng.choice(deal_orders)), repeat)
+    return results
+
+
+def bench_logo_raster(repeat, rng):
+    from controllers.printer_backend import PrinterBackend
+    from utils import escpos
+
+    backend = PrinterBackend()
+    logo = backend._get_logo_path()
+    if logo is None:
+        raise SystemExit("logo_raster: no receipt logo in assets/")
+    return {
+        "cold": timed("cold", lambda: escpos.render_logo_raster(logo, backend.LOGO_WIDTH, backend.LOGO_DITHER), repeat),
+        "cached": timed("cached", lambda: backend._image_to_escpos(logo), repeat),
+    }
+
+
+def bench_order_placement(repeat, rng):
+    from controllers.order_backend import OrderBackend
+
+    backend = OrderBackend()
+    with db.connection() as conn:
+        menu = [tuple(row) for row in conn.execute("SELECT id, price FROM menu_items WHERE is_deal = 0")]
+
+    def place():
+        order = {
+            "order_type": "Takeaway",
+            "customer_name": "Benchmark",
+            "items": [
+                {"menu_item_id": item_id, "quantity": rng.randint(1, 3), "price": price}
+                for item_id, price in rng.sample(menu, rng.randint(1, 5))
+            ],
+        }
+        return backend.place_order(json.dumps(order))
+
+    return {"takeaway": timed("takeaway", place, repeat)}
+
+
+CASES = {
+    "dashboard_stats": bench_dashboard_stats,
+    "finance_summary": bench_finance_summary,
+    "menu_load": bench_menu_load,
+    "receipt_bundle": bench_receipt_bundle,
+    "logo_raster": bench_logo_raster,
+    "order_placement": bench_order_placement,  # last: it writes
+}
+
+
+# --------------------------------------------------
+# Results
+# --------------------------------------------------
+def git_commit():
+    """(commit, dirty) of the working tree, or (None, None) outside git"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BASE_DIR, check=True, capture_output=True, text=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=BASE_DIR, check=True,
+            capture_output=True, text=True,
+        ).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def compare(results, baseline, tolerance):
+    """Prints the median change per case; returns the cases slower than tolerance"""
+    regressions = []
+    print(f"\nCompared with {baseline.get('git', {}).get('commit') or 'baseline'} (median):")
+    for case, current in results["cases"].items():
+        before = baseline.get("cases", {}).get(case)
+        if before is None:
+            print(f"  {case:<32} {current['median_ms']:10.3f} ms  (new)")
+            continue
+        old, new = before["median_ms"], current["median_ms"]
+        change = (new - old) / old if old else 0.0
+        slower = change > tolerance and new - old > NOISE_FLOOR_MS
+        if slower:
+            regressions.append(case)
+        print(f"  {case:<32} {old:10.3f} -> {new:10.3f} ms  {change:+7.1%}" + ("  REGRESSION" if slower else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=100_000, help="orders to generate (ignored for an existing --db)")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="database to generate or reuse (default: a scratch file)")
+    parser.add_argument("--repeat", type=int, default=50, help="timed calls per case")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="run only these groups")
+    parser.add_argument("--profile", default=db.PERFORMANCE_PROFILE, choices=sorted(db.PERFORMANCE_PROFILES))
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="results file of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed median slowdown (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    db.set_performance_profile(args.profile)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.db) if args.db else Path(tmp) / "suite.db"
+        data = {"path": str(path) if args.db else None, "generated": not path.exists()}
+        if data["generated"]:
+            start = time.perf_counter()
+            rows = datagen.generate(path, args.orders, args.days, args.seed)
+            data.update(orders=args.orders, days=args.days, seed=args.seed,
+                        generate_s=round(time.perf_counter() - start, 2))
+            print(f"generated {sum(rows.values()):,} rows in {data['generate_s']:.1f}s")
+        db.set_database_path(path)
+        with db.connection() as conn:
+            data["rows"] = {
+                table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("orders", "order_items", "payment_transactions", "menu_items")
+            }
+
+        rng = random.Random(args.seed)
+        cases = {}
+        for group in args.only or CASES:
+            for case, summary in CASES[group](args.repeat, rng).items():
+                name = f"{group}.{case}"
+                cases[name] = summary
+                print(f"{name:<34} median {summary['median_ms']:9.3f} ms  p95 {summary['p95_ms']:9.3f}  "
+                      f"p99 {summary['p99_ms']:9.3f}")
+        group_writer.stop()
+        db.close_connections()
+
+    commit, dirty = git_commit()
+    results = {
+        "version": RESULTS_VERSION,
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": {"commit": commit, "dirty": dirty},
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": args.profile,
+            "repeat": args.repeat,
+        },
+        "data": data,
+        "cases": cases,
+        "slots": metrics.snapshot()["slots"],
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nresults written to {args.json}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,120 +1,580 @@
 import json
 import sqlite3
-from PyQt6.QtCore import QObject, pyqtSlot
-from database.db import get_connection
+import time
+from concurrent.futures import Future
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from database import queries
+from database.cursors import cursor_registry
+from database.db import connection
+from database.executor import db_executor
+from database.group_commit import group_writer
+from database.query_cache import result_cache
+from database.reports import apply_date_filter
+from database.result_format import encode_result
+from utils.metrics import instrumented, metrics
 
 
 class DatabaseBackend(QObject):
     """
     Backend that provides direct SQL access to the database from JavaScript.
     Allows executing SQL queries directly on cravehub.db
+
+    Reads return rows as objects by default; execute_compact (or "layout" in
+    an execute_batch entry) returns the compact "rows" or "columns" layouts
+    of database.result_format, which send each column name once.
+
+    Large results can be read a chunk at a time: open_cursor returns a
+    handle, fetch_chunk the next rows and close_cursor releases it (see
+    database.cursors; idle cursors are released automatically).
+
+    run_named executes a statement from database.queries by name, so hot
+    queries are sent as a name and parameters instead of SQL text.
+
+    Read results can opt in to database.query_cache (execute_cached, or
+    "cache": true in an execute_batch entry). Writes made through this backend
+    evict the cached results that read a table they touched.
+
+    Writes (execute_update, execute_many, execute_with_params) go through
+    database.group_commit, which commits concurrent writes together.
+
+    Query slots are instrumented (utils.metrics): get_metrics returns their
+    latency percentiles, rows, bytes and connect / execute / fetch /
+    serialize times, and the slow-query log with each statement's plan.
+
+    Every query slot has an *_async variant taking a leading request_id: it
+    returns immediately and delivers the same JSON through
+    query_finished(request_id, result). Reads run on the database.executor
+    reader pool, writes on the group-commit writer.
     """
 
+    # request_id, result JSON (as returned by the synchronous slot)
+    query_finished = pyqtSignal(str, str)
+
+    def __init__(self, executor=db_executor, writer=group_writer):
+        super().__init__()
+        self.executor = executor
+        self.writer = writer
+        # A broken named query fails at startup, not when a page first runs it
+        with connection() as conn:
+            try:
+                queries.validate(conn)
+            except ValueError as e:
+                # Imported here: utils.logger opens cravehub.log when first imported
+                from utils.logger import logger
+
+                logger.error("Named query check failed: %s", e)
+                raise
+
+    def _submit(self, request_id, slot, *args):
+        """Runs a read slot on the reader pool"""
+        def run():
+            try:
+                return slot(*args)
+            except Exception as e:
+                return json.dumps({"success": False, "error": str(e)})
+
+        try:
+            self.executor.submit(run, on_done=lambda result: self.query_finished.emit(request_id, result))
+        except RuntimeError as e:  # executor shut down
+            self.query_finished.emit(request_id, json.dumps({"success": False, "error": str(e)}))
+
+    def _submit_write(self, request_id, future, with_last_id=False):
+        """Delivers a write's reply once its group has committed"""
+        future.add_done_callback(
+            lambda done: self.query_finished.emit(request_id, self._write_reply(done, with_last_id))
+        )
+
+    @pyqtSlot(str, str)
+    def execute_query_async(self, request_id, sql_query):
+        self._submit(request_id, self.execute_query, sql_query)
+
+    @pyqtSlot(str, str)
+    def execute_update_async(self, request_id, sql_query):
+        self._submit_write(request_id, self._queue(sql_query, []))
+
+    @pyqtSlot(str, str, str)
+    def execute_many_async(self, request_id, sql_query, params_json):
+        self._submit_write(request_id, self._queue_many(sql_query, params_json))
+
+    @pyqtSlot(str, str, str)
+    def execute_with_params_async(self, request_id, sql_query, params_json):
+        if self._is_select(sql_query):
+            self._submit(request_id, self.execute_with_params, sql_query, params_json)
+        else:
+            self._submit_write(request_id, self._queue_with_params(sql_query, params_json), True)
+
+    @pyqtSlot(str, str, str, str)
+    def execute_date_range_async(self, request_id, sql_query, date_from, date_to):
+        self._submit(request_id, self.execute_date_range, sql_query, date_from, date_to)
+
+    @pyqtSlot(str, str, str, str)
+    def execute_compact_async(self, request_id, sql_query, params_json, layout):
+        self._submit(request_id, self.execute_compact, sql_query, params_json, layout)
+
+    @pyqtSlot(str, str, str)
+    def run_named_async(self, request_id, name, params_json):
+        try:
+            query, sql, params = self._bind_named(name, params_json)
+        except Exception as e:
+            self.query_finished.emit(request_id, json.dumps({"success": False, "error": str(e)}))
+            return
+        if query.write:
+            self._submit_write(request_id, self._queue_named(query, sql, params), True)
+        else:
+            self._submit(request_id, self._run_named_read, query, sql, params)
+
+    @pyqtSlot(str, str, str, str)
+    def open_cursor_async(self, request_id, sql_query, params_json, layout):
+        self._submit(request_id, self.open_cursor, sql_query, params_json, layout)
+
+    @pyqtSlot(str, str, int)
+    def fetch_chunk_async(self, request_id, handle, size):
+        self._submit(request_id, self.fetch_chunk, handle, size)
+
+    @pyqtSlot(str, str, str)
+    def execute_cached_async(self, request_id, sql_query, params_json):
+        self._submit(request_id, self.execute_cached, sql_query, params_json)
+
+    @pyqtSlot(str, str)
+    def execute_batch_async(self, request_id, queries_json):
+        self._submit(request_id, self.execute_batch, queries_json)
+
     @pyqtSlot(str, result=str)
+    @instrumented
     def execute_query(self, sql_query):
         """
         Execute a SELECT query and return results as JSON.
         Returns array of objects (rows as dicts).
         """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute(sql_query)
-
-            # Get column names
-            columns = [description[0] for description in cursor.description]
-
-            # Fetch all rows and convert to list of dicts
-            rows = cursor.fetchall()
-            result = [dict(zip(columns, row)) for row in rows]
-
-            conn.close()
-            return json.dumps(result)
+            with connection() as conn:
+                return self._select_json(conn, sql_query, [])
         except Exception as e:
             return json.dumps({"error": str(e)})
 
     @pyqtSlot(str, result=str)
+    @instrumented
     def execute_update(self, sql_query):
         """
         Execute INSERT, UPDATE, or DELETE queries.
         Returns JSON with success status and affected rows.
         """
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute(sql_query)
-            affected_rows = cursor.rowcount
-            conn.commit()
-            conn.close()
-            return json.dumps({"success": True, "affected_rows": affected_rows})
-        except Exception as e:
-            return json.dumps({"success": False, "error": str(e)})
+        return self._write_reply(self._queue(sql_query, []))
 
-    @pyqtSlot(str, result=str)
+    @pyqtSlot(str, str, result=str)
+    @instrumented
     def execute_many(self, sql_query, params_json):
         """
         Execute a query with parameters (for prepared statements).
         params_json should be a JSON array of parameter arrays.
         """
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            params = json.loads(params_json)
-            cursor.executemany(sql_query, params)
-            affected_rows = cursor.rowcount
-            conn.commit()
-            conn.close()
-            return json.dumps({"success": True, "affected_rows": affected_rows})
-        except Exception as e:
-            return json.dumps({"success": False, "error": str(e)})
+        return self._write_reply(self._queue_many(sql_query, params_json))
 
     @pyqtSlot(str, str, result=str)
+    @instrumented
     def execute_with_params(self, sql_query, params_json):
         """
         Execute a single query with parameters.
         params_json should be a JSON array of parameter values.
         Returns last_insert_id for INSERT queries.
         """
+        if not self._is_select(sql_query):
+            return self._write_reply(self._queue_with_params(sql_query, params_json), True)
         try:
-            # Normalize inputs (QWebChannel may pass None or wrong type)
-            if not isinstance(sql_query, str):
-                sql_query = str(sql_query) if sql_query else ""
-            if params_json is None or not isinstance(params_json, str):
-                params_json = "[]"
-            try:
-                params = json.loads(params_json)
-            except (json.JSONDecodeError, TypeError) as e:
-                return json.dumps({"success": False, "error": f"Invalid params JSON: {e}"})
+            params = self._parse_params(params_json)
+            with connection() as conn:
+                return self._select_json(conn, sql_query, params)
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+
+    @pyqtSlot(str, str, str, result=str)
+    @instrumented
+    def execute_compact(self, sql_query, params_json, layout):
+        """
+        Execute a SELECT with parameters and return the result in a compact
+        layout: "rows" gives {columns, rows: [[...], ...]}, "columns" gives
+        {columns, values: [[column 0 values], ...]} (see database.result_format).
+        params_json is a JSON array of parameter values (or "" for none).
+        """
+        try:
+            if not self._is_select(sql_query):
+                return json.dumps({"error": "Compact results are only returned for SELECT queries"})
+            params = self._parse_params(params_json or "[]")
+            with connection() as conn:
+                return self._select_json(conn, sql_query, params, layout or "rows")
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    # --------------------------------------------------
+    # Writes (group commit)
+    # --------------------------------------------------
+    @staticmethod
+    def _is_select(sql_query):
+        return isinstance(sql_query, str) and sql_query.strip().upper().startswith("SELECT")
+
+    @staticmethod
+    def _parse_params(params_json):
+        """Normalizes a JSON parameter array (QWebChannel may pass None or wrong type)"""
+        if params_json is None or not isinstance(params_json, str):
+            params_json = "[]"
+        try:
+            params = json.loads(params_json)
+        except (json.JSONDecodeError, TypeError) as e:
+            raise ValueError(f"Invalid params JSON: {e}")
+        if params is None:
+            return []
+        if not isinstance(params, (list, tuple)):
+            return [params]
+        return params
+
+    @staticmethod
+    def _apply_write(conn, sql_query, params, many):
+        """Runs on the writer thread inside the request's savepoint"""
+        if many:
+            cursor = conn.executemany(sql_query, params)
+            probe = params[0] if params else None
+        else:
+            cursor = conn.execute(sql_query, params)
+            probe = params
+        writes = result_cache.statement_info(conn, sql_query, probe).writes if probe is not None else ()
+        return cursor.rowcount, cursor.lastrowid, writes
+
+    def _queue(self, sql_query, params, many=False):
+        """Future of (affected_rows, last_insert_id, tables written) for a queued write"""
+        start = time.perf_counter()
+        try:
+            future = self.writer.submit(self._apply_write, sql_query, params, many)
+        except Exception as e:  # writer stopped
+            return self._failed(e)
+        # Queue wait plus group commit, for sync and async writes alike
+        future.add_done_callback(
+            lambda done: metrics.observe(
+                "DatabaseBackend.write", time.perf_counter() - start, error=done.exception() is not None
+            )
+        )
+        return future
+
+    def _queue_many(self, sql_query, params_json):
+        try:
+            params = json.loads(params_json)
+        except Exception as e:
+            return self._failed(e)
+        return self._queue(sql_query, params, many=True)
+
+    def _queue_with_params(self, sql_query, params_json):
+        if not isinstance(sql_query, str):
+            sql_query = str(sql_query) if sql_query else ""
+        try:
+            params = self._parse_params(params_json)
+        except ValueError as e:
+            return self._failed(e)
+        return self._queue(sql_query, params)
+
+    @staticmethod
+    def _failed(error):
+        future = Future()
+        future.set_exception(error)
+        return future
+
+    @staticmethod
+    def _write_reply(future, with_last_id=False):
+        """JSON reply for a write future (waits for its group to commit)"""
+        try:
+            affected_rows, last_insert_id, writes = future.result()
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+        if writes:
+            result_cache.invalidate_tables(writes)
+        reply = {"success": True, "affected_rows": affected_rows}
+        if with_last_id:
+            reply["last_insert_id"] = last_insert_id
+        return json.dumps(reply)
+
+    # --------------------------------------------------
+    # Named queries (database.queries)
+    # --------------------------------------------------
+    @pyqtSlot(str, str, result=str)
+    @instrumented
+    def run_named(self, name, params_json):
+        """
+        Execute a registered query by name.
+        params_json is a JSON object of the query's named parameters
+        (date_from / date_to for date-range queries).
+        Reads return an array of row objects (cached if the query is marked
+        so); writes return JSON with success, affected_rows and last_insert_id.
+        """
+        try:
+            query, sql, params = self._bind_named(name, params_json)
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+        if query.write:
+            return self._write_reply(self._queue_named(query, sql, params), True)
+        return self._run_named_read(query, sql, params)
+
+    @pyqtSlot(result=str)
+    def named_query_stats(self):
+        """Per-query counters for run_named: calls, errors, total_ms, max_ms, avg_ms"""
+        try:
+            return json.dumps({"success": True, "stats": queries.query_stats.snapshot()})
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+
+    @staticmethod
+    def _bind_named(name, params_json):
+        """(query, sql, params) for a run_named call; bad parameters count as an error of the query"""
+        query = queries.get(name)
+        try:
+            params = json.loads(params_json or "{}")
+            if not isinstance(params, dict):
+                raise ValueError("Named query parameters must be an object")
+            sql, params = queries.bind(query, params)
+            return query, sql, params
+        except Exception:
+            queries.query_stats.record(name, 0.0, error=True)
+            raise
+
+    @classmethod
+    def _run_named_read(cls, query, sql, params):
+        try:
+            generation = result_cache.generation()
+            with connection() as conn:
+                return cls._named_select(conn, query, sql, params, generation)
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    @classmethod
+    def _named_select(cls, conn, query, sql, params, generation):
+        """Rows of a named read as JSON text, timed into query_stats"""
+        start = time.perf_counter()
+        try:
+            if query.cache:
+                text = cls._cached_select(conn, sql, params, generation)
+            else:
+                text = cls._select_json(conn, sql, params)
+        except Exception:
+            queries.query_stats.record(query.name, time.perf_counter() - start, error=True)
+            raise
+        queries.query_stats.record(query.name, time.perf_counter() - start)
+        return text
+
+    def _queue_named(self, query, sql, params):
+        """Queues a named write; its time (including the wait for the group commit) is counted when done"""
+        start = time.perf_counter()
+        future = self._queue(sql, params)
+        future.add_done_callback(
+            lambda done: queries.query_stats.record(
+                query.name, time.perf_counter() - start, error=done.exception() is not None
+            )
+        )
+        return future
+
+    # --------------------------------------------------
+    # Cursors (chunked reads)
+    # --------------------------------------------------
+    @pyqtSlot(str, str, str, result=str)
+    @instrumented
+    def open_cursor(self, sql_query, params_json, layout):
+        """
+        Start a SELECT whose rows are then read with fetch_chunk.
+        params_json is a JSON array of parameter values (or "" for none);
+        layout is "objects" (default) or "rows" (value arrays, as in
+        execute_compact). Returns JSON with success, cursor (the handle) and
+        columns.
+        """
+        try:
+            if not self._is_select(sql_query):
+                return json.dumps({"success": False, "error": "Cursors are only opened for SELECT queries"})
+            params = self._parse_params(params_json or "[]")
+            with metrics.phase("execute"):
+                handle, columns = cursor_registry.open(sql_query, params, layout or "objects")
+            return json.dumps({"success": True, "cursor": handle, "columns": columns})
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+
+    @pyqtSlot(str, int, result=str)
+    @instrumented
+    def fetch_chunk(self, handle, size):
+        """
+        Next rows of an open cursor (at most size, capped by the registry).
+        Returns JSON with success, rows and done; the cursor is released
+        once done is true.
+        """
+        try:
+            rows, done = cursor_registry.fetch(handle, size)
+            metrics.add_rows(len(rows))
+            return json.dumps({"success": True, "rows": rows, "done": done})
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+
+    @pyqtSlot(str, result=str)
+    @instrumented
+    def close_cursor(self, handle):
+        """Release a cursor before its last chunk (e.g. the page stopped reading)"""
+        try:
+            return json.dumps({"success": True, "closed": cursor_registry.close(handle)})
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+
+    @pyqtSlot(str, str, str, result=str)
+    @instrumented
+    def execute_date_range(self, sql_query, date_from, date_to):
+        """
+        Execute a reporting SELECT restricted to an order date range.
+        sql_query contains a {date_filter} placeholder ({date_filter:o} when
+        orders is aliased), replaced by a parameterized, index-friendly
+        condition on order_date. Empty bounds are left open.
+        Returns array of objects (rows as dicts).
+        """
+        try:
+            sql, params = apply_date_filter(sql_query, date_from, date_to)
+            with connection() as conn:
+                return self._select_json(conn, sql, params)
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    @pyqtSlot(str, str, result=str)
+    @instrumented
+    def execute_cached(self, sql_query, params_json):
+        """
+        Execute a SELECT with parameters through the result cache.
+        params_json is a JSON array of parameter values (or an object for
+        named parameters). Statements whose result depends on the clock
+        ('now') are run uncached. Returns array of objects (rows as dicts).
+        """
+        try:
+            params = json.loads(params_json or "[]")
             if params is None:
                 params = []
-            elif not isinstance(params, (list, tuple)):
+            elif not isinstance(params, (list, dict)):
                 params = [params]
+            generation = result_cache.generation()
+            with connection() as conn:
+                return self._cached_select(conn, sql_query, params, generation)
+        except Exception as e:
+            return json.dumps({"error": str(e)})
 
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute(sql_query, params)
-
-            # Check if it's a SELECT query
-            if sql_query.strip().upper().startswith("SELECT"):
-                if cursor.description:
-                    columns = [d[0] for d in cursor.description]
-                    rows = cursor.fetchall()
-                    result = [dict(zip(columns, row)) for row in rows]
-                else:
-                    result = []
-                conn.close()
-                return json.dumps(result)
-            else:
-                affected_rows = cursor.rowcount
-                last_insert_id = cursor.lastrowid
-                conn.commit()
-                conn.close()
-                return json.dumps(
-                    {
-                        "success": True,
-                        "affected_rows": affected_rows,
-                        "last_insert_id": last_insert_id,
-                    }
-                )
+    @pyqtSlot(result=str)
+    def get_metrics(self):
+        """
+        Slot metrics of every instrumented backend (calls, errors, p50/p95/p99
+        latency, rows, bytes, time per phase), the slow-query log with each
+        statement's EXPLAIN QUERY PLAN, and the slow-query threshold.
+        "DatabaseBackend.write" is the time from queueing a write to its
+        group commit. *_async calls are counted under the synchronous slot.
+        """
+        try:
+            return json.dumps({"success": True, **metrics.snapshot()})
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+
+    @pyqtSlot(result=str)
+    def cache_stats(self):
+        """Result cache counters: hits, misses, hit_rate, evictions, invalidations, entries, bytes"""
+        try:
+            return json.dumps({"success": True, "stats": result_cache.stats()})
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+
+    @staticmethod
+    def _select_json(conn, sql, params, layout="objects"):
+        with metrics.statement(conn, sql, params):
+            with metrics.phase("execute"):
+                cursor = conn.execute(sql, params)
+            return encode_result(cursor, layout)
+
+    @classmethod
+    def _cached_select(cls, conn, sql, params, generation, layout="objects"):
+        """
+        Rows of a read query as JSON text, from the result cache when possible.
+        generation is taken before the snapshot the query reads was opened.
+        """
+        info = result_cache.statement_info(conn, sql, params)
+        if info.writes:
+            raise ValueError("Only read queries can be cached")
+        if not info.cacheable:
+            return cls._select_json(conn, sql, params, layout)
+
+        key = result_cache.make_key(sql, params, layout)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return cached
+
+        text = cls._select_json(conn, sql, params, layout)
+        result_cache.put(key, text, info.reads, generation)
+        return text
+
+    @pyqtSlot(str, result=str)
+    @instrumented
+    def execute_batch(self, queries_json):
+        """
+        Execute several read queries in one call.
+        queries_json is a JSON array of {sql, params, date_from, date_to, cache, layout},
+        or of {name, params} for a read registered in database.queries;
+        params is an optional array (or object for named parameters) and
+        date_from/date_to, when present, expand a {date_filter} placeholder as
+        in execute_date_range. Entries with cache: true go through the result
+        cache; layout ("objects", "rows" or "columns") picks the result
+        encoding as in execute_compact. All queries run on one connection inside a single read
+        transaction, so the results share one consistent snapshot.
+        Returns {"success": true, "results": [...]} where each entry is an
+        array of row objects (or the requested compact layout), or
+        {"error": ...} for a query that failed.
+        Writes are rejected.
+        """
+        try:
+            queries = json.loads(queries_json or "[]")
+            if not isinstance(queries, list):
+                return json.dumps({"success": False, "error": "Batch must be an array of queries"})
+
+            results = []
+            generation = result_cache.generation()
+            with connection() as conn:
+                conn.execute("PRAGMA query_only = ON")
+                try:
+                    conn.execute("BEGIN")
+                    for query in queries:
+                        results.append(self._run_batch_query(conn, query, generation))
+                    conn.rollback()
+                finally:
+                    conn.execute("PRAGMA query_only = OFF")
+
+            # Entries are already JSON text (cached results are stored serialized)
+            return '{"success": true, "results": [' + ", ".join(results) + "]}"
         except Exception as e:
             return json.dumps({"success": False, "error": str(e)})
+
+    @classmethod
+    def _run_batch_query(cls, conn, query, generation):
+        """Runs one execute_batch entry and returns its JSON; errors are returned, not raised"""
+        try:
+            if query.get("name"):
+                return cls._run_batch_named(conn, query, generation)
+            sql = query.get("sql") or ""
+            params = query.get("params")
+            if params is None:
+                params = []
+            elif not isinstance(params, (list, dict)):
+                params = [params]
+
+            if "date_from" in query or "date_to" in query:
+                sql, range_params = apply_date_filter(sql, query.get("date_from"), query.get("date_to"))
+                if range_params:
+                    if isinstance(params, list) and params:
+                        raise ValueError("Date-range queries take named parameters only")
+                    params = {**(params or {}), **range_params}
+
+            layout = query.get("layout") or "objects"
+            if query.get("cache"):
+                return cls._cached_select(conn, sql, params, generation, layout)
+            return cls._select_json(conn, sql, params, layout)
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+    @classmethod
+    def _run_batch_named(cls, conn, entry, generation):
+        """An execute_batch entry that names a registered read query"""
+        name = entry["name"]
+        query, sql, params = cls._bind_named(name, json.dumps(entry.get("params") or {}))
+        if query.write:
+            raise ValueError(f"Named query {name} is a write and cannot run in a batch")
+        return cls._named_select(conn, query, sql, params, generation)
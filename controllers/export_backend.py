@@ -0,0 +1,99 @@
+import json
+import threading
+import uuid
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from database.db import connection
+from database.executor import DatabaseExecutor
+from database.export import DEFAULT_EXPORT_DIR, EXPORT_FORMATS, ExportCancelled, export_orders
+
+
+class ExportBackend(QObject):
+    """
+    Exports orders, order items and payments for a date range to CSV or
+    JSONL files. The export streams on its own background thread and read
+    connection (see database.export), so memory stays flat however many
+    rows are written and a long export never holds one of the page readers
+    of database.executor; exports run one at a time. Progress and the
+    outcome are reported via export_progress and export_finished;
+    cancel_export stops an export at its next batch.
+    """
+
+    # export_id, table, rows_done, rows_total
+    export_progress = pyqtSignal(str, str, int, int)
+    # export_id, result JSON
+    export_finished = pyqtSignal(str, str)
+
+    def __init__(self):
+        super().__init__()
+        self._executor = DatabaseExecutor(max_readers=1, name="db-export")
+        self._lock = threading.Lock()
+        self._cancels = {}  # export_id -> Event, while queued or running
+
+    @pyqtSlot(str, str, str, str, result=str)
+    def export_orders(self, date_from, date_to, fmt, directory):
+        """
+        Starts an export for an inclusive YYYY-MM-DD range (either bound may be
+        empty) in fmt ("csv" or "jsonl") to directory ("" for the default).
+        Returns JSON with success and export_id; the files and row counts
+        follow in export_finished.
+        """
+        try:
+            fmt = fmt or "csv"
+            if fmt not in EXPORT_FORMATS:
+                return json.dumps({"success": False, "error": f"Unsupported export format: {fmt}"})
+            export_id = uuid.uuid4().hex
+            target = directory or DEFAULT_EXPORT_DIR
+            with self._lock:
+                self._cancels[export_id] = threading.Event()
+            try:
+                self._executor.submit(self._run, export_id, date_from or None, date_to or None, fmt, target)
+            except Exception:
+                with self._lock:
+                    self._cancels.pop(export_id, None)
+                raise
+            return json.dumps({"success": True, "export_id": export_id, "directory": str(target)})
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+
+    @pyqtSlot(str, result=str)
+    def cancel_export(self, export_id):
+        """Stops a queued or running export; it reports the cancellation via export_finished"""
+        with self._lock:
+            cancel = self._cancels.get(export_id)
+        if cancel is None:
+            return json.dumps({"success": False, "error": "Export not found or already finished"})
+        cancel.set()
+        return json.dumps({"success": True, "export_id": export_id})
+
+    def _run(self, export_id, date_from, date_to, fmt, directory):
+        with self._lock:
+            cancel = self._cancels[export_id]
+
+        def progress(table, done, total):
+            if cancel.is_set():
+                raise ExportCancelled("Export cancelled")
+            self.export_progress.emit(export_id, table, done, total)
+
+        try:
+            if cancel.is_set():
+                raise ExportCancelled("Export cancelled")
+            with connection() as conn:
+                result = export_orders(conn, directory, fmt, date_from, date_to, on_progress=progress)
+            text = json.dumps({"success": True, **result})
+        except Exception as e:
+            text = json.dumps({"success": False, "error": str(e)})
+        finally:
+            with self._lock:
+                self._cancels.pop(export_id, None)
+        self.export_finished.emit(export_id, text)
+
+    def shutdown(self):
+        """
+        Stops running and queued exports at their next batch, so quitting is
+        not held up, and waits for that so the export connection is idle
+        before database.db.close_connections()
+        """
+        with self._lock:
+            for cancel in self._cancels.values():
+                cancel.set()
+        self._executor.shutdown(wait=True)
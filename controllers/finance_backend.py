@@ -0,0 +1,60 @@
+import json
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from database.db import connection
+from database.executor import db_executor
+from database.query_cache import result_cache
+from database.reports import FINANCE_BUCKETS_SQL, FINANCE_PAYMENTS_SQL, apply_date_filter, finance_summary
+
+
+class FinanceBackend(QObject):
+    """
+    Backend for the finance page.
+    One bridge call returns every KPI and chart series for a date range,
+    read from the daily sales rollups. Summaries are kept in the result
+    cache until a write touches the rollups they read. summary_async runs
+    on the database executor and answers through query_finished(request_id,
+    result), like DatabaseBackend's *_async slots.
+    """
+
+    # request_id, result JSON
+    query_finished = pyqtSignal(str, str)
+
+    @pyqtSlot(str, str, str)
+    def summary_async(self, request_id, date_from, date_to):
+        try:
+            db_executor.submit(
+                self.summary, date_from, date_to,
+                on_done=lambda result: self.query_finished.emit(request_id, result),
+            )
+        except RuntimeError as e:  # executor shut down
+            self.query_finished.emit(request_id, json.dumps({"success": False, "error": str(e)}))
+
+    @pyqtSlot(str, str, result=str)
+    def summary(self, date_from, date_to):
+        """
+        Finance summary for an inclusive YYYY-MM-DD range (either bound may be empty).
+        Returns JSON with success and summary (see database.reports.finance_summary).
+        """
+        try:
+            key = result_cache.make_key("finance_summary", [date_from, date_to])
+            cached = result_cache.get(key)
+            if cached is not None:
+                return cached
+
+            generation = result_cache.generation()
+            with connection() as conn:
+                # Both aggregates read the same snapshot
+                conn.execute("BEGIN")
+                try:
+                    result = finance_summary(conn, date_from, date_to)
+                finally:
+                    conn.rollback()
+                tables = set()
+                for sql in (FINANCE_BUCKETS_SQL, FINANCE_PAYMENTS_SQL):
+                    tables |= result_cache.statement_info(conn, *apply_date_filter(sql, None, None)).reads
+
+            text = json.dumps({"success": True, "summary": result})
+            result_cache.put(key, text, frozenset(tables), generation)
+            return text
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
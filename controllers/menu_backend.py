@@ -1,6 +1,16 @@
 import json
-from PyQt6.QtCore import QObject, pyqtSlot
-from database.db import get_connection
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from database.db import connection
+from database.executor import db_executor
+from database.group_commit import group_writer
+from database.menu_catalog import catalog
+from database.query_cache import result_cache
+from database.result_format import encode_result
+from utils.metrics import instrumented, metrics
+
+
+def _execute(conn, sql, params):
+    conn.execute(sql, params)
 
 
 class MenuBackend(QObject):
@@ -8,89 +18,108 @@ class MenuBackend(QObject):
     Backend for menu operations using direct database access.
     Note: Most JavaScript code now uses dbBackend directly, but this is kept
     for backward compatibility and potential future use.
+    get_menu_async runs on the database executor and answers through
+    query_finished(request_id, result), like DatabaseBackend's *_async slots.
+    Slots are instrumented like DatabaseBackend's (see its get_metrics).
     """
 
-    @pyqtSlot(result=str)
-    def get_menu_items(self):
-        """Return all menu items as JSON string"""
+    # request_id, result JSON
+    query_finished = pyqtSignal(str, str)
+
+    @pyqtSlot(str, int)
+    def get_menu_async(self, request_id, since_version):
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, name, category, price, is_available FROM menu_items ORDER BY category, name"
+            db_executor.submit(
+                self.get_menu, since_version,
+                on_done=lambda result: self.query_finished.emit(request_id, result),
             )
+        except RuntimeError as e:  # executor shut down
+            self.query_finished.emit(request_id, json.dumps({"success": False, "error": str(e)}))
 
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            result = [dict(zip(columns, row)) for row in rows]
+    @pyqtSlot(int, result=str)
+    @instrumented
+    def get_menu(self, since_version):
+        """
+        Full menu snapshot (deals expanded), or a "not modified" reply if the
+        caller's copy (since_version; pass -1 for none) is still current.
+        """
+        try:
+            with connection() as conn:
+                return catalog.get(conn, since_version)
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
 
-            conn.close()
-            return json.dumps(result)
+    @pyqtSlot(result=str)
+    @instrumented
+    def get_menu_items(self):
+        """Return all menu items as JSON string"""
+        try:
+            with connection() as conn:
+                with metrics.phase("execute"):
+                    cursor = conn.execute(
+                        "SELECT id, name, category, price, is_available FROM menu_items ORDER BY category, name"
+                    )
+                return encode_result(cursor)
         except Exception as e:
             return json.dumps({"error": str(e)})
 
     @pyqtSlot(int, result=str)
+    @instrumented
     def get_item(self, item_id):
         """Get a single item by id"""
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, name, category, price, is_available FROM menu_items WHERE id = ?",
-                (item_id,),
-            )
+            with connection() as conn:
+                cursor = conn.execute(
+                    "SELECT id, name, category, price, is_available FROM menu_items WHERE id = ?",
+                    (item_id,),
+                )
 
-            columns = [description[0] for description in cursor.description]
-            row = cursor.fetchone()
+                columns = [description[0] for description in cursor.description]
+                row = cursor.fetchone()
 
             if row:
                 result = dict(zip(columns, row))
             else:
                 result = None
 
-            conn.close()
             return json.dumps(result)
         except Exception as e:
             return json.dumps({"error": str(e)})
 
     @pyqtSlot(str, str, float)
+    @instrumented
     def add_item(self, name, category, price):
         """Add a new menu item"""
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
+            group_writer.call(
+                _execute,
                 "INSERT INTO menu_items (name, category, price, is_available) VALUES (?, ?, ?, 1)",
                 (name, category, price),
             )
-            conn.commit()
-            conn.close()
+            result_cache.invalidate_tables(("menu_items",))
         except Exception as e:
             print(f"Error adding menu item: {e}")
 
     @pyqtSlot(int, str, str, float)
+    @instrumented
     def update_item(self, item_id, name, category, price):
         """Update an existing menu item"""
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
+            group_writer.call(
+                _execute,
                 "UPDATE menu_items SET name = ?, category = ?, price = ? WHERE id = ?",
                 (name, category, price, item_id),
             )
-            conn.commit()
-            conn.close()
+            result_cache.invalidate_tables(("menu_items",))
         except Exception as e:
             print(f"Error updating menu item: {e}")
 
     @pyqtSlot(int)
+    @instrumented
     def delete_item(self, item_id):
         """Delete a menu item"""
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM menu_items WHERE id = ?", (item_id,))
-            conn.commit()
-            conn.close()
+            group_writer.call(_execute, "DELETE FROM menu_items WHERE id = ?", (item_id,))
+            result_cache.invalidate_tables(("menu_items",))
         except Exception as e:
             print(f"Error deleting menu item: {e}")
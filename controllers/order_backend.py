@@ -0,0 +1,126 @@
+import json
+from concurrent.futures import Future
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from database import orders
+from database.db import connection
+from database.executor import db_executor
+from database.group_commit import group_writer
+from database.query_cache import result_cache
+from database.rollups import ROLLUP_TABLES
+
+_ORDER_TABLES = ("orders", "order_items") + ROLLUP_TABLES
+
+
+def _update_order(conn, order_id, order):
+    return order_id, orders.update_order(conn, order_id, order)
+
+
+class OrderBackend(QObject):
+    """
+    Backend for placing orders.
+    One bridge call validates the cart and writes the order and all of its
+    items in a single transaction. The write goes through the group-commit
+    writer, so orders placed at the same moment on several terminals share
+    one commit.
+
+    update_order saves an edit of an existing order the same way: the
+    backend recomputes the total and balance and replaces the items in one
+    transaction.
+
+    list_orders pages through order history (keyset pagination).
+
+    place_order, update_order and list_orders have *_async variants taking a
+    leading request_id, like DatabaseBackend's: they return immediately and
+    answer through query_finished(request_id, result), so a busy writer never
+    blocks the GUI thread.
+    """
+
+    # request_id, result JSON
+    query_finished = pyqtSignal(str, str)
+
+    @pyqtSlot(str, result=str)
+    def place_order(self, order_json):
+        """
+        Place an order from a JSON object:
+        {order_type, items: [{menu_item_id, quantity, price}], discount_percentage,
+         customer_name, customer_phone, customer_address, table_number,
+         order_note, amount_received}
+        Returns JSON with success, order_id and the stored total.
+        """
+        return self._order_reply(self._queue(order_json, orders.write_order))
+
+    @pyqtSlot(str, str)
+    def place_order_async(self, request_id, order_json):
+        self._submit_write(request_id, self._queue(order_json, orders.write_order))
+
+    @pyqtSlot(int, str, result=str)
+    def update_order(self, order_id, order_json):
+        """
+        Save an edited order from a JSON object:
+        {items: [{menu_item_id, quantity, price}], discount_percentage,
+         order_note, amount_received}
+        Returns JSON with success, order_id and the stored total.
+        """
+        return self._order_reply(self._queue(order_json, _update_order, order_id))
+
+    @pyqtSlot(str, int, str)
+    def update_order_async(self, request_id, order_id, order_json):
+        self._submit_write(request_id, self._queue(order_json, _update_order, order_id))
+
+    def _queue(self, order_json, write, *args):
+        """Future of (order_id, total) for write(conn, *args, order) on the group-commit writer"""
+        try:
+            try:
+                order = json.loads(order_json or "{}")
+            except (json.JSONDecodeError, TypeError) as e:
+                raise ValueError(f"Invalid order JSON: {e}")
+            return group_writer.submit(write, *args, order)
+        except Exception as e:  # bad JSON, or writer stopped
+            future = Future()
+            future.set_exception(e)
+            return future
+
+    def _submit_write(self, request_id, future):
+        """Delivers an order write's reply once its group has committed"""
+        future.add_done_callback(lambda done: self.query_finished.emit(request_id, self._order_reply(done)))
+
+    @staticmethod
+    def _order_reply(future):
+        """Waits for a queued order write; JSON with success, order_id and total"""
+        try:
+            order_id, total = future.result()
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+        result_cache.invalidate_tables(_ORDER_TABLES)
+        return json.dumps({"success": True, "order_id": order_id, "total": total})
+
+    @pyqtSlot(str, str, int, result=str)
+    def list_orders(self, filters_json, cursor, page_size):
+        """
+        One page of orders, newest first (see database.orders.list_orders).
+        filters_json: {order_type, order_status, date_from, date_to, with_total};
+        cursor: "" for the first page, else next_cursor / prev_cursor of a
+        previous page. Returns JSON with success, orders, next_cursor,
+        prev_cursor and estimated_total.
+        """
+        try:
+            filters = json.loads(filters_json or "{}")
+            if not isinstance(filters, dict):
+                return json.dumps({"success": False, "error": "Filters must be an object"})
+            with connection() as conn:
+                page = orders.list_orders(
+                    conn, filters, cursor or None, page_size, with_total=bool(filters.get("with_total"))
+                )
+            return json.dumps({"success": True, **page})
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
+
+    @pyqtSlot(str, str, str, int)
+    def list_orders_async(self, request_id, filters_json, cursor, page_size):
+        try:
+            db_executor.submit(
+                self.list_orders, filters_json, cursor, page_size,
+                on_done=lambda result: self.query_finished.emit(request_id, result),
+            )
+        except RuntimeError as e:  # executor shut down
+            self.query_finished.emit(request_id, json.dumps({"success": False, "error": str(e)}))
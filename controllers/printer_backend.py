@@ -1,21 +1,65 @@
-from PyQt6.QtCore import QObject, pyqtSlot
-import win32print
+import json
+import os
 import sys
 from pathlib import Path
-from PIL import Image
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from utils import escpos
+from utils.print_spooler import FAILED, PrintSpooler, SpoolerFull
+from utils.metrics import instrumented, metrics
+from utils.printer_transports import default_printer_uri, transport_from_uri
 
 
 class PrinterBackend(QObject):
+    """
+    Receipt printing. print_receipt() assembles the receipt into one buffer
+    and hands it to a background print spooler, so a slow or offline printer
+    never blocks the GUI thread. Job progress is reported via print_status.
+
+    The printer is chosen by the CRAVEHUB_PRINTER URI (see
+    utils.printer_transports); the Windows default printer is used on Windows
+    when it is not set.
+
+    print_receipt is instrumented (utils.metrics), with its time split into
+    "render" (logo and ESC/POS bytes) and "spool" (queueing the job).
+    """
+
+    # job_id, status (queued / printing / retrying / done / failed), error
+    print_status = pyqtSignal(str, str, str)
+
     def __init__(self):
         super().__init__()
 
-        if sys.platform != "win32":
-            raise RuntimeError("Thermal printing supported on Windows only")
-
-        self.printer_name = win32print.GetDefaultPrinter()
         # 80mm paper: 576 dots @ 24/mm (common); 384 is narrower fallback
         self.RECEIPT_WIDTH = 384
         self.LOGO_WIDTH = 576   # Full 80mm for logo so it prints bigger
+        # Floyd-Steinberg dithering keeps gradients in photo-like logos; off = hard threshold
+        self.LOGO_DITHER = os.environ.get("CRAVEHUB_LOGO_DITHER", "0") == "1"
+        # Where the logo lives: "raster" (sent every receipt, any printer),
+        # "download" (uploaded once per session) or "nv" (uploaded once per printer).
+        # Printers without GS ( L graphics support must stay on "raster".
+        logo_storage = os.environ.get("CRAVEHUB_LOGO_STORAGE", "raster")
+        if logo_storage not in escpos.LOGO_STORAGE_MODES:
+            print(f"Unknown CRAVEHUB_LOGO_STORAGE {logo_storage!r}, using raster")
+            logo_storage = "raster"
+        self.logo_store = escpos.LogoStore(
+            logo_storage, state_file=escpos.DEFAULT_CACHE_DIR / "nv_logos.json"
+        )
+
+        self.printer_uri = os.environ.get("CRAVEHUB_PRINTER") or default_printer_uri()
+        self.spooler = None
+        self.printer_error = None
+        if self.printer_uri:
+            try:
+                transport = transport_from_uri(self.printer_uri)
+                self.printer_name = transport.name
+                self.spooler = PrintSpooler(transport, on_status=self._on_job_status)
+            except Exception as e:
+                self.printer_error = f"Printer unavailable ({self.printer_uri}): {e}"
+        else:
+            self.printer_error = "No receipt printer configured (set CRAVEHUB_PRINTER)"
+        if self.printer_error:
+            print(self.printer_error)
+            self.printer_name = None
 
     # --------------------------------------------------
     # Resolve logo path (works in dev + PyInstaller)
@@ -33,107 +77,52 @@ class PrinterBackend(QObject):
         return None
 
     # --------------------------------------------------
-    # Convert image → ESC/POS raster (GS v 0)
+    # Convert image → ESC/POS raster (GS v 0), cached
     # --------------------------------------------------
     def _image_to_escpos(self, image_path):
         try:
-            # ---------- Load image ----------
-            img = Image.open(image_path)
-
-            # Remove transparency
-            if img.mode == "RGBA":
-                bg = Image.new("RGB", img.size, (255, 255, 255))
-                bg.paste(img, mask=img.split()[3])
-                img = bg
-
-            # Convert to grayscale
-            img = img.convert("L")
-
-            # ---------- Resize logo to full 80mm width (bigger on paper) ----------
-            target_width = self.LOGO_WIDTH  # 576 = full 80mm
-            w, h = img.size
-            ratio = target_width / w
-            new_h = int(h * ratio)
-
-            try:
-                img = img.resize((target_width, new_h), Image.Resampling.LANCZOS)
-            except AttributeError:
-                img = img.resize((target_width, new_h), Image.LANCZOS)
-
-            # ---------- No extra space above/below logo; use logo at natural height ----------
-
-            # ---------- Convert to pure B/W ----------
-            img = img.point(lambda p: 0 if p < 128 else 255, mode="1")
-
-            width, height = img.size
-            bytes_per_row = (width + 7) // 8
-
-            # ---------- ESC/POS: GS v 0 ----------
-            xL = bytes_per_row & 0xFF
-            xH = (bytes_per_row >> 8) & 0xFF
-            yL = height & 0xFF
-            yH = (height >> 8) & 0xFF
-
-            escpos = bytearray()
-            escpos.extend(b"\x1D\x76\x30\x00")  # GS v 0 m=0
-            escpos.extend(bytes([xL, xH, yL, yH]))
-
-            pixels = img.load()
-            for y in range(height):
-                for x in range(0, width, 8):
-                    byte = 0
-                    for b in range(8):
-                        if x + b < width and pixels[x + b, y] == 0:
-                            byte |= (1 << (7 - b))
-                    escpos.append(byte)
-
-            return bytes(escpos)
-
+            return escpos.logo_raster(image_path, self.LOGO_WIDTH, dither=self.LOGO_DITHER)
         except Exception as e:
             print("ESC/POS image error:", e)
             return None
 
     # --------------------------------------------------
-    # Print receipt
+    # Print receipt (queued; returns as soon as the job is accepted)
     # --------------------------------------------------
     @pyqtSlot(str, result=str)
+    @instrumented
     def print_receipt(self, text):
         try:
-            hPrinter = win32print.OpenPrinter(self.printer_name)
-
-            win32print.StartDocPrinter(hPrinter, 1, ("CraveHub Receipt", None, "RAW"))
-            win32print.StartPagePrinter(hPrinter)
-
-            # ---------- RESET printer state (minimal - avoid half-width/squeezed print) ----------
-            win32print.WritePrinter(hPrinter, b"\x1B\x40")  # ESC @ (reset)
-            win32print.WritePrinter(hPrinter, b"\x1B\x32")  # ESC 2 = default line spacing
-            # Do NOT set GS W (width) or GS L (margin) - use printer default full width
-            win32print.WritePrinter(hPrinter, b"\x1B\x61\x00")  # Align LEFT
-
-            # ---------- Print logo ----------
-            logo_path = self._get_logo_path()
-            if logo_path:
-                logo_data = self._image_to_escpos(logo_path)
-                if logo_data:
-                    win32print.WritePrinter(hPrinter, logo_data)
-                    win32print.WritePrinter(hPrinter, b"\n\n")
-
-            # ---------- Print text ----------
-            win32print.WritePrinter(
-                hPrinter,
-                text.encode("cp437", errors="replace")
-            )
-
-            # ---------- Feed paper so full receipt prints, then cut ----------
-            win32print.WritePrinter(hPrinter, b"\n\n\n\n\n")  # Extra feed so bottom isn't cut off
-            win32print.WritePrinter(hPrinter, b"\x1B\x32")     # Reset to default line spacing before cut
-            win32print.WritePrinter(hPrinter, b"\x1D\x56\x41\x10")  # Full cut
-
-            win32print.EndPagePrinter(hPrinter)
-            win32print.EndDocPrinter(hPrinter)
-            win32print.ClosePrinter(hPrinter)
-
-            return '{"success": true}'
-
+            if self.spooler is None:
+                return json.dumps({"success": False, "error": self.printer_error})
+
+            # ---------- Logo: raster, or recalled from printer memory ----------
+            with metrics.phase("render"):
+                logo = b""
+                logo_path = self._get_logo_path()
+                if logo_path:
+                    logo_data = self._image_to_escpos(logo_path)
+                    if logo_data:
+                        logo = self.logo_store.logo_commands(self.printer_name, logo_data)
+                receipt = escpos.receipt_bytes(text, logo)
+
+            with metrics.phase("spool"):
+                job_id = self.spooler.submit(receipt)
+            return json.dumps({"success": True, "queued": True, "job_id": job_id})
+
+        except SpoolerFull as e:
+            return json.dumps({"success": False, "error": str(e), "queue_full": True})
         except Exception as e:
-            return f'{{"success": false, "error": "{e}"}}'
+            return json.dumps({"success": False, "error": str(e)})
+
+    def _on_job_status(self, job_id, status, error):
+        """Spooler callback (worker thread); re-emitted as a Qt signal"""
+        if status == FAILED:
+            # A logo upload in the failed job may not have reached the printer
+            self.logo_store.forget(self.printer_name)
+        self.print_status.emit(job_id, status, error or "")
+
+    def shutdown(self):
+        """Flushes queued receipts (bounded wait) and stops the spooler"""
+        if self.spooler is not None:
+            self.spooler.stop()
@@ -0,0 +1,46 @@
+import json
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from database.db import connection
+from database.executor import db_executor
+from database import orders
+
+
+class ReceiptBackend(QObject):
+    """
+    Backend for receipts and order detail views.
+    One bridge call returns an order, its items and all deal components.
+    get_order_bundle_async runs on the database executor and answers through
+    query_finished(request_id, result), like DatabaseBackend's *_async slots.
+    """
+
+    # request_id, result JSON
+    query_finished = pyqtSignal(str, str)
+
+    @pyqtSlot(str, int)
+    def get_order_bundle_async(self, request_id, order_id):
+        try:
+            db_executor.submit(
+                self.get_order_bundle, order_id,
+                on_done=lambda result: self.query_finished.emit(request_id, result),
+            )
+        except RuntimeError as e:  # executor shut down
+            self.query_finished.emit(request_id, json.dumps({"success": False, "error": str(e)}))
+
+    @pyqtSlot(int, result=str)
+    def get_order_bundle(self, order_id):
+        """
+        Returns JSON with success, order (all columns) and items
+        [{id, menu_item_id, quantity, price, name, category, is_deal, deal_components}].
+        """
+        try:
+            with connection() as conn:
+                conn.execute("BEGIN")
+                try:
+                    bundle = orders.fetch_order_bundle(conn, order_id)
+                finally:
+                    conn.rollback()
+            if bundle is None:
+                return json.dumps({"success": False, "error": "Order not found"})
+            return json.dumps({"success": True, **bundle})
+        except Exception as e:
+            return json.dumps({"success": False, "error": str(e)})
@@ -0,0 +1,153 @@
+"""
+Server-side cursors for reading large results a chunk at a time.
+
+open() runs a read query on a private connection (so any thread may fetch
+from it, and the query keeps reading one consistent snapshot) and returns
+an opaque handle; fetch() returns the next rows, so only one chunk is held
+in memory at a time. A cursor is released by close(), when its last chunk
+has been fetched, after idle_timeout seconds without a fetch, or, when
+max_cursors are open, to make room for a new one (least recently used
+first). Each open cursor pins its connection and snapshot until then.
+"""
+import secrets
+import threading
+import time
+
+from database.db import open_connection
+
+DEFAULT_IDLE_TIMEOUT = 60.0  # seconds
+DEFAULT_MAX_CURSORS = 8
+MAX_CHUNK_ROWS = 5000
+
+# "objects": rows as {column: value}; "rows": rows as value arrays
+CURSOR_LAYOUTS = ("objects", "rows")
+
+
+class _OpenCursor:
+    __slots__ = ("conn", "cursor", "columns", "layout", "lock", "last_used")
+
+    def __init__(self, conn, cursor, layout):
+        self.conn = conn
+        self.cursor = cursor
+        self.columns = [d[0] for d in cursor.description] if cursor.description else []
+        self.layout = layout
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+    def release(self):
+        with self.lock:
+            if self.cursor is None:
+                return
+            try:
+                self.cursor.close()
+                self.conn.close()
+            except Exception:
+                pass
+            self.cursor = None
+
+
+class CursorRegistry:
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT, max_cursors=DEFAULT_MAX_CURSORS):
+        self.idle_timeout = idle_timeout
+        self.max_cursors = max_cursors
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._stop = threading.Event()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cursors)
+
+    def open(self, sql, params=(), layout="objects"):
+        """Starts a read query; returns (handle, column names). Writes are rejected."""
+        if layout not in CURSOR_LAYOUTS:
+            raise ValueError(f"Unknown cursor layout: {layout}")
+        conn = open_connection()
+        try:
+            conn.execute("PRAGMA query_only = ON")
+            cursor = conn.execute(sql, params)
+            if layout == "rows":
+                cursor.row_factory = None
+        except Exception:
+            conn.close()
+            raise
+
+        entry = _OpenCursor(conn, cursor, layout)
+        handle = secrets.token_hex(8)
+        evicted = None
+        with self._lock:
+            if len(self._cursors) >= self.max_cursors:
+                oldest = min(self._cursors, key=lambda h: self._cursors[h].last_used)
+                evicted = self._cursors.pop(oldest)
+            self._cursors[handle] = entry
+            self._start_reaper()
+        if evicted is not None:
+            evicted.release()
+        return handle, entry.columns
+
+    def fetch(self, handle, size):
+        """
+        Next chunk of at most size rows (capped at MAX_CHUNK_ROWS): returns
+        (rows, done). The cursor is released once done.
+        """
+        with self._lock:
+            entry = self._cursors.get(handle)
+        if entry is None:
+            raise ValueError("Unknown or expired cursor")
+
+        size = max(1, min(int(size), MAX_CHUNK_ROWS))
+        with entry.lock:
+            if entry.cursor is None:  # released by another thread meanwhile
+                raise ValueError("Unknown or expired cursor")
+            entry.last_used = time.monotonic()
+            rows = entry.cursor.fetchmany(size)
+        if entry.layout == "objects":
+            rows = [dict(zip(entry.columns, row)) for row in rows]
+
+        done = len(rows) < size
+        if done:
+            self.close(handle)
+        return rows, done
+
+    def close(self, handle):
+        """Releases a cursor; returns False if it was already gone"""
+        with self._lock:
+            entry = self._cursors.pop(handle, None)
+        if entry is None:
+            return False
+        entry.release()
+        return True
+
+    def close_all(self):
+        """Releases every cursor and stops the idle reaper (call on shutdown)"""
+        self._stop.set()
+        with self._lock:
+            entries = list(self._cursors.values())
+            self._cursors.clear()
+        for entry in entries:
+            entry.release()
+
+    def reap(self):
+        """Releases cursors idle for longer than idle_timeout; returns how many"""
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [h for h, entry in self._cursors.items() if entry.last_used < deadline]
+            entries = [self._cursors.pop(h) for h in idle]
+        for entry in entries:
+            entry.release()
+        return len(entries)
+
+    def _start_reaper(self):
+        """Called with _lock held"""
+        if self._reaper is None and not self._stop.is_set():
+            self._reaper = threading.Thread(target=self._reap_idle, name="db-cursor-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_idle(self):
+        interval = max(1.0, self.idle_timeout / 4)
+        while not self._stop.wait(interval):
+            self.reap()
+
+
+cursor_registry = CursorRegistry()
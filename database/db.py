@@ -1,8 +1,15 @@
+import hashlib
+import json
 import sqlite3
 import sys
 import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+from database.migrations import apply_migrations
+from utils.metrics import metrics
+
 # Determine base directory - works for both development and PyInstaller bundle
 if getattr(sys, "frozen", False):
     # Running as compiled executable
@@ -127,172 +134,256 @@ MENU_ITEMS = [
 # ("Deal 7", "Deals", 1150),
 # ("Deal 8", "Deals", 1350)
 ]
-def get_connection():
+# Number of prepared statements sqlite3 keeps per connection. Connections are
+# long-lived, so a larger cache means the frontend's hot queries are parsed once.
+STATEMENT_CACHE_SIZE = 256
+
+# PRAGMA profiles applied to every new connection. Both use WAL so the
+# finance/dashboard readers never block the cashier's writes.
+#   safe: fsync on every commit (synchronous=FULL), no memory mapping.
+#   fast: synchronous=NORMAL - commits survive an application crash, but the
+#         last few may be lost on power failure; larger cache and mmap reads.
+# Checkpoint policy: SQLite checkpoints passively once the WAL reaches
+# wal_autocheckpoint pages, journal_size_limit truncates the WAL file after
+# that, and close_connections() runs a TRUNCATE checkpoint on shutdown.
+PERFORMANCE_PROFILES = {
+    "safe": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,  # KiB
+        "temp_store": "MEMORY",
+        "mmap_size": 0,
+        "wal_autocheckpoint": 1000,  # pages
+        "journal_size_limit": 16 * 1024 * 1024,
+    },
+    "fast": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,  # KiB
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024,
+        "wal_autocheckpoint": 1000,  # pages
+        "journal_size_limit": 16 * 1024 * 1024,
+    },
+}
+
+# Select with the CRAVEHUB_DB_PROFILE environment variable or set_performance_profile()
+PERFORMANCE_PROFILE = os.environ.get("CRAVEHUB_DB_PROFILE", "fast")
+
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pool_generation = 0
+_open_connections = []
+
+
+def open_connection():
     """
-    Returns a SQLite connection and ensures schema is initialized.
-    Database is stored next to the executable in production, or in project root in development.
+    Opens a new, private SQLite connection and ensures schema is initialized.
+    The caller owns the connection and must close it. Backends should use
+    connection() instead, which reuses a long-lived per-thread connection.
     """
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = sqlite3.connect(
+        str(DB_PATH),
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,
+    )
     conn.row_factory = sqlite3.Row
+    _apply_performance_profile(conn)
     _initialize_db(conn)
     return conn
 
 
-def _seed_menu_items(conn):
+def _apply_performance_profile(conn):
+    """Applies the PRAGMAs of the selected performance profile to a connection"""
+    try:
+        profile = PERFORMANCE_PROFILES[PERFORMANCE_PROFILE]
+    except KeyError:
+        raise ValueError(f"Unknown database performance profile: {PERFORMANCE_PROFILE}")
+    for pragma, value in profile.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+
+def set_performance_profile(name):
     """
-    Seeds menu items into the database if they don't already exist.
-    This is called automatically during database initialization.
-    Adds any missing items from MENU_ITEMS to the database.
+    Switches between the "safe" and "fast" PRAGMA profiles.
+    Pooled connections are retired so every thread reopens with the new profile.
     """
-    cursor = conn.cursor()
-
-    # Get existing menu item names for quick lookup
-    cursor.execute("SELECT name FROM menu_items")
-    existing_names = {row[0] for row in cursor.fetchall()}
-
-    # Insert menu items that don't exist
-    inserted_count = 0
-    for name, category, price in MENU_ITEMS:
-        if name not in existing_names:
-            try:
-                cursor.execute(
-                    "INSERT INTO menu_items (name, category, price, is_available) VALUES (?, ?, ?, 1)",
-                    (name, category, price),
-                )
-                inserted_count += 1
-            except sqlite3.IntegrityError:
-                # Item already exists (shouldn't happen, but handle gracefully)
-                pass
-
-    if inserted_count > 0:
-        conn.commit()
+    global PERFORMANCE_PROFILE
+    if name not in PERFORMANCE_PROFILES:
+        raise ValueError(f"Unknown database performance profile: {name}")
+    PERFORMANCE_PROFILE = name
+    reset_connections()
 
 
-def _initialize_db(conn):
+def checkpoint(mode="PASSIVE"):
     """
-    Creates tables if they do not exist and seeds initial menu items.
-    Runs only once per database.
+    Runs a WAL checkpoint on the calling thread's connection.
+    PASSIVE never blocks readers or writers; TRUNCATE also resets the WAL file.
+    Returns (busy, wal_pages, checkpointed_pages).
     """
-    cursor = conn.cursor()
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"Unknown checkpoint mode: {mode}")
+    return tuple(get_connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+
 
-    cursor.execute(
-        """
-        SELECT name FROM sqlite_master
-        WHERE type='table' AND name='users';
+def get_connection():
     """
-    )
+    Returns the calling thread's long-lived SQLite connection, opening it on first use.
+    Database is stored next to the executable in production, or in project root in development.
+    The connection is shared by every caller on the thread: do not close it.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.generation == _pool_generation:
+        return conn
 
-    db_initialized = cursor.fetchone() is not None
+    if conn is not None:
+        # Retired by reset_connections(); only this thread uses it, so close it here
+        _local.conn = None
+        with _pool_lock:
+            if conn in _open_connections:
+                _open_connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
 
-    if not db_initialized:
-        # First time initialization - create tables
-        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-            conn.executescript(f.read())
-        conn.commit()
+    conn = open_connection()
+    with _pool_lock:
+        _open_connections.append(conn)
+        _local.conn = conn
+        _local.generation = _pool_generation
+    return conn
 
-        # Seed menu items after schema is created
-        _seed_menu_items(conn)
+
+@contextmanager
+def connection():
+    """
+    Context manager around the thread's pooled connection.
+    Commits on success and rolls back if the block raises, so each
+    with-block is one transaction. The connection stays open afterwards.
+    """
+    with metrics.phase("connect"):
+        conn = get_connection()
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
     else:
-        # Database exists, but check if menu items need seeding
-        # (in case schema was created manually without menu items)
-        _seed_menu_items(conn)
-        
-        # Add discount_percentage column if it doesn't exist (migration)
-        try:
-            cursor.execute("ALTER TABLE orders ADD COLUMN discount_percentage REAL DEFAULT 0")
-            conn.commit()
-        except sqlite3.OperationalError:
-            # Column already exists, ignore
-            pass
-        
-        # Add customer_address column if it doesn't exist (migration)
-        try:
-            cursor.execute("ALTER TABLE orders ADD COLUMN customer_address TEXT")
-            conn.commit()
-        except sqlite3.OperationalError:
-            # Column already exists, ignore
-            pass
-        
-        # Add order_note column if it doesn't exist (migration)
-        try:
-            cursor.execute("ALTER TABLE orders ADD COLUMN order_note TEXT")
+        if conn.in_transaction:
             conn.commit()
-        except sqlite3.OperationalError:
-            # Column already exists, ignore
-            pass
 
-        # Add amount_received and balance_return for receipt (given/return)
-        try:
-            cursor.execute("ALTER TABLE orders ADD COLUMN amount_received REAL")
-            conn.commit()
-        except sqlite3.OperationalError:
-            pass
+
+def reset_connections():
+    """
+    Retires every pooled connection (after changing DB_PATH or the profile).
+    Connections may be in use on their threads, so none is closed here: each
+    thread closes its own and opens a new one on its next get_connection().
+    """
+    global _pool_generation
+    with _pool_lock:
+        _pool_generation += 1
+
+
+def pool_generation():
+    """Bumped whenever the pooled connections are retired or closed"""
+    return _pool_generation
+
+
+def close_connections():
+    """
+    Closes every pooled connection, from the calling thread. Shutdown only:
+    call it after db_executor.shutdown() and group_writer.stop(), once no
+    other thread can be using a connection. At runtime use reset_connections().
+    """
+    global _pool_generation
+    with _pool_lock:
+        _pool_generation += 1
+        connections = list(_open_connections)
+        _open_connections.clear()
+    if connections:
+        # Refresh planner statistics where useful, and fold the WAL back into
+        # the database file so it does not grow across sessions
         try:
-            cursor.execute("ALTER TABLE orders ADD COLUMN balance_return REAL")
-            conn.commit()
-        except sqlite3.OperationalError:
+            connections[0].execute("PRAGMA optimize")
+            connections[0].execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
             pass
-        
-        # Add is_deal column to menu_items if it doesn't exist (migration)
+    for conn in connections:
         try:
-            cursor.execute("ALTER TABLE menu_items ADD COLUMN is_deal INTEGER DEFAULT 0")
-            conn.commit()
-        except sqlite3.OperationalError:
+            conn.close()
+        except sqlite3.Error:
             pass
-        
-        # Create deal_items table if it doesn't exist (migration)
-        cursor.execute(
-            """
-            SELECT name FROM sqlite_master
-            WHERE type='table' AND name='deal_items';
-            """
-        )
-        if cursor.fetchone() is None:
-            cursor.execute("""
-                CREATE TABLE deal_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    deal_id INTEGER NOT NULL,
-                    menu_item_id INTEGER,
-                    item_name TEXT,
-                    quantity INTEGER DEFAULT 1,
-                    FOREIGN KEY (deal_id) REFERENCES menu_items(id) ON DELETE CASCADE,
-                    FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
-                )
-            """)
-            conn.commit()
-        else:
-            # Add item_name column to existing deal_items if missing
-            try:
-                cursor.execute("ALTER TABLE deal_items ADD COLUMN item_name TEXT")
-                conn.commit()
-            except sqlite3.OperationalError:
-                pass
-            # Make menu_item_id nullable by recreating table (SQLite doesn't support ALTER COLUMN)
-            cursor.execute("PRAGMA table_info(deal_items)")
-            cols = [row[1] for row in cursor.fetchall()]
-            if 'item_name' in cols:
-                cursor.execute(
-                    """
-                    SELECT name FROM sqlite_master
-                    WHERE type='table' AND name='deal_items_new';
-                    """
-                )
-                if cursor.fetchone() is None:
-                    cursor.execute("""
-                        CREATE TABLE deal_items_new (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            deal_id INTEGER NOT NULL,
-                            menu_item_id INTEGER,
-                            item_name TEXT,
-                            quantity INTEGER DEFAULT 1,
-                            FOREIGN KEY (deal_id) REFERENCES menu_items(id) ON DELETE CASCADE,
-                            FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
-                        )
-                    """)
-                    cursor.execute("""
-                        INSERT INTO deal_items_new (id, deal_id, menu_item_id, item_name, quantity)
-                        SELECT id, deal_id, menu_item_id, item_name, quantity FROM deal_items
-                    """)
-                    cursor.execute("DROP TABLE deal_items")
-                    cursor.execute("ALTER TABLE deal_items_new RENAME TO deal_items")
-                    conn.commit()
+
+
+def set_database_path(path):
+    """
+    Points the module at a different database file (used by scripts and benchmarks).
+    """
+    global DB_PATH
+    DB_PATH = Path(path)
+    reset_connections()
+
+
+def _menu_catalog_hash():
+    """Fingerprint of MENU_ITEMS, so seeding only runs when the catalog changes"""
+    payload = json.dumps(MENU_ITEMS, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _seed_menu_items(conn):
+    """
+    Seeds menu items into the database if they don't already exist.
+    Adds any missing items from MENU_ITEMS to the database, but only when
+    MENU_ITEMS differs from the catalog that was last seeded (hash in app_meta).
+    """
+    catalog_hash = _menu_catalog_hash()
+    row = conn.execute(
+        "SELECT value FROM app_meta WHERE key = 'menu_catalog_hash'"
+    ).fetchone()
+    if row is not None and row[0] == catalog_hash:
+        return
+
+    # Get existing menu item names for quick lookup
+    existing_names = {r[0] for r in conn.execute("SELECT name FROM menu_items")}
+
+    missing = [
+        (name, category, price)
+        for name, category, price in MENU_ITEMS
+        if name not in existing_names
+    ]
+    conn.executemany(
+        "INSERT INTO menu_items (name, category, price, is_available) VALUES (?, ?, ?, 1)",
+        missing,
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO app_meta (key, value) VALUES ('menu_catalog_hash', ?)",
+        (catalog_hash,),
+    )
+    conn.commit()
+
+
+_schema_lock = threading.Lock()
+_schema_ready_for = None
+
+
+def _initialize_db(conn):
+    """
+    Applies pending schema migrations and seeds menu items.
+    Runs once per process (per database path); later connections skip it,
+    so the per-query path does no schema work.
+    """
+    global _schema_ready_for
+    if _schema_ready_for == DB_PATH:
+        return
+
+    with _schema_lock:
+        if _schema_ready_for == DB_PATH:
+            return
+        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+            apply_migrations(conn, f.read())
+        _seed_menu_items(conn)
+        _schema_ready_for = DB_PATH
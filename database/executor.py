@@ -0,0 +1,40 @@
+"""
+Background execution of database reads, off the GUI thread.
+
+Reads run on a pool of at most max_readers threads; each worker thread gets
+its own pooled connection from database.db.connection(), so concurrent reads
+proceed in parallel under WAL. Writes go to the single group-commit writer
+(database.group_commit) instead. on_done(result) is called on the worker
+thread when a job finishes.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Cap on concurrently running read queries (CRAVEHUB_DB_READERS)
+DEFAULT_MAX_READERS = int(os.environ.get("CRAVEHUB_DB_READERS", "4"))
+
+
+class DatabaseExecutor:
+    def __init__(self, max_readers=DEFAULT_MAX_READERS, name="db-reader"):
+        self.max_readers = max(1, max_readers)
+        self._readers = ThreadPoolExecutor(self.max_readers, thread_name_prefix=name)
+
+    def submit(self, fn, *args, on_done=None):
+        """
+        Runs fn(*args) on a reader thread.
+        Returns a concurrent.futures.Future; raises RuntimeError after shutdown().
+        """
+        def run():
+            result = fn(*args)
+            if on_done is not None:
+                on_done(result)
+            return result
+
+        return self._readers.submit(run)
+
+    def shutdown(self, wait=True):
+        """Stops accepting work; with wait, lets running reads finish first"""
+        self._readers.shutdown(wait=wait, cancel_futures=True)
+
+
+db_executor = DatabaseExecutor()
@@ -0,0 +1,185 @@
+"""
+Streaming export of orders, order items and payments to CSV or JSONL.
+
+Rows are read in fetchmany() batches and pass through generators straight
+into the output file, so memory use is bounded by the batch size and the
+file buffer, not by the number of rows exported. Each query walks orders in
+(created_at, id) index order and joins its items or payments per order, so
+SQLite never builds a sort (temp_store is in memory under both performance
+profiles). A date range selects orders by day; items and payments follow
+their order's day, as on the finance page.
+
+Every file is written to "<name>.part" and renamed when complete, so an
+interrupted export never leaves a truncated file behind.
+"""
+import csv
+import json
+import os
+from pathlib import Path
+
+from database.reports import created_at_filter
+
+DEFAULT_BATCH_SIZE = 2000
+EXPORT_FORMATS = ("csv", "jsonl")
+
+DEFAULT_EXPORT_DIR = Path.home() / "CraveHub Exports"
+
+# (name, rows SQL, count SQL); {created_filter} is the orders day range from created_at_filter()
+EXPORT_TABLES = (
+    (
+        "orders",
+        """
+        SELECT o.id, o.order_date, o.created_at, o.order_type, o.customer_name, o.customer_phone,
+               o.customer_address, o.table_number, o.total, o.discount_percentage,
+               o.order_status, o.payment_status, o.order_note, o.amount_received, o.balance_return
+        FROM orders o
+        WHERE 1=1 {created_filter}
+        ORDER BY o.created_at, o.id
+        """,
+        "SELECT COUNT(*) FROM orders o WHERE 1=1 {created_filter}",
+    ),
+    (
+        "order_items",
+        """
+        SELECT oi.id, oi.order_id, o.order_date, oi.menu_item_id, mi.name AS item_name,
+               oi.quantity, oi.price, oi.quantity * oi.price AS line_total
+        FROM orders o
+        CROSS JOIN order_items oi ON oi.order_id = o.id
+        LEFT JOIN menu_items mi ON mi.id = oi.menu_item_id
+        WHERE 1=1 {created_filter}
+        ORDER BY o.created_at, o.id, oi.id
+        """,
+        """
+        SELECT COUNT(*) FROM orders o JOIN order_items oi ON oi.order_id = o.id
+        WHERE 1=1 {created_filter}
+        """,
+    ),
+    (
+        "payment_transactions",
+        """
+        SELECT pt.id, pt.order_id, o.order_date, pt.amount, pt.payment_method,
+               pt.payment_status, pt.created_at
+        FROM orders o
+        CROSS JOIN payment_transactions pt ON pt.order_id = o.id
+        WHERE 1=1 {created_filter}
+        ORDER BY o.created_at, o.id, pt.id
+        """,
+        """
+        SELECT COUNT(*) FROM orders o JOIN payment_transactions pt ON pt.order_id = o.id
+        WHERE 1=1 {created_filter}
+        """,
+    ),
+)
+
+
+def iter_batches(conn, sql, params, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yields (columns, rows) for successive fetchmany() batches of a query.
+    The first batch is yielded even when empty, so headers are always written.
+    """
+    cursor = conn.execute(sql, params)
+    columns = [d[0] for d in cursor.description]
+    try:
+        rows = cursor.fetchmany(batch_size)
+        yield columns, rows
+        while rows:
+            rows = cursor.fetchmany(batch_size)
+            if rows:
+                yield columns, rows
+    finally:
+        cursor.close()
+
+
+def csv_chunks(batches):
+    """CSV text per batch, header first"""
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer, lineterminator="\n")
+    header = True
+    for columns, rows in batches:
+        if header:
+            writer.writerow(columns)
+            header = False
+        writer.writerows(rows)
+        yield buffer.take(), len(rows)
+
+
+# One encoder for every row: json.dumps() with options builds a new one per call
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def jsonl_chunks(batches):
+    """JSON Lines text per batch, one object per row"""
+    encode = _JSON_ENCODER.encode
+    for columns, rows in batches:
+        text = "".join([encode(dict(zip(columns, row))) + "\n" for row in rows])
+        yield text, len(rows)
+
+
+_FORMATTERS = {"csv": csv_chunks, "jsonl": jsonl_chunks}
+
+
+class ExportCancelled(Exception):
+    """Raised by an on_progress callback to stop an export"""
+
+
+class _LineBuffer:
+    """Minimal file-like target for csv.writer, emptied after every batch"""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, text):
+        self._parts.append(text)
+
+    def take(self):
+        text = "".join(self._parts)
+        self._parts.clear()
+        return text
+
+
+def export_orders(conn, directory=DEFAULT_EXPORT_DIR, fmt="csv", date_from=None, date_to=None,
+                  on_progress=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Writes orders, order_items and payment_transactions for an inclusive
+    YYYY-MM-DD range (either bound may be None) to directory, one file each.
+    All three files are read from the same snapshot.
+    on_progress(table, rows_done, rows_total) is called after every batch; it
+    may raise ExportCancelled to stop (the unfinished file is removed).
+    Returns {"directory", "format", "files": {table: path}, "rows": {table: count}}.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    suffix = f"{date_from or 'start'}_{date_to or 'today'}"
+
+    created_sql, params = created_at_filter(date_from, date_to, alias="o")
+    result = {"directory": str(directory), "format": fmt, "files": {}, "rows": {}}
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN")
+    try:
+        for name, rows_sql, count_sql in EXPORT_TABLES:
+            total = conn.execute(count_sql.format(created_filter=created_sql), params).fetchone()[0]
+            path = directory / f"{name}_{suffix}.{fmt}"
+            partial = path.with_name(path.name + ".part")
+
+            done = 0
+            try:
+                # newline="" so CSV quoting controls line endings on every platform
+                with open(partial, "w", encoding="utf-8", newline="") as out:
+                    for text, count in _FORMATTERS[fmt](iter_batches(conn, rows_sql.format(created_filter=created_sql), params, batch_size)):
+                        out.write(text)
+                        done += count
+                        if on_progress is not None:
+                            on_progress(name, done, total)
+                os.replace(partial, path)
+            except BaseException:
+                partial.unlink(missing_ok=True)
+                raise
+
+            result["files"][name] = str(path)
+            result["rows"][name] = done
+    finally:
+        conn.rollback()
+    return result
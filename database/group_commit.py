@@ -0,0 +1,130 @@
+"""
+Group-commit writer.
+
+Every backend hands its writes to one writer thread instead of committing on
+its own. The writer takes whatever requests are queued, runs them in a
+single transaction and commits once, so a burst of orders from several
+cashiers costs one commit (one WAL sync) instead of one each. Groups form
+from the requests that queue up while the previous commit is syncing; a
+positive `window` also waits that many seconds for more after the first,
+trading latency for larger groups. Each request runs
+inside its own savepoint: a request that raises is rolled back alone and its
+caller gets the exception, while the rest of the group still commits.
+
+A request is fn(conn, *args). It must not begin, commit or roll back.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from database.db import get_connection
+
+DEFAULT_WINDOW = 0.0  # seconds
+DEFAULT_MAX_BATCH = 64
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    def __init__(self, window=DEFAULT_WINDOW, max_batch=DEFAULT_MAX_BATCH):
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stopped = False
+
+    def submit(self, fn, *args):
+        """Queues fn(conn, *args); the Future resolves once its group has committed"""
+        future = Future()
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Database writer is stopped")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="db-group-writer", daemon=True)
+                self._worker.start()
+            self._queue.put((future, fn, args))
+        return future
+
+    def call(self, fn, *args):
+        """submit() and wait: returns fn's result or raises its exception"""
+        return self.submit(fn, *args).result()
+
+    def stop(self):
+        """Commits everything already queued, then stops the writer thread"""
+        with self._lock:
+            self._stopped = True
+            worker = self._worker
+            self._queue.put(_STOP)
+        if worker is not None:
+            worker.join()
+
+    def _next_batch(self):
+        """Blocks for the first request, then collects more until the window closes"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if batch:
+                self._commit(batch)
+
+    def _commit(self, batch):
+        batch = [request for request in batch if request[0].set_running_or_notify_cancel()]
+        outcomes = []
+        conn = None
+        try:
+            conn = get_connection()
+            if conn.in_transaction:
+                conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+            for future, fn, args in batch:
+                conn.execute("SAVEPOINT group_write")
+                try:
+                    value = fn(conn, *args)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO group_write")
+                    conn.execute("RELEASE group_write")
+                    outcomes.append((future, None, e))
+                else:
+                    conn.execute("RELEASE group_write")
+                    outcomes.append((future, value, None))
+            conn.commit()
+        except Exception as e:
+            # BEGIN or COMMIT failed, or a savepoint could not be unwound: nothing was written
+            try:
+                if conn is not None and conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                pass
+            errors = {id(future): error for future, _, error in outcomes if error is not None}
+            outcomes = [(future, None, errors.get(id(future), e)) for future, _, _ in batch]
+
+        self.batches += 1
+        self.requests += len(batch)
+        for future, value, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+
+group_writer = GroupCommitWriter()
@@ -0,0 +1,83 @@
+"""
+Versioned menu catalog snapshot.
+
+The whole menu (every item, with deal components already expanded) is built
+and serialized once per menu version. The version lives in app_meta and is
+bumped by triggers on any menu_items / deal_items write, so checking whether
+a cached snapshot is current costs one primary-key lookup.
+"""
+import json
+import threading
+
+_VERSION_SQL = "SELECT value FROM app_meta WHERE key = 'menu_version'"
+
+MENU_ITEMS_SQL = """
+    SELECT id, name, category, price, is_available, COALESCE(is_deal, 0) AS is_deal
+    FROM menu_items
+    ORDER BY category, name
+"""
+
+DEAL_ITEMS_SQL = """
+    SELECT di.deal_id, di.quantity, COALESCE(di.item_name, mi.name) AS name
+    FROM deal_items di
+    LEFT JOIN menu_items mi ON mi.id = di.menu_item_id
+    ORDER BY di.deal_id, di.id
+"""
+
+
+def menu_version(conn):
+    row = conn.execute(_VERSION_SQL).fetchone()
+    return int(row[0]) if row else 0
+
+
+def build_menu(conn):
+    """All menu items ordered by category and name; deals carry deal_components"""
+    components = {}
+    for row in conn.execute(DEAL_ITEMS_SQL):
+        components.setdefault(row["deal_id"], []).append(
+            {"name": row["name"], "quantity": row["quantity"]}
+        )
+
+    items = []
+    for row in conn.execute(MENU_ITEMS_SQL):
+        item = dict(row)
+        if item["is_deal"]:
+            item["deal_components"] = components.get(item["id"], [])
+        items.append(item)
+    return items
+
+
+class MenuCatalog:
+    """Holds the serialized snapshot for the current menu version"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._blob = None
+
+    def get(self, conn, since_version=None):
+        """
+        JSON reply for a page that holds snapshot since_version:
+        {"success", "version", "not_modified": true} when it is still current,
+        otherwise the cached {"success", "version", "items"} blob.
+        Reads the version and (if needed) the menu in one snapshot of conn.
+        """
+        conn.execute("BEGIN")
+        try:
+            version = menu_version(conn)
+            if since_version is not None and since_version == version:
+                return json.dumps({"success": True, "version": version, "not_modified": True})
+
+            with self._lock:
+                if self._version == version:
+                    return self._blob
+            blob = json.dumps({"success": True, "version": version, "items": build_menu(conn)})
+        finally:
+            conn.rollback()
+
+        with self._lock:
+            self._version, self._blob = version, blob
+        return blob
+
+
+catalog = MenuCatalog()
@@ -0,0 +1,432 @@
+"""
+Schema migrations for cravehub.db.
+
+The schema version is stored in PRAGMA user_version. Version 1 is the
+baseline schema in database/schema.sql; every later change is a numbered
+entry in MIGRATIONS. apply_migrations() runs the pending ones exactly once,
+each in its own transaction, and is called at startup by database.db.
+"""
+import sqlite3
+
+
+def execute_script(conn, script):
+    """
+    Executes a multi-statement SQL script inside the current transaction.
+    (conn.executescript() would COMMIT first, breaking migration atomicity.)
+    """
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if statement.strip():
+                conn.execute(statement)
+            statement = ""
+    if statement.strip():
+        conn.execute(statement)
+
+
+def column_names(conn, table):
+    """Returns the column names of a table"""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def add_column_if_missing(conn, table, column, definition):
+    """Adds a column unless it already exists (databases created before versioning)"""
+    if column not in column_names(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+# --------------------------------------------------
+# Migrations
+# --------------------------------------------------
+def _add_legacy_columns(conn):
+    """Columns that used to be added ad hoc on every connection"""
+    add_column_if_missing(conn, "orders", "discount_percentage", "REAL DEFAULT 0")
+    add_column_if_missing(conn, "orders", "customer_address", "TEXT")
+    add_column_if_missing(conn, "orders", "order_note", "TEXT")
+    add_column_if_missing(conn, "orders", "amount_received", "REAL")
+    add_column_if_missing(conn, "orders", "balance_return", "REAL")
+    add_column_if_missing(conn, "menu_items", "is_deal", "INTEGER DEFAULT 0")
+    add_column_if_missing(conn, "deal_items", "item_name", "TEXT")
+
+
+def _make_deal_menu_item_nullable(conn):
+    """
+    Deal components may be free text (item_name) with no menu item.
+    Older databases declared deal_items.menu_item_id NOT NULL; SQLite cannot
+    ALTER COLUMN, so the table is rebuilt only when that constraint is present.
+    """
+    info = {row[1]: row for row in conn.execute("PRAGMA table_info(deal_items)")}
+    if not info["menu_item_id"][3]:
+        return
+
+    conn.execute(
+        """
+        CREATE TABLE deal_items_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            deal_id INTEGER NOT NULL,
+            menu_item_id INTEGER,
+            item_name TEXT,
+            quantity INTEGER DEFAULT 1,
+            FOREIGN KEY (deal_id) REFERENCES menu_items(id) ON DELETE CASCADE,
+            FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO deal_items_new (id, deal_id, menu_item_id, item_name, quantity)
+        SELECT id, deal_id, menu_item_id, item_name, quantity FROM deal_items
+        """
+    )
+    conn.execute("DROP TABLE deal_items")
+    conn.execute("ALTER TABLE deal_items_new RENAME TO deal_items")
+
+
+def _create_app_meta(conn):
+    """Key/value table for application state such as the seeded menu catalog hash"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS app_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        """
+    )
+
+
+def _add_hot_path_indexes(conn):
+    """
+    Secondary indexes for the order screens and reports:
+    - order lines, deal components and payments looked up by their parent id
+    - per-type order lists sorted by created_at, and date-range reports
+      (expression index so date(created_at) filters can seek)
+    - a partial index holding only open table orders, for the
+      "is this table free?" check
+    """
+    execute_script(
+        conn,
+        """
+        CREATE INDEX IF NOT EXISTS idx_order_items_order_id
+            ON order_items(order_id);
+        CREATE INDEX IF NOT EXISTS idx_order_items_menu_item
+            ON order_items(menu_item_id, quantity);
+        CREATE INDEX IF NOT EXISTS idx_deal_items_deal_id
+            ON deal_items(deal_id);
+        CREATE INDEX IF NOT EXISTS idx_payment_transactions_order_id
+            ON payment_transactions(order_id);
+        CREATE INDEX IF NOT EXISTS idx_orders_created_at
+            ON orders(created_at);
+        CREATE INDEX IF NOT EXISTS idx_orders_type_created_at
+            ON orders(order_type, created_at);
+        CREATE INDEX IF NOT EXISTS idx_orders_created_day
+            ON orders(date(created_at));
+        CREATE INDEX IF NOT EXISTS idx_orders_open_tables
+            ON orders(table_number)
+            WHERE order_type = 'Table' AND (order_status IS NULL OR order_status = 'pending');
+        """,
+    )
+
+
+def _add_order_date(conn):
+    """
+    Stored, indexed order day (YYYY-MM-DD of created_at) so date-range reports
+    compare a plain column instead of date(created_at). Triggers keep it in
+    sync for every writer, including raw SQL sent from the pages.
+    Supersedes the date(created_at) expression index.
+    """
+    add_column_if_missing(conn, "orders", "order_date", "TEXT")
+    execute_script(
+        conn,
+        """
+        UPDATE orders SET order_date = date(created_at)
+            WHERE order_date IS NOT date(created_at);
+
+        CREATE INDEX IF NOT EXISTS idx_orders_order_date
+            ON orders(order_date);
+        DROP INDEX IF EXISTS idx_orders_created_day;
+
+        CREATE TRIGGER IF NOT EXISTS trg_orders_order_date_insert
+        AFTER INSERT ON orders
+        WHEN NEW.order_date IS NOT date(NEW.created_at)
+        BEGIN
+            UPDATE orders SET order_date = date(NEW.created_at) WHERE id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_orders_order_date_update
+        AFTER UPDATE OF created_at, order_date ON orders
+        WHEN NEW.order_date IS NOT date(NEW.created_at)
+        BEGIN
+            UPDATE orders SET order_date = date(NEW.created_at) WHERE id = NEW.id;
+        END;
+        """,
+    )
+
+
+def _add_finance_covering_index(conn):
+    """
+    Covering index for the finance summary: the grouped pass over a date range
+    reads order_date, order_type, order_status and total from the index alone.
+    Its order_date prefix serves every other date-range query, so it replaces
+    the single-column order_date index.
+    """
+    execute_script(
+        conn,
+        """
+        CREATE INDEX IF NOT EXISTS idx_orders_finance
+            ON orders(order_date, order_type, order_status, total);
+        DROP INDEX IF EXISTS idx_orders_order_date;
+        """,
+    )
+
+
+# Rollup keys, shared by the triggers below and database.rollups.rebuild_rollups()
+ROLLUP_DAY = "COALESCE(date({row}.created_at), '')"
+ROLLUP_HOUR = "COALESCE(CAST(strftime('%H', {row}.created_at) AS INTEGER), 0)"
+ROLLUP_STATUS = "COALESCE({row}.order_status, 'pending')"
+
+
+def _prune(sign, statements):
+    """Removing a contribution can empty a bucket; adding one never does"""
+    return statements if sign < 0 else ""
+
+
+def _order_delta(row, sign):
+    """Adds (sign 1) or removes (sign -1) one order's contribution to the order rollups"""
+    day = ROLLUP_DAY.format(row=row)
+    return f"""
+            INSERT INTO sales_by_day (order_date, order_type, order_status, orders, revenue)
+            VALUES ({day}, {row}.order_type, {ROLLUP_STATUS.format(row=row)}, {sign}, {sign} * {row}.total)
+            ON CONFLICT (order_date, order_type, order_status) DO UPDATE
+            SET orders = orders + excluded.orders, revenue = revenue + excluded.revenue;
+            INSERT INTO sales_by_hour (order_date, hour, orders, revenue)
+            VALUES ({day}, {ROLLUP_HOUR.format(row=row)}, {sign}, {sign} * {row}.total)
+            ON CONFLICT (order_date, hour) DO UPDATE
+            SET orders = orders + excluded.orders, revenue = revenue + excluded.revenue;""" + _prune(sign, f"""
+            DELETE FROM sales_by_day WHERE order_date = {day} AND orders = 0;
+            DELETE FROM sales_by_hour WHERE order_date = {day} AND orders = 0;""")
+
+
+def _item_delta(row, sign):
+    """Adds or removes one order line in items_by_day (no-op once its order is gone)"""
+    return f"""
+            INSERT INTO items_by_day (order_date, menu_item_id, quantity, revenue)
+            SELECT {ROLLUP_DAY.format(row="o")}, {row}.menu_item_id, {sign} * {row}.quantity,
+                   {sign} * {row}.quantity * {row}.price
+            FROM orders o WHERE o.id = {row}.order_id
+            ON CONFLICT (order_date, menu_item_id) DO UPDATE
+            SET quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue;""" + _prune(sign, f"""
+            DELETE FROM items_by_day
+            WHERE order_date = (SELECT {ROLLUP_DAY.format(row="o")} FROM orders o WHERE o.id = {row}.order_id)
+              AND quantity = 0;""")
+
+
+def _payment_delta(row, sign):
+    """Adds or removes one payment in payments_by_day, keyed by its order's day"""
+    return f"""
+            INSERT INTO payments_by_day (order_date, payment_method, payments, amount)
+            SELECT {ROLLUP_DAY.format(row="o")}, {row}.payment_method, {sign}, {sign} * {row}.amount
+            FROM orders o WHERE o.id = {row}.order_id
+            ON CONFLICT (order_date, payment_method) DO UPDATE
+            SET payments = payments + excluded.payments, amount = amount + excluded.amount;""" + _prune(sign, f"""
+            DELETE FROM payments_by_day
+            WHERE order_date = (SELECT {ROLLUP_DAY.format(row="o")} FROM orders o WHERE o.id = {row}.order_id)
+              AND payments = 0;""")
+
+
+def _order_children_delta(row, sign):
+    """Moves all lines and payments of an order into (1) or out of (-1) its day's rollups"""
+    day = ROLLUP_DAY.format(row=row)
+    return f"""
+            INSERT INTO items_by_day (order_date, menu_item_id, quantity, revenue)
+            SELECT {day}, menu_item_id, {sign} * SUM(quantity), {sign} * SUM(quantity * price)
+            FROM order_items WHERE order_id = {row}.id GROUP BY menu_item_id
+            ON CONFLICT (order_date, menu_item_id) DO UPDATE
+            SET quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue;
+            INSERT INTO payments_by_day (order_date, payment_method, payments, amount)
+            SELECT {day}, payment_method, {sign} * COUNT(*), {sign} * SUM(amount)
+            FROM payment_transactions WHERE order_id = {row}.id GROUP BY payment_method
+            ON CONFLICT (order_date, payment_method) DO UPDATE
+            SET payments = payments + excluded.payments, amount = amount + excluded.amount;""" + _prune(sign, f"""
+            DELETE FROM items_by_day WHERE order_date = {day} AND quantity = 0;
+            DELETE FROM payments_by_day WHERE order_date = {day} AND payments = 0;""")
+
+
+def _add_sales_rollups(conn):
+    """
+    Pre-aggregated sales per day (and type/status), per hour, per menu item
+    per day, and payments per order day. Triggers keep them in step with every
+    write to orders, order_items and payment_transactions, including raw SQL
+    sent from the pages, so reports cost O(days) rather than O(orders).
+    Rollups use the order_date column name so {date_filter} works on them.
+    """
+    from database.rollups import rebuild_rollups
+
+    execute_script(
+        conn,
+        f"""
+        CREATE TABLE IF NOT EXISTS sales_by_day (
+            order_date TEXT NOT NULL,
+            order_type TEXT NOT NULL,
+            order_status TEXT NOT NULL,
+            orders INTEGER NOT NULL,
+            revenue REAL NOT NULL,
+            PRIMARY KEY (order_date, order_type, order_status)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS sales_by_hour (
+            order_date TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            orders INTEGER NOT NULL,
+            revenue REAL NOT NULL,
+            PRIMARY KEY (order_date, hour)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS items_by_day (
+            order_date TEXT NOT NULL,
+            menu_item_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            revenue REAL NOT NULL,
+            PRIMARY KEY (order_date, menu_item_id)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS payments_by_day (
+            order_date TEXT NOT NULL,
+            payment_method TEXT NOT NULL,
+            payments INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            PRIMARY KEY (order_date, payment_method)
+        ) WITHOUT ROWID;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_orders_insert
+        AFTER INSERT ON orders
+        BEGIN{_order_delta("NEW", 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_orders_update
+        AFTER UPDATE OF order_type, order_status, total, created_at ON orders
+        WHEN OLD.order_type IS NOT NEW.order_type
+          OR OLD.order_status IS NOT NEW.order_status
+          OR OLD.total IS NOT NEW.total
+          OR OLD.created_at IS NOT NEW.created_at
+        BEGIN{_order_delta("OLD", -1)}{_order_delta("NEW", 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_orders_redate
+        BEFORE UPDATE OF created_at ON orders
+        WHEN {ROLLUP_DAY.format(row="OLD")} IS NOT {ROLLUP_DAY.format(row="NEW")}
+        BEGIN{_order_children_delta("OLD", -1)}{_order_children_delta("NEW", 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_orders_delete
+        BEFORE DELETE ON orders
+        BEGIN{_order_delta("OLD", -1)}{_order_children_delta("OLD", -1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_order_items_insert
+        AFTER INSERT ON order_items
+        BEGIN{_item_delta("NEW", 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_order_items_update
+        AFTER UPDATE OF order_id, menu_item_id, quantity, price ON order_items
+        BEGIN{_item_delta("OLD", -1)}{_item_delta("NEW", 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_order_items_delete
+        AFTER DELETE ON order_items
+        BEGIN{_item_delta("OLD", -1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_payments_insert
+        AFTER INSERT ON payment_transactions
+        BEGIN{_payment_delta("NEW", 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_payments_update
+        AFTER UPDATE OF order_id, payment_method, amount ON payment_transactions
+        BEGIN{_payment_delta("OLD", -1)}{_payment_delta("NEW", 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_payments_delete
+        AFTER DELETE ON payment_transactions
+        BEGIN{_payment_delta("OLD", -1)}
+        END;
+        """,
+    )
+    rebuild_rollups(conn)
+
+
+def _add_menu_version(conn):
+    """
+    app_meta 'menu_version', bumped by triggers on every write to menu_items or
+    deal_items (MenuBackend slots and raw SQL from the menu page alike), so the
+    menu catalog snapshot can be revalidated with one key lookup.
+    """
+    statements = ["INSERT OR IGNORE INTO app_meta (key, value) VALUES ('menu_version', '1');"]
+    for table in ("menu_items", "deal_items"):
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            statements.append(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_menu_version_{table}_{event.lower()}
+        AFTER {event} ON {table}
+        BEGIN
+            UPDATE app_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'menu_version';
+        END;""")
+    execute_script(conn, "\n".join(statements))
+
+
+# (version, description, function) - append only, never renumber
+MIGRATIONS = [
+    (2, "legacy order/menu/deal columns", _add_legacy_columns),
+    (3, "nullable deal_items.menu_item_id", _make_deal_menu_item_nullable),
+    (4, "app_meta table", _create_app_meta),
+    (5, "order/reporting hot path indexes", _add_hot_path_indexes),
+    (6, "stored orders.order_date", _add_order_date),
+    (7, "finance summary covering index", _add_finance_covering_index),
+    (8, "sales rollup tables", _add_sales_rollups),
+    (9, "menu catalog version", _add_menu_version),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _apply(conn, version, migrate):
+    """Runs one migration and bumps user_version atomically. Returns True if it ran."""
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-check under the write lock in case another process migrated first
+        if get_schema_version(conn) >= version:
+            conn.rollback()
+            return False
+        migrate(conn)
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def apply_migrations(conn, baseline_sql):
+    """
+    Brings the database up to SCHEMA_VERSION.
+    baseline_sql is the contents of schema.sql (version 1).
+    Returns the list of versions that were applied.
+    """
+    applied = []
+    current = get_schema_version(conn)
+
+    if current < 1 and _apply(conn, 1, lambda c: execute_script(c, baseline_sql)):
+        applied.append(1)
+
+    for version, _description, migrate in MIGRATIONS:
+        if version > current and _apply(conn, version, migrate):
+            applied.append(version)
+
+    return applied
@@ -0,0 +1,422 @@
+"""
+Order write/read logic shared by the backends.
+Functions take an open connection and leave commit/rollback to the caller
+(normally the database.db.connection() context manager).
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+
+from database.reports import created_at_filter, date_filter
+from utils.validators import validate_not_empty, validate_price
+
+ORDER_TYPES = ("Table", "Takeaway", "Delivery")
+
+_INSERT_ORDER_SQL = """
+    INSERT INTO orders (
+        order_type, total, discount_percentage, created_at, customer_name,
+        customer_phone, customer_address, table_number, order_status,
+        payment_status, order_note, amount_received, balance_return
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending', 'pending', ?, ?, ?)
+"""
+
+_INSERT_ITEM_SQL = (
+    "INSERT INTO order_items (order_id, menu_item_id, quantity, price) VALUES (?, ?, ?, ?)"
+)
+
+_UPDATE_ORDER_SQL = """
+    UPDATE orders
+    SET total = ?, discount_percentage = ?, order_note = ?, amount_received = ?, balance_return = ?
+    WHERE id = ?
+"""
+
+_OPEN_TABLE_SQL = """
+    SELECT id FROM orders
+    WHERE order_type = 'Table' AND table_number = ? AND (order_status IS NULL OR order_status = 'pending')
+"""
+
+
+ORDER_SQL = "SELECT * FROM orders WHERE id = ?"
+
+ORDER_ITEMS_SQL = """
+    SELECT oi.id, oi.menu_item_id, oi.quantity, oi.price, mi.name, mi.category,
+           COALESCE(mi.is_deal, 0) AS is_deal
+    FROM order_items oi
+    JOIN menu_items mi ON oi.menu_item_id = mi.id
+    WHERE oi.order_id = ?
+    ORDER BY oi.id
+"""
+
+# Components of every deal on the order, in one set-based query
+ORDER_DEAL_ITEMS_SQL = """
+    SELECT di.deal_id, di.quantity, COALESCE(di.item_name, mi.name) AS name
+    FROM deal_items di
+    LEFT JOIN menu_items mi ON mi.id = di.menu_item_id
+    WHERE di.deal_id IN (
+        SELECT oi.menu_item_id
+        FROM order_items oi
+        JOIN menu_items deal ON deal.id = oi.menu_item_id
+        WHERE oi.order_id = ? AND deal.is_deal = 1
+    )
+    ORDER BY di.deal_id, di.id
+"""
+
+
+def utc_timestamp():
+    """ISO-8601 UTC timestamp in the same format the pages write (Date.toISOString)"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _optional_text(order, key):
+    value = order.get(key)
+    if value is None:
+        return None
+    return str(value).strip()
+
+
+def _optional_number(order, key):
+    value = order.get(key)
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {key}: {value}")
+
+
+def validate_order(order):
+    """
+    Validates and normalizes an order payload from the pages.
+    Returns (header, items) where items are (menu_item_id, quantity, price)
+    tuples. Raises ValueError with a message suitable for the cashier.
+    """
+    if not isinstance(order, dict):
+        raise ValueError("Order must be an object")
+
+    order_type = order.get("order_type")
+    if order_type not in ORDER_TYPES:
+        raise ValueError(f"Invalid order type: {order_type}")
+
+    items, totals = _validate_lines(order)
+
+    table_number = order.get("table_number")
+    if order_type == "Table":
+        try:
+            table_number = int(table_number)
+        except (TypeError, ValueError):
+            raise ValueError("Table orders need a table number")
+    else:
+        table_number = None
+
+    customer_name = _optional_text(order, "customer_name")
+    if order_type in ("Takeaway", "Delivery") and not validate_not_empty(customer_name):
+        raise ValueError("Please enter customer name")
+
+    header = {
+        "order_type": order_type,
+        **totals,
+        "created_at": order.get("created_at") or utc_timestamp(),
+        "customer_name": customer_name,
+        "customer_phone": _optional_text(order, "customer_phone"),
+        "customer_address": _optional_text(order, "customer_address"),
+        "table_number": table_number,
+        "order_note": _optional_text(order, "order_note"),
+    }
+    return header, items
+
+
+def _validate_lines(order):
+    """
+    Items, discount and payment fields of an order payload (new or edited).
+    Returns (items, totals): items as (menu_item_id, quantity, price) tuples,
+    totals as {total, discount_percentage, amount_received, balance_return}.
+    """
+    raw_items = order.get("items")
+    if not isinstance(raw_items, list) or not raw_items:
+        raise ValueError("Please select at least one item")
+
+    items = []
+    for raw in raw_items:
+        try:
+            menu_item_id = int(raw["menu_item_id"])
+            quantity = int(raw["quantity"])
+            price = float(raw["price"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid order item: {raw}")
+        if quantity <= 0:
+            raise ValueError(f"Invalid quantity for item {menu_item_id}: {quantity}")
+        if not validate_price(price):
+            raise ValueError(f"Invalid price for item {menu_item_id}: {price}")
+        items.append((menu_item_id, quantity, price))
+
+    discount = _optional_number(order, "discount_percentage") or 0.0
+    if not 0 <= discount <= 100:
+        raise ValueError(f"Invalid discount: {discount}")
+
+    # Totals are computed here so the stored order always matches its lines
+    subtotal = sum(quantity * price for _, quantity, price in items)
+    total = round(subtotal - subtotal * discount / 100, 2)
+
+    amount_received = _optional_number(order, "amount_received")
+    if amount_received is not None and amount_received <= 0:
+        amount_received = None
+    balance_return = round(amount_received - total, 2) if amount_received is not None else None
+
+    totals = {
+        "total": total,
+        "discount_percentage": discount,
+        "amount_received": amount_received,
+        "balance_return": balance_return,
+    }
+    return items, totals
+
+
+def place_order(conn, order):
+    """
+    Validates an order and writes it with all of its items in one transaction.
+    For table orders the "table already has an open order" check runs under
+    the same write lock, so two terminals cannot open the same table.
+    Returns (order_id, total).
+    """
+    header, items = validate_order(order)
+
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    return _insert_order(conn, header, items)
+
+
+def write_order(conn, order):
+    """
+    place_order() for a caller that already holds the write transaction
+    (the group-commit writer); does not begin or commit.
+    Returns (order_id, total).
+    """
+    header, items = validate_order(order)
+    return _insert_order(conn, header, items)
+
+
+def update_order(conn, order_id, order):
+    """
+    Saves an edit of an existing order: replaces its items and updates the
+    discount, note and payment fields. The payload is validated like a new
+    order's items (see validate_order) and the total and balance_return are
+    recomputed here. For a caller that already holds the write transaction
+    (the group-commit writer). Returns the new total.
+    """
+    if not isinstance(order, dict):
+        raise ValueError("Order must be an object")
+    items, totals = _validate_lines(order)
+    _check_menu_items(conn, items)
+
+    cursor = conn.execute(
+        _UPDATE_ORDER_SQL,
+        (
+            totals["total"],
+            totals["discount_percentage"],
+            _optional_text(order, "order_note"),
+            totals["amount_received"],
+            totals["balance_return"],
+            order_id,
+        ),
+    )
+    if cursor.rowcount == 0:
+        raise ValueError("Order not found")
+    conn.execute("DELETE FROM order_items WHERE order_id = ?", (order_id,))
+    conn.executemany(
+        _INSERT_ITEM_SQL,
+        [(order_id, menu_item_id, quantity, price) for menu_item_id, quantity, price in items],
+    )
+    return totals["total"]
+
+
+def _check_menu_items(conn, items):
+    menu_ids = sorted({menu_item_id for menu_item_id, _, _ in items})
+    placeholders = ",".join("?" * len(menu_ids))
+    known = {
+        row[0]
+        for row in conn.execute(f"SELECT id FROM menu_items WHERE id IN ({placeholders})", menu_ids)
+    }
+    unknown = [menu_item_id for menu_item_id in menu_ids if menu_item_id not in known]
+    if unknown:
+        raise ValueError(f"Unknown menu item(s): {', '.join(map(str, unknown))}")
+
+
+def _insert_order(conn, header, items):
+    _check_menu_items(conn, items)
+
+    if header["order_type"] == "Table":
+        if conn.execute(_OPEN_TABLE_SQL, (header["table_number"],)).fetchone():
+            raise ValueError(
+                f"Table {header['table_number']} already has an active order. "
+                "Please complete or update the existing order first."
+            )
+
+    cursor = conn.execute(
+        _INSERT_ORDER_SQL,
+        (
+            header["order_type"],
+            header["total"],
+            header["discount_percentage"],
+            header["created_at"],
+            header["customer_name"],
+            header["customer_phone"],
+            header["customer_address"],
+            header["table_number"],
+            header["order_note"],
+            header["amount_received"],
+            header["balance_return"],
+        ),
+    )
+    order_id = cursor.lastrowid
+    conn.executemany(
+        _INSERT_ITEM_SQL,
+        [(order_id, menu_item_id, quantity, price) for menu_item_id, quantity, price in items],
+    )
+    return order_id, header["total"]
+
+
+def fetch_order_bundle(conn, order_id):
+    """
+    Loads an order with its items and the expanded components of every deal
+    item, in three queries regardless of how many deals the order holds.
+    Returns {"order": {...}, "items": [...]} or None if the order does not exist.
+    Deal items carry deal_components: [{name, quantity}].
+    """
+    order = conn.execute(ORDER_SQL, (order_id,)).fetchone()
+    if order is None:
+        return None
+
+    components = {}
+    for row in conn.execute(ORDER_DEAL_ITEMS_SQL, (order_id,)):
+        components.setdefault(row["deal_id"], []).append(
+            {"name": row["name"], "quantity": row["quantity"]}
+        )
+
+    items = []
+    for row in conn.execute(ORDER_ITEMS_SQL, (order_id,)):
+        item = dict(row)
+        item["is_deal"] = bool(item["is_deal"])
+        if item["is_deal"]:
+            item["deal_components"] = components.get(item["menu_item_id"], [])
+        items.append(item)
+
+    return {"order": dict(order), "items": items}
+
+
+# --------------------------------------------------
+# Order listing (keyset pagination)
+# --------------------------------------------------
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+LIST_COLUMNS = (
+    "id, order_type, customer_name, customer_phone, customer_address, table_number, "
+    "total, created_at, order_status, payment_status"
+)
+
+
+def encode_cursor(created_at, order_id, direction):
+    """Opaque page cursor: the (created_at, id) key to continue from, and which way"""
+    raw = json.dumps([created_at, order_id, direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, order_id, direction = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return created_at, int(order_id), direction
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Invalid page cursor")
+
+
+def _list_filters(filters):
+    """Condition for list_orders filters: (sql, params), sql "" or starting with " AND " """
+    sql = ""
+    params = {}
+    order_type = filters.get("order_type")
+    if order_type:
+        if order_type not in ORDER_TYPES:
+            raise ValueError(f"Invalid order type: {order_type}")
+        sql += " AND order_type = :order_type"
+        params["order_type"] = order_type
+    status = filters.get("order_status")
+    if status:
+        sql += " AND COALESCE(order_status, 'pending') = :order_status"
+        params["order_status"] = status
+    # Dates become created_at bounds, so the (order_type, created_at) and
+    # (created_at) indexes serve both the range and the keyset order
+    date_sql, date_params = created_at_filter(filters.get("date_from"), filters.get("date_to"))
+    sql += date_sql
+    params.update(date_params)
+    return sql, params
+
+
+def list_orders_query(filters, cursor, page_size):
+    """(sql, params, direction) for one list_orders page, fetching page_size + 1 rows"""
+    where, params = _list_filters(filters)
+
+    direction = "next"
+    if cursor:
+        created_at, order_id, direction = decode_cursor(cursor)
+        where += (" AND (created_at, id) < (:key_created, :key_id)" if direction == "next"
+                  else " AND (created_at, id) > (:key_created, :key_id)")
+        params["key_created"] = created_at
+        params["key_id"] = order_id
+
+    order = "DESC" if direction == "next" else "ASC"
+    params["limit"] = page_size + 1  # one extra row tells whether another page follows
+    sql = f"SELECT {LIST_COLUMNS} FROM orders WHERE 1=1{where} ORDER BY created_at {order}, id {order} LIMIT :limit"
+    return sql, params, direction
+
+
+def _estimated_total(conn, filters):
+    """Order count for the filters from the sales_by_day rollup (O(days), not O(orders))"""
+    sql, params = date_filter(filters.get("date_from"), filters.get("date_to"))
+    if filters.get("order_type"):
+        sql += " AND order_type = :order_type"
+        params["order_type"] = filters["order_type"]
+    if filters.get("order_status"):
+        sql += " AND order_status = :order_status"
+        params["order_status"] = filters["order_status"]
+    row = conn.execute(f"SELECT COALESCE(SUM(orders), 0) FROM sales_by_day WHERE 1=1{sql}", params).fetchone()
+    return row[0]
+
+
+def list_orders(conn, filters=None, cursor=None, page_size=DEFAULT_PAGE_SIZE, with_total=False):
+    """
+    One page of orders, newest first, using keyset pagination on (created_at, id):
+    each page seeks to its cursor instead of skipping rows, so a page costs the
+    same however much history there is.
+    filters: {order_type, order_status, date_from, date_to} (all optional).
+    Returns {"orders", "next_cursor" (older orders), "prev_cursor" (newer
+    orders), "estimated_total"}; cursors are None at either end, and
+    estimated_total is None unless with_total.
+    """
+    filters = filters or {}
+    page_size = max(1, min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    sql, params, direction = list_orders_query(filters, cursor, page_size)
+    rows = [dict(row) for row in conn.execute(sql, params)]
+
+    if direction == "prev" and not rows:
+        # Nothing newer left to show: fall back to the first page
+        return list_orders(conn, filters, None, page_size, with_total)
+
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "prev":
+        rows.reverse()
+        has_newer, has_older = more, True
+    else:
+        has_newer, has_older = bool(cursor), more
+
+    first, last = (rows[0], rows[-1]) if rows else (None, None)
+    return {
+        "orders": rows,
+        "next_cursor": encode_cursor(last["created_at"], last["id"], "next") if has_older and last else None,
+        "prev_cursor": encode_cursor(first["created_at"], first["id"], "prev") if has_newer and first else None,
+        "estimated_total": _estimated_total(conn, filters) if with_total else None,
+    }
@@ -0,0 +1,197 @@
+"""
+Named query registry.
+
+The hot-path statements the pages run are registered here by name, with
+named (:param) parameters, instead of being sent from JavaScript as SQL
+text. A page calls DatabaseBackend.run_named(name, params); the statement
+text is fixed, so every pooled connection compiles it once and then reuses
+it from its statement cache (see database.db.STATEMENT_CACHE_SIZE), and the
+set of statements can be checked (benchmarks/check_query_plans.py) and
+indexed against. validate() compiles every statement against the schema at
+startup, so a broken query fails there rather than on first use.
+
+Date-range queries contain a {date_filter} placeholder and take date_from /
+date_to parameters, expanded as in database.reports.apply_date_filter.
+Reads marked cache=True go through database.query_cache. Calls, errors
+and time are counted per query name (query_stats).
+"""
+import re
+import threading
+from collections import namedtuple
+
+from database.reports import apply_date_filter
+
+NamedQuery = namedtuple("NamedQuery", "name sql params date_range cache write")
+
+# :name outside string literals
+_PARAM_RE = re.compile(r"'(?:[^']|'')*'|(?<!:):([A-Za-z_]\w*)")
+_DATE_PARAMS = ("date_from", "date_to")
+
+QUERIES = {}
+
+
+def register(name, sql, cache=False):
+    """Adds a statement to the registry; returns its NamedQuery"""
+    if name in QUERIES:
+        raise ValueError(f"Query already registered: {name}")
+    date_range = "{date_filter" in sql
+    params = tuple(dict.fromkeys(m.group(1) for m in _PARAM_RE.finditer(sql) if m.group(1)))
+    if date_range:
+        params += _DATE_PARAMS
+    write = not sql.lstrip().upper().startswith("SELECT")
+    if write and cache:
+        raise ValueError(f"Only reads can be cached: {name}")
+    query = NamedQuery(name, sql, params, date_range, cache, write)
+    QUERIES[name] = query
+    return query
+
+
+def get(name):
+    try:
+        return QUERIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown query: {name}")
+
+
+def bind(query, params):
+    """
+    (sql, params) ready to execute for a NamedQuery and a dict of parameter
+    values. Every declared parameter must be given (date bounds may be
+    empty or null); unknown parameters are rejected.
+    """
+    params = dict(params or {})
+    unknown = set(params) - set(query.params)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {query.name}: {', '.join(sorted(unknown))}")
+    missing = [p for p in query.params if p not in params and p not in _DATE_PARAMS]
+    if missing:
+        raise ValueError(f"Missing parameters for {query.name}: {', '.join(missing)}")
+    if not query.date_range:
+        return query.sql, params
+    sql, range_params = apply_date_filter(query.sql, params.pop("date_from", None), params.pop("date_to", None))
+    params.update(range_params)
+    return sql, params
+
+
+def sample_params(query):
+    """Placeholder values for compiling or planning a query (1 per parameter, dates for ranges)"""
+    params = {p: 1 for p in query.params}
+    if query.date_range:
+        params.update(date_from="2026-01-01", date_to="2026-01-31")
+    return params
+
+
+def validate(conn):
+    """Compiles every registered statement (EXPLAIN, never run); raises ValueError naming the first bad one"""
+    for query in QUERIES.values():
+        sql, params = bind(query, sample_params(query))
+        try:
+            conn.execute(f"EXPLAIN {sql}", params).fetchall()
+        except Exception as e:
+            raise ValueError(f"Named query {query.name} does not compile: {e}") from e
+
+
+class QueryStats:
+    """Per-name call counters for run_named"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, seconds, error=False):
+        with self._lock:
+            entry = self._stats.setdefault(name, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["calls"] += 1
+            entry["errors"] += int(error)
+            ms = seconds * 1000
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+
+    def snapshot(self):
+        """{name: {calls, errors, total_ms, max_ms, avg_ms}}"""
+        with self._lock:
+            return {
+                name: {**entry, "avg_ms": entry["total_ms"] / entry["calls"]}
+                for name, entry in self._stats.items()
+            }
+
+
+query_stats = QueryStats()
+
+
+# --------------------------------------------------
+# Dashboard
+# --------------------------------------------------
+register(
+    "dashboard.sales_in_range",
+    """
+    SELECT COALESCE(SUM(orders), 0) as count, COALESCE(SUM(revenue), 0) as revenue
+    FROM sales_by_day
+    WHERE 1=1 {date_filter}
+    """,
+    cache=True,
+)
+
+register(
+    "dashboard.total_orders",
+    "SELECT COALESCE(SUM(orders), 0) as count FROM sales_by_day",
+    cache=True,
+)
+
+# Last 30 days to the hour; depends on the clock, so never cached
+register(
+    "dashboard.orders_last_30_days",
+    """
+    SELECT COALESCE(SUM(orders), 0) as count
+    FROM sales_by_hour
+    WHERE order_date > date('now', '-30 days')
+       OR (order_date = date('now', '-30 days') AND hour >= CAST(strftime('%H', 'now') AS INTEGER))
+    """,
+)
+
+register(
+    "dashboard.top_item",
+    """
+    SELECT mi.name, SUM(ibd.quantity) as total_qty
+    FROM items_by_day ibd
+    JOIN menu_items mi ON ibd.menu_item_id = mi.id
+    GROUP BY mi.id
+    ORDER BY total_qty DESC
+    LIMIT 1
+    """,
+    cache=True,
+)
+
+register(
+    "dashboard.sales_by_day",
+    """
+    SELECT order_date as day, SUM(orders) as count, SUM(revenue) as revenue
+    FROM sales_by_day
+    WHERE 1=1 {date_filter}
+    GROUP BY day
+    ORDER BY day
+    """,
+    cache=True,
+)
+
+# --------------------------------------------------
+# Orders
+# --------------------------------------------------
+register(
+    "tables.open_orders",
+    """
+    SELECT o.id, o.total, o.created_at, o.table_number, o.order_status, o.discount_percentage,
+           o.order_note, o.amount_received, o.balance_return
+    FROM orders o
+    WHERE o.order_type = 'Table' AND o.table_number IS NOT NULL
+      AND (o.order_status IS NULL OR o.order_status = 'pending')
+    ORDER BY o.table_number
+    """,
+)
+
+register("orders.total", "SELECT total FROM orders WHERE id = :order_id")
+
+register(
+    "orders.cancel",
+    "UPDATE orders SET order_status = 'cancelled', payment_status = 'cancelled' WHERE id = :order_id",
+)
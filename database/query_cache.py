@@ -0,0 +1,260 @@
+"""
+Result cache for read queries, invalidated by the tables they read.
+
+Each entry records the tables its statement reads (found by compiling the
+statement under an SQLite authorizer, so views and joins are resolved by
+SQLite itself). A write evicts exactly the entries that read a table the
+write touches, including tables written by triggers (e.g. the sales rollups).
+Entries are evicted least-recently-used once either the entry count or the
+total size of the cached JSON exceeds its bound. Statements whose result
+depends on the clock ('now') or on volatile functions are never cached.
+"""
+import itertools
+import json
+import re
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+
+from database import db
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+_WRITE_ACTIONS = (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE)
+
+# Whitespace outside string literals and quoted identifiers
+_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|\s+")
+
+_TABLES_MEMO_SIZE = 1024
+
+# Results of these depend on more than the tables read, so they are never cached.
+# The date and time functions read the clock when called without arguments or
+# with a 'now' argument (possibly bound as a parameter), so they count as well;
+# CURRENT_DATE / CURRENT_TIME / CURRENT_TIMESTAMP are reported by these names.
+_VOLATILE_FUNCTIONS = frozenset({
+    "random", "randomblob", "changes", "total_changes", "last_insert_rowid",
+    "current_date", "current_time", "current_timestamp",
+    "date", "time", "datetime", "julianday", "strftime", "unixepoch", "timediff",
+})
+_NOW = re.compile(r"'now'", re.IGNORECASE)
+
+StatementInfo = namedtuple("StatementInfo", "reads writes cacheable")
+
+
+def normalize_sql(sql):
+    """Collapses whitespace outside quotes, so reformatted SQL shares an entry"""
+    return _TOKENS.sub(lambda m: m.group(1) or " ", sql).strip()
+
+
+class QueryCache:
+    """LRU cache of serialized query results (JSON text), bounded by entries and bytes"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (json_text, tables)
+        self._by_table = {}            # table -> set of keys
+        self._bytes = 0
+        self._generation = 0           # bumped on every invalidation
+        self._tables_memo = OrderedDict()
+        self._compile_lock = threading.Lock()
+        self._compile_conns = {}       # database file -> connection used only to compile
+        self._compile_generation = db.pool_generation()
+        self._compile_ids = itertools.count()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # -- statement analysis ------------------------------------------------
+    def statement_info(self, conn, sql, params=()):
+        """
+        StatementInfo(reads, writes, cacheable) for a statement, memoized by
+        SQL text. The statement is compiled with EXPLAIN, never run, on a
+        separate connection to the same database file opened with
+        cached_statements=0: the authorizer only fires while a statement is
+        prepared, and conn's own statement cache is left alone.
+        """
+        if self._compile_generation != db.pool_generation():
+            self._reset_analysis()
+        with self._lock:
+            info = self._tables_memo.get(sql)
+            if info is not None:
+                self._tables_memo.move_to_end(sql)
+                return info
+
+        read, written, functions = set(), set(), set()
+
+        def authorizer(action, arg1, arg2, db_name, source):
+            if action == sqlite3.SQLITE_FUNCTION:
+                functions.add((arg2 or "").lower())
+            elif arg1 and not arg1.startswith("sqlite_"):
+                if action == sqlite3.SQLITE_READ:
+                    read.add(arg1)
+                elif action in _WRITE_ACTIONS:
+                    written.add(arg1)
+            return sqlite3.SQLITE_OK
+
+        with self._compile_lock:
+            compile_conn = self._compile_connection(conn)
+            try:
+                compiled = compile_conn is not None and self._compile(compile_conn, f"EXPLAIN {sql}", params, authorizer)
+            except sqlite3.OperationalError:
+                # Schema conn has not committed yet (e.g. during a migration)
+                compiled = False
+            if not compiled:
+                # Only conn can see this schema (or in-memory database). A unique
+                # trailing comment keeps conn's statement cache from skipping the compile.
+                for found in (read, written, functions):
+                    found.clear()
+                self._compile(conn, f"EXPLAIN {sql}\n-- {next(self._compile_ids)}", params, authorizer)
+
+        cacheable = not written and not (functions & _VOLATILE_FUNCTIONS) and not _NOW.search(sql)
+        info = StatementInfo(frozenset(read), frozenset(written), cacheable)
+        with self._lock:
+            self._tables_memo[sql] = info
+            if len(self._tables_memo) > _TABLES_MEMO_SIZE:
+                self._tables_memo.popitem(last=False)
+        return info
+
+    @staticmethod
+    def _compile(conn, sql, params, authorizer):
+        conn.set_authorizer(authorizer)
+        try:
+            conn.execute(sql, params).fetchall()
+        finally:
+            conn.set_authorizer(None)
+        return True
+
+    def _reset_analysis(self):
+        """
+        The pooled connections were retired (database.db.reset_connections:
+        another database file or profile), so statement analysis and compile
+        connections may belong to the old database
+        """
+        with self._compile_lock:
+            generation = db.pool_generation()
+            if generation == self._compile_generation:
+                return
+            self._close_compile_connections()
+            with self._lock:
+                self._tables_memo.clear()
+            self._compile_generation = generation
+
+    def close(self):
+        """Closes the compile connections (on shutdown; they reopen on demand)"""
+        with self._compile_lock:
+            self._close_compile_connections()
+
+    def _close_compile_connections(self):
+        for compile_conn in self._compile_conns.values():
+            try:
+                compile_conn.close()
+            except sqlite3.Error:
+                pass
+        self._compile_conns.clear()
+
+    def _compile_connection(self, conn):
+        """Uncached connection to conn's main database file (None for in-memory)"""
+        path = next((row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main"), "")
+        if not path:
+            return None
+        compile_conn = self._compile_conns.get(path)
+        if compile_conn is None:
+            compile_conn = sqlite3.connect(path, cached_statements=0, check_same_thread=False)
+            self._compile_conns[path] = compile_conn
+        return compile_conn
+
+    # -- lookups -----------------------------------------------------------
+    @staticmethod
+    def make_key(sql, params=None, *extra):
+        return (normalize_sql(sql), json.dumps(params, sort_keys=True, default=str)) + extra
+
+    def generation(self):
+        """Pass to put(): results computed before a later invalidation are not stored"""
+        with self._lock:
+            return self._generation
+
+    def get(self, key):
+        """Cached JSON text for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, json_text, tables, generation):
+        """Stores a result that read tables; skipped if a write happened since generation"""
+        size = len(json_text)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._remove(key)
+            self._entries[key] = (json_text, tables)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        json_text, tables = entry
+        self._bytes -= len(json_text)
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    # -- invalidation ------------------------------------------------------
+    def invalidate_tables(self, tables):
+        """Evicts every entry that read one of tables"""
+        with self._lock:
+            self._generation += 1
+            for table in tables:
+                for key in list(self._by_table.get(table, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def invalidate_for(self, conn, sql, params=()):
+        """Evicts the entries affected by a write statement (call after it committed)"""
+        writes = self.statement_info(conn, sql, params).writes
+        if writes:
+            self.invalidate_tables(writes)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+result_cache = QueryCache()
@@ -0,0 +1,179 @@
+"""
+Reporting helpers shared by the backends.
+Date ranges are inclusive YYYY-MM-DD strings compared against the stored,
+indexed orders.order_date column, so range reports seek instead of scanning.
+"""
+import re
+from datetime import datetime, timedelta
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_PLACEHOLDER_RE = re.compile(r"\{date_filter(?::(\w+))?\}")
+
+
+def normalize_date(value):
+    """Returns a YYYY-MM-DD string, or None for an empty bound. Raises ValueError otherwise."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    if not _DATE_RE.match(value):
+        raise ValueError(f"Invalid date (expected YYYY-MM-DD): {value}")
+    return value
+
+
+def date_filter(date_from, date_to, alias=None):
+    """
+    Builds a sargable order-date condition.
+    Returns (sql, params): sql is "" or starts with " AND " and uses the named
+    parameters :date_from / :date_to, which are included in params.
+    """
+    column = f"{alias}.order_date" if alias else "order_date"
+    date_from = normalize_date(date_from)
+    date_to = normalize_date(date_to)
+
+    clauses = []
+    params = {}
+    if date_from:
+        clauses.append(f"{column} >= :date_from")
+        params["date_from"] = date_from
+    if date_to:
+        clauses.append(f"{column} <= :date_to")
+        params["date_to"] = date_to
+
+    sql = "".join(f" AND {clause}" for clause in clauses)
+    return sql, params
+
+
+def created_at_filter(date_from, date_to, alias=None):
+    """
+    The same inclusive day range as date_filter(), as bounds on created_at.
+    ISO timestamps sort as text and order_date is date(created_at), so this
+    selects the same orders while letting the created_at indexes serve both
+    the range and an ORDER BY created_at. Returns (sql, params) like
+    date_filter(), with the named parameters :created_from / :created_before.
+    """
+    column = f"{alias}.created_at" if alias else "created_at"
+    date_from = normalize_date(date_from)
+    date_to = normalize_date(date_to)
+
+    clauses = []
+    params = {}
+    if date_from:
+        clauses.append(f"{column} >= :created_from")
+        params["created_from"] = date_from
+    if date_to:
+        next_day = datetime.strptime(date_to, "%Y-%m-%d") + timedelta(days=1)
+        clauses.append(f"{column} < :created_before")
+        params["created_before"] = next_day.strftime("%Y-%m-%d")
+
+    sql = "".join(f" AND {clause}" for clause in clauses)
+    return sql, params
+
+
+def apply_date_filter(sql_query, date_from, date_to):
+    """
+    Replaces {date_filter} (or {date_filter:alias} for a joined orders table)
+    in sql_query with the condition from date_filter().
+    Returns (sql, params).
+    """
+    params = {}
+
+    def replace(match):
+        sql, clause_params = date_filter(date_from, date_to, match.group(1))
+        params.update(clause_params)
+        return sql
+
+    return _PLACEHOLDER_RE.sub(replace, sql_query), params
+
+
+# The finance KPIs and chart series are folded from the per-day
+# (type, status) buckets of the sales_by_day rollup, so a report costs
+# O(days in range) regardless of order volume. NULL statuses are stored as
+# 'pending'. Payments are keyed by their order's day, as on the finance page.
+FINANCE_BUCKETS_SQL = """
+    SELECT order_date, order_type, order_status, orders, revenue
+    FROM sales_by_day
+    WHERE 1=1 {date_filter}
+"""
+
+FINANCE_PAYMENTS_SQL = """
+    SELECT COALESCE(SUM(amount), 0)
+    FROM payments_by_day
+    WHERE 1=1 {date_filter}
+"""
+
+
+def _status_label(order_status):
+    """Chart bucket for an order status (anything unrecognised counts as pending)"""
+    if order_status == "completed":
+        return "Completed"
+    if order_status == "cancelled":
+        return "Cancelled"
+    return "Pending"
+
+
+def _sort_key(value):
+    # SQLite orders NULL first; keep the same order for grouped keys
+    return (value is not None, value or "")
+
+
+def finance_summary(conn, date_from=None, date_to=None):
+    """
+    Computes every finance-page KPI and chart series for an inclusive date range
+    from the sales_by_day and payments_by_day rollups.
+    Returns a dict:
+      total_orders, total_revenue, completed_orders, pending_orders,
+      avg_order_value, total_payments,
+      revenue_by_type: [{order_type, revenue}],
+      orders_by_status: [{status, count}],
+      daily: [{date, count, revenue}]
+    """
+    sql, params = apply_date_filter(FINANCE_BUCKETS_SQL, date_from, date_to)
+    buckets = conn.execute(sql, params).fetchall()
+    sql, params = apply_date_filter(FINANCE_PAYMENTS_SQL, date_from, date_to)
+    total_payments = conn.execute(sql, params).fetchone()[0]
+
+    total_orders = 0
+    total_revenue = 0.0
+    completed_orders = 0
+    pending_orders = 0
+    by_type = {}
+    by_status = {}
+    daily = {}
+
+    for order_date, order_type, order_status, count, revenue in buckets:
+        revenue = revenue or 0
+        total_orders += count
+        total_revenue += revenue
+        if order_status == "completed":
+            completed_orders += count
+        elif order_status == "pending":
+            pending_orders += count
+
+        by_type[order_type] = by_type.get(order_type, 0) + revenue
+        label = _status_label(order_status)
+        by_status[label] = by_status.get(label, 0) + count
+        day = daily.setdefault(order_date, [0, 0])
+        day[0] += count
+        day[1] += revenue
+
+    return {
+        "total_orders": total_orders,
+        "total_revenue": total_revenue,
+        "completed_orders": completed_orders,
+        "pending_orders": pending_orders,
+        "avg_order_value": total_revenue / total_orders if total_orders else 0,
+        "total_payments": total_payments,
+        "revenue_by_type": [
+            {"order_type": key, "revenue": by_type[key]}
+            for key in sorted(by_type, key=_sort_key)
+        ],
+        "orders_by_status": [
+            {"status": key, "count": by_status[key]} for key in sorted(by_status)
+        ],
+        "daily": [
+            {"date": key, "count": daily[key][0], "revenue": daily[key][1]}
+            for key in sorted(daily, key=_sort_key)
+        ],
+    }
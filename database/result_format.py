@@ -0,0 +1,38 @@
+"""
+JSON encodings of query results for the JavaScript bridge.
+
+    objects   [{"id": 1, "total": 500.0}, ...]   (default; names repeated per row)
+    rows      {"columns": ["id", "total"], "rows": [[1, 500.0], ...]}
+    columns   {"columns": ["id", "total"], "values": [[1, ...], [500.0, ...]]}
+
+The compact layouts send each column name once and keep SQLite's numbers
+as JSON numbers. Rows are fetched as plain tuples (the connection's Row
+factory is switched off for the cursor), which json encodes as arrays
+without building a dict per row.
+"""
+import json
+
+from utils.metrics import metrics
+
+LAYOUTS = ("objects", "rows", "columns")
+
+
+def encode_result(cursor, layout="objects"):
+    """JSON text for an executed cursor's rows in layout (see the module docstring)"""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown result layout: {layout}")
+    columns = [d[0] for d in cursor.description] if cursor.description else []
+
+    if layout != "objects":
+        cursor.row_factory = None
+    with metrics.phase("fetch"):
+        rows = cursor.fetchall()
+    metrics.add_rows(len(rows))
+
+    with metrics.phase("serialize"):
+        if layout == "objects":
+            return json.dumps([dict(zip(columns, row)) for row in rows])
+        if layout == "rows":
+            return json.dumps({"columns": columns, "rows": rows})
+        values = list(zip(*rows)) if rows else [[] for _ in columns]
+        return json.dumps({"columns": columns, "values": values})
@@ -0,0 +1,73 @@
+"""
+Sales rollup tables: sales_by_day, sales_by_hour, items_by_day, payments_by_day.
+
+Triggers (migration 8) keep them current on every write; rebuild_rollups()
+recomputes them from the raw tables to repair drift, e.g. after restoring a
+backup or editing the database with triggers disabled.
+
+Run: python -m database.rollups
+"""
+from database.migrations import ROLLUP_DAY, ROLLUP_HOUR, ROLLUP_STATUS
+
+ROLLUP_TABLES = ("sales_by_day", "sales_by_hour", "items_by_day", "payments_by_day")
+
+_REBUILD_SQL = [
+    f"""
+    INSERT INTO sales_by_day (order_date, order_type, order_status, orders, revenue)
+    SELECT {ROLLUP_DAY.format(row="o")} AS day, o.order_type, {ROLLUP_STATUS.format(row="o")} AS status,
+           COUNT(*), SUM(o.total)
+    FROM orders o
+    GROUP BY day, o.order_type, status
+    """,
+    f"""
+    INSERT INTO sales_by_hour (order_date, hour, orders, revenue)
+    SELECT {ROLLUP_DAY.format(row="o")} AS day, {ROLLUP_HOUR.format(row="o")} AS hr,
+           COUNT(*), SUM(o.total)
+    FROM orders o
+    GROUP BY day, hr
+    """,
+    f"""
+    INSERT INTO items_by_day (order_date, menu_item_id, quantity, revenue)
+    SELECT {ROLLUP_DAY.format(row="o")} AS day, oi.menu_item_id,
+           SUM(oi.quantity), SUM(oi.quantity * oi.price)
+    FROM order_items oi
+    JOIN orders o ON o.id = oi.order_id
+    GROUP BY day, oi.menu_item_id
+    HAVING SUM(oi.quantity) != 0
+    """,
+    f"""
+    INSERT INTO payments_by_day (order_date, payment_method, payments, amount)
+    SELECT {ROLLUP_DAY.format(row="o")} AS day, pt.payment_method, COUNT(*), SUM(pt.amount)
+    FROM payment_transactions pt
+    JOIN orders o ON o.id = pt.order_id
+    GROUP BY day, pt.payment_method
+    """,
+]
+
+
+def rebuild_rollups(conn):
+    """Recomputes every rollup table from orders, order_items and payment_transactions"""
+    for table in ROLLUP_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+    for sql in _REBUILD_SQL:
+        conn.execute(sql)
+
+
+def main():
+    from database.db import connection
+
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rebuild_rollups(conn)
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ROLLUP_TABLES
+        }
+
+    print("Rollups rebuilt:")
+    for table, count in counts.items():
+        print(f"  - {table}: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
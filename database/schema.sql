@@ -1,3 +1,6 @@
+-- Baseline schema (version 1). Later schema changes are numbered
+-- migrations in database/migrations.py, tracked in PRAGMA user_version.
+
 CREATE TABLE IF NOT EXISTS users (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     username TEXT UNIQUE NOT NULL,
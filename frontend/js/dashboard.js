@@ -17,10 +17,10 @@ async function safeDbQuery(sql, params = null) {
         if (params && Array.isArray(params) && params.length > 0) {
             // Use parameterized query
             const paramsJson = JSON.stringify(params);
-            response = dbBackend.execute_with_params(sql, paramsJson);
+            response = dbCall(dbBackend, "execute_with_params", sql, paramsJson);
         } else {
             // Use direct query
-            response = dbBackend.execute_query(sql);
+            response = dbCall(dbBackend, "execute_query", sql);
         }
 
         // Handle Promise if the method returns one
@@ -76,7 +76,7 @@ async function safeDbUpdate(sql, params) {
 
     try {
         const paramsJson = JSON.stringify(params);
-        let response = dbBackend.execute_with_params(sql, paramsJson);
+        let response = dbCall(dbBackend, "execute_with_params", sql, paramsJson);
 
         // Handle Promise if returned
         if (response && typeof response.then === 'function') {
@@ -135,30 +135,17 @@ async function loadKPIs() {
     const today = new Date().toISOString().split('T')[0];
     console.log("Loading KPIs for date:", today);
 
-    // Today's orders
-    const todayOrdersSql = `SELECT COUNT(*) as count, COALESCE(SUM(total), 0) as revenue FROM orders WHERE date(created_at) = '${today}'`;
-    const todayData = await safeDbQuery(todayOrdersSql);
+    // One backend call for all KPI queries (registered in database/queries.py);
+    // results are cached until an order changes, except the last-30-days
+    // count, which depends on the clock
+    const [todayData, totalOrdersData, monthlyOrdersData, topItemData] = await safeDbBatch([
+        { name: "dashboard.sales_in_range", params: { date_from: today, date_to: today } },
+        { name: "dashboard.total_orders" },
+        { name: "dashboard.orders_last_30_days" },
+        { name: "dashboard.top_item" }
+    ], dbBackend);
     console.log("Today's data:", todayData);
 
-    // Total orders
-    const totalOrdersSql = "SELECT COUNT(*) as count FROM orders";
-    const totalOrdersData = await safeDbQuery(totalOrdersSql);
-
-    // Monthly orders (last 30 days)
-    const monthlyOrdersSql = `SELECT COUNT(*) as count FROM orders WHERE created_at >= datetime('now', '-30 days')`;
-    const monthlyOrdersData = await safeDbQuery(monthlyOrdersSql);
-
-    // Top item
-    const topItemSql = `
-        SELECT mi.name, SUM(oi.quantity) as total_qty 
-        FROM order_items oi 
-        JOIN menu_items mi ON oi.menu_item_id = mi.id 
-        GROUP BY mi.id 
-        ORDER BY total_qty DESC 
-        LIMIT 1
-    `;
-    const topItemData = await safeDbQuery(topItemSql);
-
     // Update KPI values
     const todayOrders = todayData[0]?.count || 0;
     const todayRevenue = todayData[0]?.revenue || 0;
@@ -188,14 +175,11 @@ async function loadKPIs() {
     }
 }
 
-// Load all orders table
-async function loadRecentOrders() {
-    const sql = `
-        SELECT id, order_type, customer_name, table_number, total, created_at, order_status, payment_status
-        FROM orders 
-        ORDER BY created_at DESC
-    `;
-    const orders = await safeDbQuery(sql);
+// Load all orders table, one page at a time (cursor: null for the newest page)
+async function loadRecentOrders(cursor = null) {
+    const page = await listOrders({}, cursor);
+    const orders = page.orders;
+    renderOrdersPager("recentOrdersPager", page, loadRecentOrders);
 
     const tbody = document.querySelector(".orders-table tbody");
     if (!tbody) return;
@@ -297,17 +281,10 @@ async function loadCharts() {
         console.log("Loading chart data from database...");
 
         // Get day-by-day data for current month
-        const dailyOrdersSql = `
-            SELECT 
-                strftime('%Y-%m-%d', created_at) as day,
-                COUNT(*) as count,
-                COALESCE(SUM(total), 0) as revenue
-            FROM orders 
-            WHERE strftime('%Y-%m', created_at) = strftime('%Y-%m', 'now')
-            GROUP BY day
-            ORDER BY day
-        `;
-        const dailyData = await safeDbQuery(dailyOrdersSql);
+        const todayStr = new Date().toISOString().split('T')[0];
+        const monthStart = todayStr.slice(0, 8) + '01';
+        const dailyRows = await runNamedQuery("dashboard.sales_by_day", { date_from: monthStart, date_to: null });
+        const dailyData = Array.isArray(dailyRows) ? dailyRows : [];
         console.log("Daily data:", dailyData);
 
         // Prepare chart data - day by day for current month
@@ -586,8 +563,7 @@ async function loadMenuItems() {
     }
 
     try {
-        const sql = "SELECT id, name, category, price, is_available FROM menu_items WHERE is_available = 1 ORDER BY category, name";
-        const items = await safeDbQuery(sql);
+        const items = (await loadMenuCatalog()).filter(item => item.is_available === 1);
 
         if (!Array.isArray(items)) {
             console.error("Invalid menu items response:", items);
@@ -608,23 +584,14 @@ async function openEditOrderModal(orderId) {
     currentOrderId = orderId;
     selectedItems = {};
 
-    // Load order details
-    const orderSql = `SELECT * FROM orders WHERE id = ?`;
-    const orders = await safeDbQuery(orderSql, [orderId]);
-    if (!orders || orders.length === 0) {
+    // Load order details and items in one call
+    const bundle = await getOrderBundle(orderId);
+    if (!bundle) {
         alert("Order not found");
         return;
     }
-    const order = orders[0];
-
-    // Load order items
-    const orderItemsSql = `
-        SELECT oi.id, oi.menu_item_id, oi.quantity, oi.price, mi.name, mi.category
-        FROM order_items oi
-        JOIN menu_items mi ON oi.menu_item_id = mi.id
-        WHERE oi.order_id = ?
-    `;
-    const items = await safeDbQuery(orderItemsSql, [orderId]);
+    const order = bundle.order;
+    const items = bundle.items;
 
     // Populate selectedItems
     items.forEach(item => {
@@ -1109,8 +1076,10 @@ async function cancelOrder(orderId) {
     if (!confirmed) return;
 
     try {
-        const updateStatusSql = `UPDATE orders SET order_status = 'cancelled', payment_status = 'cancelled' WHERE id = ?`;
-        await safeDbUpdate(updateStatusSql, [orderId]);
+        const result = await runNamedQuery("orders.cancel", { order_id: orderId });
+        if (!result.success) {
+            throw new Error(result.error || "Failed to cancel order");
+        }
 
         if (typeof showAlertModal === 'function') {
             await showAlertModal("Order cancelled successfully!");
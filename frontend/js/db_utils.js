@@ -1,5 +1,7 @@
 // Database utility functions
-async function safeDbQuery(sql, params, dbBackend) {
+// options.layout ("rows" or "columns") returns a compact result instead of row objects
+// (column names once, see dbCompactQuery in layout.js).
+async function safeDbQuery(sql, params, dbBackend, options = {}) {
     // Use global dbBackend if not provided
     const backend = dbBackend || window.dbBackend;
     
@@ -9,15 +11,19 @@ async function safeDbQuery(sql, params, dbBackend) {
     }
 
     try {
+        if (options.layout) {
+            return await dbCompactQuery(backend, sql, params, options.layout);
+        }
+
         let response;
         
         if (params && Array.isArray(params) && params.length > 0) {
             // Use parameterized query (always pass a string; backend expects JSON array)
             const paramsJson = JSON.stringify(params);
-            response = backend.execute_with_params(sql, paramsJson);
+            response = dbCall(backend, "execute_with_params", sql, paramsJson);
         } else {
             // Use direct query
-            response = backend.execute_query(sql);
+            response = dbCall(backend, "execute_query", sql);
         }
 
         // Handle Promise if returned
@@ -42,5 +48,209 @@ async function safeDbQuery(sql, params, dbBackend) {
     }
 }
 
-// Make function globally accessible
+// Run several read queries in one backend call, against one consistent snapshot.
+// queries: [{ sql, params, date_from, date_to, cache }] (date_from/date_to expand {date_filter};
+// cache: true serves the result from the backend result cache until a write touches its tables).
+// Returns one row array per query; a query that failed yields [] and is logged.
+async function safeDbBatch(queries, dbBackend) {
+    const backend = dbBackend || window.dbBackend;
+
+    if (!backend) {
+        console.error("[DB] Database backend not available");
+        throw new Error("Database backend not initialized");
+    }
+
+    try {
+        let response = dbCall(backend, "execute_batch", JSON.stringify(queries));
+
+        if (response && typeof response.then === 'function') {
+            response = await response;
+        }
+
+        if (typeof response !== 'string') {
+            console.error("[DB] Invalid response type:", typeof response, response);
+            return queries.map(() => []);
+        }
+
+        const result = JSON.parse(response || "{}");
+        if (!result.success || !Array.isArray(result.results)) {
+            console.error("[DB] Batch error:", result.error);
+            return queries.map(() => []);
+        }
+        return result.results.map((rows, i) => {
+            if (Array.isArray(rows)) return rows;
+            console.error("[DB] Batch query error:", rows && rows.error);
+            console.error("[DB] Query:", queries[i].name || queries[i].sql);
+            return [];
+        });
+    } catch (error) {
+        console.error("[DB] Batch error:", error);
+        throw error;
+    }
+}
+
+// Place an order (header + all items) in one backend call and one transaction.
+// Returns { success, order_id, total } or { success: false, error }.
+async function placeOrder(order) {
+    const backend = window.orderBackend;
+
+    if (!backend) {
+        console.error("[DB] Order backend not available");
+        return { success: false, error: "Order backend not initialized" };
+    }
+
+    try {
+        let response = dbCall(backend, "place_order", JSON.stringify(order));
+
+        if (response && typeof response.then === 'function') {
+            response = await response;
+        }
+
+        if (typeof response !== 'string') {
+            console.error("[DB] Invalid response type:", typeof response, response);
+            return { success: false, error: "Invalid response from database" };
+        }
+
+        return JSON.parse(response || "{}");
+    } catch (error) {
+        console.error("[DB] Error placing order:", error);
+        return { success: false, error: error.message };
+    }
+}
+
+// Save an edited order through OrderBackend.update_order, which recomputes
+// the total and balance and replaces the items in one transaction.
+// Resolves to { success, order_id, total } or { success: false, error }.
+async function updateOrderOnServer(orderId, order) {
+    const backend = window.orderBackend;
+
+    if (!backend) {
+        console.error("[DB] Order backend not available");
+        return { success: false, error: "Order backend not initialized" };
+    }
+
+    try {
+        let response = dbCall(backend, "update_order", orderId, JSON.stringify(order));
+
+        if (response && typeof response.then === 'function') {
+            response = await response;
+        }
+
+        if (typeof response !== 'string') {
+            console.error("[DB] Invalid response type:", typeof response, response);
+            return { success: false, error: "Invalid response from database" };
+        }
+
+        return JSON.parse(response || "{}");
+    } catch (error) {
+        console.error("[DB] Error updating order:", error);
+        return { success: false, error: error.message };
+    }
+}
+
+// Convert the page's selectedItems map into place_order line items
+function orderItemsFromSelection(selectedItems) {
+    return Object.values(selectedItems).map(item => ({
+        menu_item_id: item.id,
+        quantity: item.qty,
+        price: item.price
+    }));
+}
+
+// Load an order, its items and every deal's components in one backend call.
+// Returns { order, items } or null if the order does not exist or the call failed.
+async function getOrderBundle(orderId) {
+    const backend = window.receiptBackend;
+
+    if (!backend) {
+        console.error("[DB] Receipt backend not available");
+        throw new Error("Receipt backend not initialized");
+    }
+
+    try {
+        let response = dbCall(backend, "get_order_bundle", parseInt(orderId, 10));
+
+        if (response && typeof response.then === 'function') {
+            response = await response;
+        }
+
+        if (typeof response !== 'string') {
+            console.error("[DB] Invalid response type:", typeof response, response);
+            return null;
+        }
+
+        const result = JSON.parse(response || "{}");
+        if (!result.success) {
+            console.error("[DB] Order bundle error:", result.error);
+            return null;
+        }
+        return { order: result.order, items: result.items || [] };
+    } catch (error) {
+        console.error("[DB] Order bundle error:", error);
+        throw error;
+    }
+}
+
+const MENU_CATALOG_KEY = "cravehub.menuCatalog";
+
+/**
+ * Full menu (deals carry deal_components), cached in sessionStorage and
+ * revalidated by version: the backend only resends the items when the menu
+ * has changed since the cached copy.
+ */
+async function loadMenuCatalog() {
+    const backend = window.menuBackend;
+
+    let cached = null;
+    try {
+        cached = JSON.parse(sessionStorage.getItem(MENU_CATALOG_KEY) || "null");
+    } catch (error) {
+        cached = null;
+    }
+
+    if (!backend) {
+        if (cached) return cached.items;
+        console.error("[DB] Menu backend not available");
+        throw new Error("Menu backend not initialized");
+    }
+
+    try {
+        let response = dbCall(backend, "get_menu", cached ? cached.version : -1);
+
+        if (response && typeof response.then === 'function') {
+            response = await response;
+        }
+
+        const result = JSON.parse(response || "{}");
+        if (!result.success) {
+            throw new Error(result.error || "Failed to load menu");
+        }
+        if (result.not_modified && cached) {
+            return cached.items;
+        }
+
+        const items = result.items || [];
+        try {
+            sessionStorage.setItem(MENU_CATALOG_KEY, JSON.stringify({ version: result.version, items }));
+        } catch (error) {
+            // storage full or unavailable: the snapshot just isn't reused
+        }
+        return items;
+    } catch (error) {
+        if (cached) {
+            console.warn("[DB] Menu catalog error, using cached menu:", error);
+            return cached.items;
+        }
+        console.error("[DB] Menu catalog error:", error);
+        throw error;
+    }
+}
+
+// Make functions globally accessible
 window.safeDbQuery = safeDbQuery;
+window.safeDbBatch = safeDbBatch;
+window.placeOrder = placeOrder;
+window.updateOrderOnServer = updateOrderOnServer;
+window.getOrderBundle = getOrderBundle;
+window.orderItemsFromSelection = orderItemsFromSelection;
+window.loadMenuCatalog = loadMenuCatalog;
@@ -1,4 +1,5 @@
 let dbBackend = null;
+let financeBackend = null;
 let revenueByTypeChart = null;
 let ordersByStatusChart = null;
 let dailyRevenueChart = null;
@@ -6,67 +7,35 @@ let dailyOrdersChart = null;
 let currentDateFrom = null;
 let currentDateTo = null;
 
-// Helper function to safely execute database queries
-async function safeDbQuery(sql, params = null) {
-    if (!dbBackend) {
-        console.error("Database backend not initialized");
-        return [];
+// Helper function to fetch the finance summary (all KPIs and chart series)
+// for a date range in one backend call. Returns null on failure.
+async function fetchFinanceSummary(dateFrom, dateTo) {
+    if (!financeBackend) {
+        console.error("Finance backend not initialized");
+        return null;
     }
 
     try {
-        let response;
-
-        if (params && Array.isArray(params) && params.length > 0) {
-            const paramsJson = JSON.stringify(params);
-            response = dbBackend.execute_with_params(sql, paramsJson);
-        } else {
-            response = dbBackend.execute_query(sql);
-        }
+        let response = dbCall(financeBackend, "summary", dateFrom || "", dateTo || "");
 
         if (response && typeof response.then === 'function') {
             response = await response;
         }
 
         if (typeof response !== 'string') {
-            console.error("Invalid response type from database:", typeof response, response);
-            return [];
-        }
-
-        const result = JSON.parse(response || "[]");
-        return Array.isArray(result) ? result : [];
-    } catch (error) {
-        console.error("Error executing database query:", error, sql);
-        return [];
-    }
-}
-
-// Helper function to safely execute database updates
-async function safeDbUpdate(sql, params) {
-    if (!dbBackend) {
-        console.error("Database backend not initialized");
-        return { error: "Database backend not initialized" };
-    }
-
-    try {
-        const paramsJson = JSON.stringify(params);
-        let response = dbBackend.execute_with_params(sql, paramsJson);
-
-        // Handle Promise if returned
-        if (response && typeof response.then === 'function') {
-            response = await response;
+            console.error("Invalid response type from finance backend:", typeof response, response);
+            return null;
         }
 
-        // Check if response is a string
-        if (typeof response !== 'string') {
-            console.error("Invalid response type from database:", typeof response, response);
-            return { error: "Invalid response from database" };
+        const result = JSON.parse(response || "{}");
+        if (!result.success) {
+            console.error("Error loading finance summary:", result.error);
+            return null;
         }
-
-        // Parse JSON
-        return JSON.parse(response || "{}");
+        return result.summary;
     } catch (error) {
-        console.error("Error executing database update:", error, sql);
-        return { error: error.message };
+        console.error("Error loading finance summary:", error);
+        return null;
     }
 }
 
@@ -131,6 +100,10 @@ function initWebChannel() {
             new QWebChannel(qt.webChannelTransport, function (channel) {
                 window.dbBackend = channel.objects.dbBackend;
                 dbBackend = channel.objects.dbBackend;
+                window.financeBackend = channel.objects.financeBackend;
+                financeBackend = channel.objects.financeBackend;
+                window.orderBackend = channel.objects.orderBackend;
+                window.exportBackend = channel.objects.exportBackend;
                 // Set up calendar icon click handlers
                 setupDateCalendarIcons();
                 // Set default date range to current month
@@ -170,133 +143,32 @@ async function loadFinanceData() {
         currentDateFrom = dateFrom;
         currentDateTo = dateTo;
 
-        // Build date filter SQL
-        let dateFilter = "";
-        if (dateFrom && dateTo) {
-            dateFilter = `AND date(created_at) >= '${dateFrom}' AND date(created_at) <= '${dateTo}'`;
-        } else if (dateFrom) {
-            dateFilter = `AND date(created_at) >= '${dateFrom}'`;
-        } else if (dateTo) {
-            dateFilter = `AND date(created_at) <= '${dateTo}'`;
+        // KPIs and chart series come from one summary call over the date range
+        const summary = await fetchFinanceSummary(dateFrom, dateTo);
+        if (summary) {
+            // Update statistics
+            document.getElementById("total-orders").innerText = summary.total_orders || 0;
+            document.getElementById("total-revenue").innerText = `Rs. ${parseFloat(summary.total_revenue || 0).toFixed(2)}`;
+            document.getElementById("completed-orders").innerText = summary.completed_orders || 0;
+            document.getElementById("pending-orders").innerText = summary.pending_orders || 0;
+            document.getElementById("avg-order-value").innerText = `Rs. ${parseFloat(summary.avg_order_value || 0).toFixed(2)}`;
+            document.getElementById("total-payments").innerText = `Rs. ${parseFloat(summary.total_payments || 0).toFixed(2)}`;
+
+            // Render charts
+            renderRevenueByTypeChart(summary.revenue_by_type || []);
+            renderOrdersByStatusChart(summary.orders_by_status || []);
+            renderDailyRevenueChart(summary.daily || []);
+            renderDailyOrdersChart(summary.daily || []);
         }
 
-        // Total Orders
-        const totalOrdersSql = `SELECT COUNT(*) as count FROM orders WHERE 1=1 ${dateFilter}`;
-        const totalOrdersData = await safeDbQuery(totalOrdersSql);
-
-        // Total Revenue
-        const totalRevenueSql = `SELECT COALESCE(SUM(total), 0) as revenue FROM orders WHERE 1=1 ${dateFilter}`;
-        const totalRevenueData = await safeDbQuery(totalRevenueSql);
-
-        // Completed Orders
-        const completedOrdersSql = `SELECT COUNT(*) as count FROM orders WHERE order_status = 'completed' ${dateFilter}`;
-        const completedOrdersData = await safeDbQuery(completedOrdersSql);
-
-        // Pending Orders
-        const pendingOrdersSql = `SELECT COUNT(*) as count FROM orders WHERE order_status = 'pending' OR order_status IS NULL ${dateFilter}`;
-        const pendingOrdersData = await safeDbQuery(pendingOrdersSql);
-
-        // Average Order Value
-        const avgOrderSql = `SELECT COALESCE(AVG(total), 0) as avg_value FROM orders WHERE 1=1 ${dateFilter}`;
-        const avgOrderData = await safeDbQuery(avgOrderSql);
-
-        // Total Payments
-        const paymentsSql = `
-            SELECT COALESCE(SUM(pt.amount), 0) as total_payments
-            FROM payment_transactions pt
-            JOIN orders o ON pt.order_id = o.id
-            WHERE 1=1 ${dateFilter}
-        `;
-        const paymentsData = await safeDbQuery(paymentsSql);
-
-        // Update statistics
-        document.getElementById("total-orders").innerText = totalOrdersData[0]?.count || 0;
-        document.getElementById("total-revenue").innerText = `Rs. ${parseFloat(totalRevenueData[0]?.revenue || 0).toFixed(2)}`;
-        document.getElementById("completed-orders").innerText = completedOrdersData[0]?.count || 0;
-        document.getElementById("pending-orders").innerText = pendingOrdersData[0]?.count || 0;
-        document.getElementById("avg-order-value").innerText = `Rs. ${parseFloat(avgOrderData[0]?.avg_value || 0).toFixed(2)}`;
-        document.getElementById("total-payments").innerText = `Rs. ${parseFloat(paymentsData[0]?.total_payments || 0).toFixed(2)}`;
-
-        // Load chart data
-        await loadChartData(dateFilter);
-
         // Load orders table
-        await loadOrdersTable(dateFilter);
+        await loadOrdersTable(dateFrom, dateTo);
 
     } catch (error) {
         console.error("Error loading finance data:", error);
     }
 }
 
-// Load chart data
-async function loadChartData(dateFilter) {
-    try {
-        // Revenue by Order Type
-        const revenueByTypeSql = `
-            SELECT order_type, COALESCE(SUM(total), 0) as revenue
-            FROM orders
-            WHERE 1=1 ${dateFilter}
-            GROUP BY order_type
-        `;
-        const revenueByTypeData = await safeDbQuery(revenueByTypeSql);
-
-        // Orders by Status
-        const ordersByStatusSql = `
-            SELECT 
-                CASE 
-                    WHEN order_status = 'completed' THEN 'Completed'
-                    WHEN order_status = 'cancelled' THEN 'Cancelled'
-                    WHEN order_status = 'pending' OR order_status IS NULL THEN 'Pending'
-                    ELSE 'Pending'
-                END as status,
-                COUNT(*) as count
-            FROM orders
-            WHERE 1=1 ${dateFilter}
-            GROUP BY 
-                CASE 
-                    WHEN order_status = 'completed' THEN 'Completed'
-                    WHEN order_status = 'cancelled' THEN 'Cancelled'
-                    WHEN order_status = 'pending' OR order_status IS NULL THEN 'Pending'
-                    ELSE 'Pending'
-                END
-        `;
-        const ordersByStatusData = await safeDbQuery(ordersByStatusSql);
-
-        // Daily Revenue Trend
-        const dailyRevenueSql = `
-            SELECT 
-                date(created_at) as date,
-                COALESCE(SUM(total), 0) as revenue
-            FROM orders
-            WHERE 1=1 ${dateFilter}
-            GROUP BY date(created_at)
-            ORDER BY date(created_at)
-        `;
-        const dailyRevenueData = await safeDbQuery(dailyRevenueSql);
-
-        // Daily Orders Trend
-        const dailyOrdersSql = `
-            SELECT 
-                date(created_at) as date,
-                COUNT(*) as count
-            FROM orders
-            WHERE 1=1 ${dateFilter}
-            GROUP BY date(created_at)
-            ORDER BY date(created_at)
-        `;
-        const dailyOrdersData = await safeDbQuery(dailyOrdersSql);
-
-        // Render charts
-        renderRevenueByTypeChart(revenueByTypeData);
-        renderOrdersByStatusChart(ordersByStatusData);
-        renderDailyRevenueChart(dailyRevenueData);
-        renderDailyOrdersChart(dailyOrdersData);
-
-    } catch (error) {
-        console.error("Error loading chart data:", error);
-    }
-}
-
 // Render Revenue by Order Type Chart
 function renderRevenueByTypeChart(data) {
     const ctx = document.getElementById("revenueByTypeChart");
@@ -573,16 +445,12 @@ function renderDailyOrdersChart(data) {
     });
 }
 
-// Load orders table
-async function loadOrdersTable(dateFilter) {
+// Load orders table, one page at a time (cursor: null for the newest page)
+async function loadOrdersTable(dateFrom, dateTo, cursor = null) {
     try {
-        const ordersSql = `
-            SELECT id, order_type, customer_name, table_number, total, created_at, order_status, payment_status
-            FROM orders
-            WHERE 1=1 ${dateFilter}
-            ORDER BY created_at DESC
-        `;
-        const orders = await safeDbQuery(ordersSql);
+        const page = await listOrders({ date_from: dateFrom || "", date_to: dateTo || "", with_total: true }, cursor);
+        const orders = page.orders;
+        renderOrdersPager("orders-pager", page, next => loadOrdersTable(dateFrom, dateTo, next));
 
         const tbody = document.getElementById("orders-table-body");
         if (!tbody) return;
@@ -662,8 +530,10 @@ async function cancelOrder(orderId) {
     if (!confirmed) return;
 
     try {
-        const updateStatusSql = `UPDATE orders SET order_status = 'cancelled', payment_status = 'cancelled' WHERE id = ?`;
-        await safeDbUpdate(updateStatusSql, [orderId]);
+        const result = await runNamedQuery("orders.cancel", { order_id: orderId });
+        if (!result.success) {
+            throw new Error(result.error || "Failed to cancel order");
+        }
 
         if (typeof showAlertModal === 'function') {
             await showAlertModal("Order cancelled successfully!");
@@ -686,6 +556,91 @@ async function cancelOrder(orderId) {
 // Make cancelOrder globally accessible
 window.cancelOrder = cancelOrder;
 
+// Export orders, items and payments for the selected range to files.
+// The export streams in the background; progress arrives via export_progress.
+const EXPORT_TABLE_LABELS = {
+    orders: "orders",
+    order_items: "order items",
+    payment_transactions: "payments"
+};
+let activeExportId = null;
+
+async function showExportError(message) {
+    if (typeof showAlertModal === 'function') {
+        await showAlertModal(message);
+    } else {
+        alert(message);
+    }
+}
+
+function watchExportSignals(backend) {
+    if (backend._exportSignalsWatched) return;
+    backend._exportSignalsWatched = true;
+
+    backend.export_progress.connect((exportId, table, done, total) => {
+        if (exportId !== activeExportId) return;
+        const status = document.getElementById("exportStatus");
+        if (status) {
+            status.textContent = `Exporting ${EXPORT_TABLE_LABELS[table] || table}: ${done.toLocaleString()} / ${total.toLocaleString()}`;
+        }
+    });
+
+    backend.export_finished.connect(async (exportId, resultJson) => {
+        if (exportId !== activeExportId) return;
+        activeExportId = null;
+        const button = document.getElementById("exportOrders");
+        const status = document.getElementById("exportStatus");
+        if (button) button.disabled = false;
+
+        const result = JSON.parse(resultJson || "{}");
+        if (!result.success) {
+            if (status) status.textContent = "";
+            await showExportError("Export failed: " + (result.error || "unknown error"));
+            return;
+        }
+        const rows = result.rows || {};
+        if (status) {
+            status.textContent = `Exported ${(rows.orders || 0).toLocaleString()} orders, ` +
+                `${(rows.order_items || 0).toLocaleString()} items and ` +
+                `${(rows.payment_transactions || 0).toLocaleString()} payments to ${result.directory}`;
+        }
+    });
+}
+
+async function exportOrders() {
+    const backend = window.exportBackend;
+    if (!backend) {
+        await showExportError("Export is not available");
+        return;
+    }
+    if (activeExportId) return;
+
+    watchExportSignals(backend);
+    const dateFrom = document.getElementById("dateFrom").value || "";
+    const dateTo = document.getElementById("dateTo").value || "";
+    const format = document.getElementById("exportFormat").value || "csv";
+    const button = document.getElementById("exportOrders");
+    const status = document.getElementById("exportStatus");
+
+    try {
+        let response = backend.export_orders(dateFrom, dateTo, format, "");
+        if (response && typeof response.then === 'function') {
+            response = await response;
+        }
+        const result = JSON.parse(response || "{}");
+        if (!result.success) {
+            await showExportError("Export failed: " + (result.error || "unknown error"));
+            return;
+        }
+        activeExportId = result.export_id;
+        if (button) button.disabled = true;
+        if (status) status.textContent = "Export started...";
+    } catch (error) {
+        console.error("Error starting export:", error);
+        await showExportError("Export failed: " + error.message);
+    }
+}
+
 // Event listeners
 document.addEventListener("DOMContentLoaded", () => {
     initWebChannel();
@@ -699,6 +654,11 @@ document.addEventListener("DOMContentLoaded", () => {
         });
     }
 
+    const exportBtn = document.getElementById("exportOrders");
+    if (exportBtn) {
+        exportBtn.addEventListener("click", exportOrders);
+    }
+
     if (resetFilterBtn) {
         resetFilterBtn.addEventListener("click", () => {
             const today = new Date();
@@ -37,21 +37,217 @@ const SIDEBAR_ITEMS = [
     { page: 'users.html', icon: '../assets/icons/users.png', label: 'Users', module: 'users' }
 ];
 
-// Helper function to safely execute database queries
-async function safeDbQuery(sql, params = null) {
+// Calls a backend query slot off the GUI thread when the backend offers an
+// *_async variant (result delivered through its query_finished signal), else
+// the synchronous slot. Resolves with the slot's JSON string either way.
+// query_finished is broadcast on backend objects that outlive the page, so
+// request ids carry a per-page prefix: results still arriving for a previous
+// page's requests are ignored instead of resolving this page's.
+const dbRequestPrefix = (window.crypto && typeof crypto.randomUUID === 'function')
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+let dbRequestCounter = 0;
+const dbPendingRequests = new Map();
+
+function watchQueryResults(backend) {
+    if (backend._queryResultsWatched) return;
+    backend._queryResultsWatched = true;
+    backend.query_finished.connect((requestId, result) => {
+        if (!requestId.startsWith(dbRequestPrefix + ":")) return;
+        const resolve = dbPendingRequests.get(requestId);
+        if (resolve) {
+            dbPendingRequests.delete(requestId);
+            resolve(result);
+        }
+    });
+}
+
+async function dbCall(backend, slot, ...args) {
+    const asyncSlot = backend[slot + "_async"];
+    if (typeof asyncSlot === 'function' && backend.query_finished) {
+        watchQueryResults(backend);
+        const requestId = `${dbRequestPrefix}:${slot}-${++dbRequestCounter}`;
+        return new Promise(resolve => {
+            dbPendingRequests.set(requestId, resolve);
+            asyncSlot(requestId, ...args);
+        });
+    }
+    return backend[slot](...args);
+}
+
+// Order lists are paged with keyset cursors (OrderBackend.list_orders), so a
+// page costs the same however much order history there is.
+const ORDERS_PAGE_SIZE = 50;
+
+// One page of orders, newest first.
+// filters: { order_type, order_status, date_from, date_to, with_total }; cursor: null for the first page.
+// Returns { orders, next_cursor, prev_cursor, estimated_total } (an empty page on error).
+async function listOrders(filters = {}, cursor = null, pageSize = ORDERS_PAGE_SIZE) {
+    const empty = { orders: [], next_cursor: null, prev_cursor: null, estimated_total: null };
+    const backend = window.orderBackend;
+    if (!backend) {
+        console.error("Order backend not initialized");
+        return empty;
+    }
+
+    try {
+        let response = dbCall(backend, "list_orders", JSON.stringify(filters), cursor || "", pageSize);
+        if (response && typeof response.then === 'function') {
+            response = await response;
+        }
+
+        const result = JSON.parse(response || "{}");
+        if (!result.success) {
+            console.error("Error listing orders:", result.error);
+            return empty;
+        }
+        return result;
+    } catch (error) {
+        console.error("Error listing orders:", error);
+        return empty;
+    }
+}
+
+// Newer / Older buttons (and the order count, when known) under an orders table.
+// onPage(cursor) loads the page a button points to.
+function renderOrdersPager(pagerId, page, onPage) {
+    const pager = document.getElementById(pagerId);
+    if (!pager) return;
+
+    pager.innerHTML = "";
+    if (!page.prev_cursor && !page.next_cursor) {
+        if (page.estimated_total != null) pager.textContent = `${page.estimated_total} orders`;
+        return;
+    }
+
+    const newer = document.createElement("button");
+    newer.textContent = "‹ Newer";
+    newer.disabled = !page.prev_cursor;
+    newer.onclick = () => onPage(page.prev_cursor);
+
+    const older = document.createElement("button");
+    older.textContent = "Older ›";
+    older.disabled = !page.next_cursor;
+    older.onclick = () => onPage(page.next_cursor);
+
+    const info = document.createElement("span");
+    if (page.estimated_total != null) info.textContent = `${page.estimated_total} orders`;
+
+    pager.append(newer, info, older);
+}
+
+// Compact query results (DatabaseBackend.execute_compact) send each column name once:
+//   layout "rows":    { columns: [...], rows: [[...], ...] }
+//   layout "columns": { columns: [...], values: [[column 0 values], ...] }
+// Resolves to that object; an error resolves to the same shape with no rows.
+function emptyCompactResult(layout) {
+    return layout === "columns" ? { columns: [], values: [] } : { columns: [], rows: [] };
+}
+
+async function dbCompactQuery(backend, sql, params, layout) {
+    const empty = emptyCompactResult(layout);
+    const paramsJson = params && Array.isArray(params) && params.length > 0 ? JSON.stringify(params) : "";
+
+    let response = dbCall(backend, "execute_compact", sql, paramsJson, layout);
+    if (response && typeof response.then === 'function') {
+        response = await response;
+    }
+    if (typeof response !== 'string') {
+        console.error("Invalid response type from database:", typeof response, response);
+        return empty;
+    }
+
+    const result = JSON.parse(response || "{}");
+    if (result.error || !Array.isArray(result.columns)) {
+        console.error("Database query error:", result.error, sql);
+        return empty;
+    }
+    return result;
+}
+
+// Runs a query registered in database/queries.py by name (DatabaseBackend.run_named).
+// params is an object of the query's named parameters.
+// Resolves to an array of rows for reads, or { success, affected_rows, ... } for writes;
+// failures resolve to an object with an error message.
+async function runNamedQuery(name, params = {}) {
     if (!window.dbBackend) {
         console.error("Database backend not initialized");
-        return [];
+        return { success: false, error: "Database backend not initialized" };
     }
 
     try {
+        let response = dbCall(window.dbBackend, "run_named", name, JSON.stringify(params || {}));
+        if (response && typeof response.then === 'function') {
+            response = await response;
+        }
+        const result = JSON.parse(response || "{}");
+        if (!Array.isArray(result) && result.error) {
+            console.error(`Named query ${name} failed:`, result.error);
+        }
+        return result;
+    } catch (error) {
+        console.error(`Error running named query ${name}:`, error);
+        return { success: false, error: error.message };
+    }
+}
+
+// Streams a large SELECT in chunks through a server-side cursor (DatabaseBackend.open_cursor /
+// fetch_chunk), so neither side holds the whole result. Yields arrays of rows; leaving the
+// loop early (break, return or an exception) closes the cursor.
+//   for await (const rows of streamQuery(sql, params)) { render(rows); }
+// options: { chunkSize (rows per chunk, default 500), layout ("objects" or "rows") }
+async function* streamQuery(sql, params = null, options = {}) {
+    const backend = window.dbBackend;
+    if (!backend) {
+        throw new Error("Database backend not initialized");
+    }
+    const chunkSize = options.chunkSize || 500;
+    const paramsJson = params && Array.isArray(params) && params.length > 0 ? JSON.stringify(params) : "";
+
+    const opened = JSON.parse(await dbCall(backend, "open_cursor", sql, paramsJson, options.layout || "objects"));
+    if (!opened.success) {
+        throw new Error(opened.error || "Could not open cursor");
+    }
+
+    let done = false;
+    try {
+        while (!done) {
+            const chunk = JSON.parse(await dbCall(backend, "fetch_chunk", opened.cursor, chunkSize));
+            if (!chunk.success) {
+                throw new Error(chunk.error || "Could not fetch rows");
+            }
+            done = chunk.done;
+            if (chunk.rows.length > 0) {
+                yield chunk.rows;
+            }
+        }
+    } finally {
+        if (!done) {
+            await backend.close_cursor(opened.cursor);
+        }
+    }
+}
+
+// Helper function to safely execute database queries.
+// options.layout ("rows" or "columns") requests a compact result (see dbCompactQuery).
+async function safeDbQuery(sql, params = null, options = {}) {
+    if (!window.dbBackend) {
+        console.error("Database backend not initialized");
+        return options.layout ? emptyCompactResult(options.layout) : [];
+    }
+
+    try {
+        if (options.layout) {
+            return await dbCompactQuery(window.dbBackend, sql, params, options.layout);
+        }
+
         let response;
 
         if (params && Array.isArray(params) && params.length > 0) {
             const paramsJson = JSON.stringify(params);
-            response = window.dbBackend.execute_with_params(sql, paramsJson);
+            response = dbCall(window.dbBackend, "execute_with_params", sql, paramsJson);
         } else {
-            response = window.dbBackend.execute_query(sql);
+            response = dbCall(window.dbBackend, "execute_query", sql);
         }
 
         if (response && typeof response.then === 'function') {
@@ -75,7 +271,7 @@ async function safeDbQuery(sql, params = null) {
         }
     } catch (error) {
         console.error("Error executing database query:", error, sql);
-        return [];
+        return options.layout ? emptyCompactResult(options.layout) : [];
     }
 }
 
@@ -231,3 +427,8 @@ function logout() {
 
 // Make logout globally accessible
 window.logout = logout;
+window.listOrders = listOrders;
+window.renderOrdersPager = renderOrdersPager;
+window.dbCompactQuery = dbCompactQuery;
+window.streamQuery = streamQuery;
+window.runNamedQuery = runNamedQuery;
@@ -19,10 +19,10 @@ async function safeDbQuery(sql, params = null) {
         if (params && Array.isArray(params) && params.length > 0) {
             // Use parameterized query
             const paramsJson = JSON.stringify(params);
-            response = dbBackend.execute_with_params(sql, paramsJson);
+            response = dbCall(dbBackend, "execute_with_params", sql, paramsJson);
         } else {
             // Use direct query
-            response = dbBackend.execute_query(sql);
+            response = dbCall(dbBackend, "execute_query", sql);
         }
 
         // Handle Promise if returned
@@ -63,7 +63,7 @@ async function safeDbUpdate(sql, params) {
 
     try {
         const paramsJson = JSON.stringify(params);
-        let response = dbBackend.execute_with_params(sql, paramsJson);
+        let response = dbCall(dbBackend, "execute_with_params", sql, paramsJson);
 
         // Handle Promise if returned
         if (response && typeof response.then === 'function') {
@@ -113,18 +113,26 @@ function initWebChannel() {
 // Start initialization
 initWebChannel();
 
-// Load menu items directly from database using SQL
+// Load menu items from the backend menu snapshot
 async function loadMenuItems() {
-    if (!dbBackend) {
-        console.error("Database backend not initialized");
+    if (!menuBackend) {
+        console.error("Menu backend not initialized");
         setTimeout(loadMenuItems, 500);
         return;
     }
 
     try {
-        // Direct SQL query to menu_items table - order by category and name
-        const sql = "SELECT id, name, category, price, is_available, COALESCE(is_deal, 0) as is_deal FROM menu_items ORDER BY category, name";
-        const result = await safeDbQuery(sql);
+        // Full menu snapshot (ordered by category and name, deals with their components);
+        // -1 = no cached copy, this page always wants the current menu
+        let response = dbCall(menuBackend, "get_menu", -1);
+        if (response && typeof response.then === 'function') {
+            response = await response;
+        }
+        const snapshot = JSON.parse(response || "{}");
+        if (!snapshot.success) {
+            throw new Error(snapshot.error || "Failed to load menu");
+        }
+        const result = snapshot.items || [];
         menuItems = result;
         filteredMenuItems = result;
         renderMenuCards();
@@ -336,7 +344,9 @@ async function editItem(id) {
     document.getElementById("menu-is-deal").checked = isDeal;
 
     dealItemsForForm = [];
-    if (isDeal && dbBackend) {
+    if (isDeal && Array.isArray(item.deal_components)) {
+        dealItemsForForm = item.deal_components.map(r => ({ name: r.name || '', quantity: r.quantity || 1 }));
+    } else if (isDeal && dbBackend) {
         const rows = await safeDbQuery("SELECT di.quantity, COALESCE(di.item_name, mi.name) as name FROM deal_items di LEFT JOIN menu_items mi ON mi.id = di.menu_item_id WHERE di.deal_id = ? ORDER BY di.id", [id]);
         dealItemsForForm = (rows || []).map(r => ({ name: r.name || '', quantity: r.quantity || 1 }));
     }
@@ -284,47 +284,15 @@ function generateReceiptText(order, items) {
 }
 
 async function printOrderReceipt(orderId, dbBackend) {
-    const orderSql = `SELECT * FROM orders WHERE id = ?`;
-    const orders = await safeDbQuery(orderSql, [orderId]);
-    if (!orders.length) {
+    // Order, items and deal components in one call
+    const bundle = await getOrderBundle(orderId);
+    if (!bundle) {
         if (typeof showAlertModal === 'function') await showAlertModal("Order not found");
         else alert("Order not found");
         return;
     }
 
-    const itemsSql = `
-        SELECT oi.quantity, oi.price, oi.menu_item_id, mi.name, COALESCE(mi.is_deal, 0) as is_deal
-        FROM order_items oi
-        JOIN menu_items mi ON oi.menu_item_id = mi.id
-        WHERE oi.order_id = ?
-    `;
-    const rawItems = await safeDbQuery(itemsSql, [orderId]);
-
-    // Expand deals: for each deal item, fetch its components from deal_items
-    const items = [];
-    for (const row of rawItems) {
-        const item = {
-            name: row.name,
-            quantity: row.quantity,
-            price: row.price,
-            menu_item_id: row.menu_item_id,
-            is_deal: row.is_deal === 1 || row.is_deal === true
-        };
-        if (item.is_deal) {
-            const dealItemsSql = `
-                SELECT di.quantity, COALESCE(di.item_name, mi.name) as name
-                FROM deal_items di
-                LEFT JOIN menu_items mi ON mi.id = di.menu_item_id
-                WHERE di.deal_id = ?
-                ORDER BY di.id
-            `;
-            const components = await safeDbQuery(dealItemsSql, [row.menu_item_id]);
-            item.deal_components = (components || []).map(c => ({ name: c.name, quantity: c.quantity }));
-        }
-        items.push(item);
-    }
-
-    const receiptText = generateReceiptText(orders[0], items);
+    const receiptText = generateReceiptText(bundle.order, bundle.items);
 
     // Wait for printer backend to be available (up to 5 seconds)
     let printerBackend = window.printerBackend;
@@ -441,9 +409,10 @@ async function printOrderReceipt(orderId, dbBackend) {
         if (result && typeof result.then === 'function') result = await result;
 
         const res = JSON.parse(result);
-        if (!res.success) throw new Error(res.error);
-        if (typeof showAlertModal === 'function') await showAlertModal("Receipt printed successfully!");
-        else alert("Receipt printed successfully!");
+        if (!res.success) throw new Error(printReplyError(res));
+        // Queued: the printer backend reports failures through print_status
+        if (typeof showAlertModal === 'function') await showAlertModal("Receipt sent to printer!");
+        else alert("Receipt sent to printer!");
     } catch (e) {
         console.error("[PRINT] Error:", e);
         const errorMsg = "Printer error: " + (e.message || String(e));
@@ -525,24 +494,15 @@ async function printInvoice(orderId, dbBackend) {
     console.log(`[PRINT] Starting invoice print for Order ID: ${orderId}`);
     
     try {
-        const orderSql = `SELECT * FROM orders WHERE id = ?`;
-        const orders = await safeDbQuery(orderSql, [orderId], dbBackend);
+        const bundle = await getOrderBundle(orderId);
         
-        if (!orders || orders.length === 0) {
+        if (!bundle) {
             console.error(`[PRINT] Order #${orderId} not found`);
             alert("Order not found");
             return;
         }
 
-        const itemsSql = `
-            SELECT oi.quantity, oi.price, mi.name, mi.category
-            FROM order_items oi
-            JOIN menu_items mi ON oi.menu_item_id = mi.id
-            WHERE oi.order_id = ?
-        `;
-        const items = await safeDbQuery(itemsSql, [orderId], dbBackend);
-
-        const html = generateInvoiceHTML(orders[0], items);
+        const html = generateInvoiceHTML(bundle.order, bundle.items);
         openPrintWindow(html);
         console.log(`[PRINT] Invoice print window opened`);
     } catch (error) {
@@ -564,8 +524,35 @@ function openPrintWindow(html) {
     };
 }
 
+// Receipts print in the background; a job that still fails after retries is
+// only reported through the printer backend's print_status signal.
+function watchPrintStatus(backend) {
+    if (!backend || !backend.print_status || backend._printStatusWatched) return;
+    backend._printStatusWatched = true;
+    backend.print_status.connect((jobId, status, error) => {
+        console.log(`[PRINT] ${jobId}: ${status}${error ? " - " + error : ""}`);
+        if (status === "failed") {
+            const errorMsg = "Printing failed: " + (error || "unknown error");
+            if (typeof showAlertModal === 'function') showAlertModal(errorMsg);
+            else alert(errorMsg);
+        }
+    });
+}
+
+// Message for a print_receipt reply that was not accepted
+function printReplyError(res) {
+    if (res.queue_full) {
+        return "Printer queue full: wait for the queued receipts to print, then try again.";
+    }
+    return res.error;
+}
+
+watchPrintStatus(window.printerBackend);
+window.addEventListener('webchannel-ready', () => watchPrintStatus(window.printerBackend));
+
 // Make functions globally accessible
 window.showConfirmModal = showConfirmModal;
 window.showAlertModal = showAlertModal;
 window.printOrderReceipt = printOrderReceipt;
 window.printInvoice = printInvoice;
+window.printReplyError = printReplyError;
@@ -17,9 +17,9 @@ async function safeDbQuery(sql, params = null) {
 
         if (params && Array.isArray(params) && params.length > 0) {
             const paramsJson = JSON.stringify(params);
-            response = backend.execute_with_params(sql, paramsJson);
+            response = dbCall(backend, "execute_with_params", sql, paramsJson);
         } else {
-            response = backend.execute_query(sql);
+            response = dbCall(backend, "execute_query", sql);
         }
 
         // Handle Promise if returned
@@ -61,7 +61,7 @@ async function safeDbUpdate(sql, params) {
 
     try {
         const paramsJson = JSON.stringify(params);
-        let response = backend.execute_with_params(sql, paramsJson);
+        let response = dbCall(backend, "execute_with_params", sql, paramsJson);
 
         // Handle Promise if returned
         if (response && typeof response.then === 'function') {
@@ -100,8 +100,7 @@ function waitForWebChannel() {
 
 // Load menu items
 async function loadMenuItems() {
-    const sql = "SELECT id, name, category, price, is_available FROM menu_items WHERE is_available = 1 ORDER BY category, name";
-    menuItems = await safeDbQuery(sql);
+    menuItems = (await loadMenuCatalog()).filter(item => item.is_available === 1);
 }
 
 // Load table orders - get active orders for each table
@@ -117,13 +116,8 @@ async function loadTableOrders() {
     tablesContainer.innerHTML = "";
 
     // Get active table orders (orders with type "Table" and order_status 'pending') grouped by table_number
-    const sql = `
-        SELECT o.id, o.total, o.created_at, o.table_number, o.order_status, o.discount_percentage, o.order_note, o.amount_received, o.balance_return
-        FROM orders o
-        WHERE o.order_type = 'Table' AND o.table_number IS NOT NULL AND (o.order_status IS NULL OR o.order_status = 'pending')
-        ORDER BY o.table_number
-    `;
-    const orders = await safeDbQuery(sql);
+    const result = await runNamedQuery("tables.open_orders");
+    const orders = Array.isArray(result) ? result : [];
 
     // Create a map of table numbers to orders
     const tableOrderMap = {};
@@ -252,13 +246,8 @@ async function openOrderModal(tableNumber, order) {
     selectedItems = {};
 
     // Load order items
-    const orderItemsSql = `
-        SELECT oi.id, oi.menu_item_id, oi.quantity, oi.price, mi.name, mi.category
-        FROM order_items oi
-        JOIN menu_items mi ON oi.menu_item_id = mi.id
-        WHERE oi.order_id = ${order.id}
-    `;
-    const items = await safeDbQuery(orderItemsSql);
+    const bundle = await getOrderBundle(order.id);
+    const items = bundle ? bundle.items : [];
 
     // Populate selectedItems
     items.forEach(item => {
@@ -553,48 +542,31 @@ async function saveOrder() {
         return;
     }
 
-    // Check if table already has an active (pending) order
-    const checkTableSql = `SELECT id FROM orders WHERE order_type = 'Table' AND table_number = ? AND (order_status IS NULL OR order_status = 'pending')`;
-    const existingOrder = await safeDbQuery(checkTableSql, [currentTableNumber]);
-
-    if (existingOrder && existingOrder.length > 0) {
-        if (typeof showAlertModal === 'function') {
-            await showAlertModal(`Table ${currentTableNumber} already has an active order. Please complete or update the existing order first.`);
-        } else {
-            alert(`Table ${currentTableNumber} already has an active order. Please complete or update the existing order first.`);
-        }
-        return;
-    }
-
     try {
-        // Calculate subtotal
-        const subtotal = Object.values(selectedItems).reduce((sum, item) => {
-            return sum + (item.price * item.qty);
-        }, 0);
-
-        // Get discount
+        // Get discount (totals are computed by the backend)
         const discountInput = document.getElementById("discountInput");
         const discountPercent = discountInput ? parseFloat(discountInput.value) || 0 : 0;
-        const discountAmount = (subtotal * discountPercent) / 100;
-        const total = subtotal - discountAmount;
 
         // Get order note
         const orderNoteInput = document.getElementById("orderNoteInput");
         const orderNote = orderNoteInput ? orderNoteInput.value.trim() : '';
-        // Amount received and balance to return (for receipt)
+        // Amount received (balance to return is computed by the backend)
         const amountReceivedInput = document.getElementById("amountReceivedInput");
         const amountReceived = amountReceivedInput ? parseFloat(amountReceivedInput.value) : null;
         const amountReceivedVal = (amountReceived != null && !isNaN(amountReceived) && amountReceived > 0) ? amountReceived : null;
-        const balanceReturnVal = amountReceivedVal != null ? (amountReceivedVal - total) : null;
 
-        // Insert order with table number
-        const now = new Date().toISOString();
-        const insertOrderSql = `INSERT INTO orders (order_type, total, discount_percentage, created_at, table_number, order_status, payment_status, order_note, amount_received, balance_return) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`;
-        const result = await safeDbUpdate(insertOrderSql, ['Table', total, discountPercent, now, currentTableNumber, 'pending', 'pending', orderNote, amountReceivedVal, balanceReturnVal]);
+        // Write the order and all of its items in one backend call (one transaction).
+        // The backend also rejects the order if the table already has an active one.
+        const result = await placeOrder({
+            order_type: 'Table',
+            items: orderItemsFromSelection(selectedItems),
+            discount_percentage: discountPercent,
+            table_number: currentTableNumber,
+            order_note: orderNote,
+            amount_received: amountReceivedVal
+        });
 
-        console.log("Order insert result:", result);
-        console.log("Result type:", typeof result);
-        console.log("Result keys:", result ? Object.keys(result) : "null");
+        console.log("Order placement result:", result);
 
         if (!result || result.success === false) {
             if (typeof showAlertModal === 'function') {
@@ -605,82 +577,7 @@ async function saveOrder() {
             return;
         }
 
-        // Get order id from backend response
-        // Try different possible property names
-        const orderId = result.last_insert_id || result.lastInsertId || result.id;
-
-        console.log("Order ID from result:", orderId);
-        console.log("Order ID type:", typeof orderId);
-        console.log("Full result object:", result);
-
-        // Check if orderId is valid (should be a positive integer)
-        // Convert to number if it's a string
-        const numericOrderId = parseInt(orderId);
-
-        if (isNaN(numericOrderId) || numericOrderId <= 0) {
-            console.error("Invalid order ID:", orderId, "Numeric:", numericOrderId, "Full result:", JSON.stringify(result));
-            const lastOrderSql = "SELECT id FROM orders ORDER BY id DESC LIMIT 1";
-            const lastOrder = await safeDbQuery(lastOrderSql);
-            if (lastOrder && lastOrder.length > 0) {
-                const fallbackOrderId = parseInt(lastOrder[0].id);
-                if (fallbackOrderId && fallbackOrderId > 0) {
-                    await insertOrderItems(fallbackOrderId);
-                    const wantPrint = await showConfirmModal("Order placed successfully! Would you like to print the receipt?");
-                    if (wantPrint) {
-                        try {
-                            if (typeof printOrderReceipt === 'function') {
-                                await printOrderReceipt(fallbackOrderId, dbBackend);
-                            } else {
-                                const script = document.createElement('script');
-                                script.src = 'js/print_utils.js';
-                                script.onload = async () => {
-                                    if (typeof printOrderReceipt === 'function') {
-                                        await printOrderReceipt(fallbackOrderId, dbBackend);
-                                    } else {
-                                        if (typeof showAlertModal === 'function') {
-                                            await showAlertModal("Error: Print function not available");
-                                        } else {
-                                            alert("Error: Print function not available");
-                                        }
-                                    }
-                                };
-                                script.onerror = async () => {
-                                    if (typeof showAlertModal === 'function') {
-                                        await showAlertModal("Error loading print utilities");
-                                    } else {
-                                        alert("Error loading print utilities");
-                                    }
-                                };
-                                document.head.appendChild(script);
-                            }
-                        } catch (e) {
-                            console.error("[TABLE] Error printing receipt:", e);
-                            if (typeof showAlertModal === 'function') {
-                                await showAlertModal("Error printing receipt: " + e.message);
-                            } else {
-                                alert("Error printing receipt: " + e.message);
-                            }
-                        }
-                    }
-                    closeOrderModal();
-                    loadTableOrders();
-                    loadTableOrdersTable();
-                    return;
-                }
-            }
-            if (typeof showAlertModal === 'function') {
-                await showAlertModal("Error getting order ID. Please check console for details.");
-            } else {
-                alert("Error getting order ID. Please check console for details.");
-            }
-            return;
-        }
-
-        // Use the numeric order ID
-        const finalOrderId = numericOrderId;
-
-        // Insert order items using the order ID
-        await insertOrderItems(finalOrderId);
+        const finalOrderId = result.order_id;
 
         const wantPrint = await showConfirmModal("Order placed successfully! Would you like to print the receipt?");
         if (wantPrint) {
@@ -734,27 +631,6 @@ async function saveOrder() {
     }
 }
 
-// Helper function to insert order items
-async function insertOrderItems(orderId) {
-    for (const item of Object.values(selectedItems)) {
-        const insertItemSql = `
-            INSERT INTO order_items (order_id, menu_item_id, quantity, price)
-            VALUES (?, ?, ?, ?)
-        `;
-        const itemResult = await safeDbUpdate(insertItemSql, [
-            orderId,
-            item.id,
-            item.qty,
-            item.price
-        ]);
-
-        if (!itemResult || itemResult.success === false) {
-            console.error("Error inserting order item:", itemResult);
-            throw new Error("Failed to insert order item: " + (itemResult?.error || "Unknown error"));
-        }
-    }
-}
-
 // Update existing order
 async function updateOrder() {
     if (Object.keys(selectedItems).length === 0) {
@@ -776,16 +652,9 @@ async function updateOrder() {
     }
 
     try {
-        // Calculate subtotal
-        const subtotal = Object.values(selectedItems).reduce((sum, item) => {
-            return sum + (item.price * item.qty);
-        }, 0);
-
-        // Get discount
+        // Get discount (totals are computed by the backend)
         const discountInput = document.getElementById("discountInput");
         const discountPercent = discountInput ? parseFloat(discountInput.value) || 0 : 0;
-        const discountAmount = (subtotal * discountPercent) / 100;
-        const total = subtotal - discountAmount;
 
         // Get order note
         const orderNoteInput = document.getElementById("orderNoteInput");
@@ -794,20 +663,16 @@ async function updateOrder() {
         const amountReceivedInput = document.getElementById("amountReceivedInput");
         const amountReceived = amountReceivedInput ? parseFloat(amountReceivedInput.value) : null;
         const amountReceivedVal = (amountReceived != null && !isNaN(amountReceived) && amountReceived > 0) ? amountReceived : null;
-        const balanceReturnVal = amountReceivedVal != null ? (amountReceivedVal - total) : null;
-
-        // Update order total, note, and payment fields
-        const updateOrderSql = `UPDATE orders SET total = ?, discount_percentage = ?, order_note = ?, amount_received = ?, balance_return = ? WHERE id = ?`;
-        await safeDbUpdate(updateOrderSql, [total, discountPercent, orderNote, amountReceivedVal, balanceReturnVal, currentOrderId]);
 
-        // Delete existing order items
-        const deleteItemsSql = `DELETE FROM order_items WHERE order_id = ?`;
-        await safeDbUpdate(deleteItemsSql, [currentOrderId]);
-
-        // Insert new order items
-        for (const item of Object.values(selectedItems)) {
-            const insertItemSql = `INSERT INTO order_items (order_id, menu_item_id, quantity, price) VALUES (?, ?, ?, ?)`;
-            await safeDbUpdate(insertItemSql, [currentOrderId, item.id, item.qty, item.price]);
+        // One backend call recomputes total and balance and replaces the items
+        const result = await updateOrderOnServer(currentOrderId, {
+            items: orderItemsFromSelection(selectedItems),
+            discount_percentage: discountPercent,
+            order_note: orderNote,
+            amount_received: amountReceivedVal
+        });
+        if (!result.success) {
+            throw new Error(result.error || "Failed to update order");
         }
 
         if (typeof showAlertModal === 'function') {
@@ -843,9 +708,8 @@ async function markOrderComplete() {
     if (!sure) return;
 
     try {
-        const orderSql = `SELECT total FROM orders WHERE id = ?`;
-        const orders = await safeDbQuery(orderSql, [currentOrderId]);
-        if (!orders || orders.length === 0) {
+        const orders = await runNamedQuery("orders.total", { order_id: currentOrderId });
+        if (!Array.isArray(orders) || orders.length === 0) {
             if (typeof showAlertModal === 'function') {
                 await showAlertModal("Order not found");
             } else {
@@ -962,8 +826,10 @@ async function cancelOrder(orderId) {
     if (!confirmed) return;
 
     try {
-        const updateStatusSql = `UPDATE orders SET order_status = 'cancelled', payment_status = 'cancelled' WHERE id = ?`;
-        await safeDbUpdate(updateStatusSql, [orderId]);
+        const result = await runNamedQuery("orders.cancel", { order_id: orderId });
+        if (!result.success) {
+            throw new Error(result.error || "Failed to cancel order");
+        }
 
         if (typeof showAlertModal === 'function') {
             await showAlertModal("Order cancelled successfully!");
@@ -985,13 +851,69 @@ async function cancelOrder(orderId) {
     }
 }
 
-// Load all table orders into the table view
+// Row for one order in the table orders view
+function tableOrderRow(order) {
+    const tr = document.createElement("tr");
+    tr.style.backgroundColor = "white";
+    const date = new Date(order.created_at);
+    const dateStr = date.toLocaleDateString();
+    const timeStr = date.toLocaleTimeString('en-US', { hour: '2-digit', minute: '2-digit' });
+    const status = order.order_status || 'pending';
+    let statusClass = 'status-pending';
+    let statusText = 'Pending';
+    if (status === 'completed') {
+        statusClass = 'status-completed';
+        statusText = 'Completed';
+    } else if (status === 'cancelled') {
+        statusClass = 'status-cancelled';
+        statusText = 'Cancelled';
+    }
+
+    const paymentStatus = order.payment_status || 'pending';
+    let paymentStatusClass = 'status-pending';
+    let paymentStatusText = 'Pending';
+    if (paymentStatus === 'paid') {
+        paymentStatusClass = 'status-completed';
+        paymentStatusText = 'Paid';
+    } else if (paymentStatus === 'cancelled') {
+        paymentStatusClass = 'status-cancelled';
+        paymentStatusText = 'Cancelled';
+    }
+
+    // Only show edit button if order is not completed or cancelled
+    const canEdit = status !== 'completed' && status !== 'cancelled';
+    const canCancel = status !== 'completed' && status !== 'cancelled';
+
+    tr.innerHTML = `
+        <td>#${order.id}</td>
+        <td>Table ${order.table_number || '-'}</td>
+        <td>${dateStr} ${timeStr}</td>
+        <td>Rs. ${parseFloat(order.total || 0).toFixed(2)}</td>
+        <td><span class="${statusClass}">${statusText}</span></td>
+        <td><span class="${paymentStatusClass}">${paymentStatusText}</span></td>
+        <td>
+            ${canEdit ? `<button class="btn-warning" onclick="openTableOrderFromTable(${order.id})" style="padding: 5px 10px; font-size: 12px; margin-right: 5px;">Edit</button>` : ''}
+            ${canCancel ? `<button class="btn-danger" onclick="cancelOrder(${order.id})" style="padding: 5px 10px; font-size: 12px; background-color: #f44336; color: white; border: none; border-radius: 4px; cursor: pointer;" title="Cancel Order">✕</button>` : ''}
+        </td>
+    `;
+    return tr;
+}
+
+// Bumped on every load, so a reload stops a previous load that is still streaming
+let tableOrdersLoadId = 0;
+
+// Load all table orders into the table view.
+// Orders are streamed in chunks (streamQuery) and rendered as they arrive,
+// so a long history shows its newest orders straight away. Chunks use the
+// compact "rows" layout: value arrays in the SELECT's column order, so the
+// column names are not repeated for every order.
 async function loadTableOrdersTable() {
     if (!(window.dbBackend || dbBackend)) {
         console.error("Database backend not initialized");
         return;
     }
 
+    const loadId = ++tableOrdersLoadId;
     try {
         const sql = `
             SELECT id, table_number, total, created_at, order_status, payment_status
@@ -999,70 +921,32 @@ async function loadTableOrdersTable() {
             WHERE order_type = 'Table'
             ORDER BY created_at DESC
         `;
-        const orders = await safeDbQuery(sql);
 
         const tbody = document.getElementById("tableOrdersTableBody");
         if (!tbody) return;
 
         tbody.innerHTML = "";
+        let count = 0;
 
-        if (!orders || orders.length === 0) {
-            const tr = document.createElement("tr");
-            tr.innerHTML = '<td colspan="7" style="text-align: center; color: white; padding: 20px;">No table orders found</td>';
-            tbody.appendChild(tr);
-            return;
+        for await (const rows of streamQuery(sql, null, { layout: "rows" })) {
+            if (loadId !== tableOrdersLoadId) break;  // superseded by a newer load
+            const fragment = document.createDocumentFragment();
+            rows.forEach(([id, table_number, total, created_at, order_status, payment_status]) => {
+                fragment.appendChild(tableOrderRow({ id, table_number, total, created_at, order_status, payment_status }));
+            });
+            tbody.appendChild(fragment);
+            count += rows.length;
         }
 
-        orders.forEach(order => {
+        if (count === 0 && loadId === tableOrdersLoadId) {
             const tr = document.createElement("tr");
-            tr.style.backgroundColor = "white";
-            const date = new Date(order.created_at);
-            const dateStr = date.toLocaleDateString();
-            const timeStr = date.toLocaleTimeString('en-US', { hour: '2-digit', minute: '2-digit' });
-            const status = order.order_status || 'pending';
-            let statusClass = 'status-pending';
-            let statusText = 'Pending';
-            if (status === 'completed') {
-                statusClass = 'status-completed';
-                statusText = 'Completed';
-            } else if (status === 'cancelled') {
-                statusClass = 'status-cancelled';
-                statusText = 'Cancelled';
-            }
-
-            const paymentStatus = order.payment_status || 'pending';
-            let paymentStatusClass = 'status-pending';
-            let paymentStatusText = 'Pending';
-            if (paymentStatus === 'paid') {
-                paymentStatusClass = 'status-completed';
-                paymentStatusText = 'Paid';
-            } else if (paymentStatus === 'cancelled') {
-                paymentStatusClass = 'status-cancelled';
-                paymentStatusText = 'Cancelled';
-            }
-
-            // Only show edit button if order is not completed or cancelled
-            const canEdit = status !== 'completed' && status !== 'cancelled';
-            const canCancel = status !== 'completed' && status !== 'cancelled';
-
-            tr.innerHTML = `
-                <td>#${order.id}</td>
-                <td>Table ${order.table_number || '-'}</td>
-                <td>${dateStr} ${timeStr}</td>
-                <td>Rs. ${parseFloat(order.total || 0).toFixed(2)}</td>
-                <td><span class="${statusClass}">${statusText}</span></td>
-                <td><span class="${paymentStatusClass}">${paymentStatusText}</span></td>
-                <td>
-                    ${canEdit ? `<button class="btn-warning" onclick="openTableOrderFromTable(${order.id})" style="padding: 5px 10px; font-size: 12px; margin-right: 5px;">Edit</button>` : ''}
-                    ${canCancel ? `<button class="btn-danger" onclick="cancelOrder(${order.id})" style="padding: 5px 10px; font-size: 12px; background-color: #f44336; color: white; border: none; border-radius: 4px; cursor: pointer;" title="Cancel Order">✕</button>` : ''}
-                </td>
-            `;
+            tr.innerHTML = '<td colspan="7" style="text-align: center; color: white; padding: 20px;">No table orders found</td>';
             tbody.appendChild(tr);
-        });
+        }
     } catch (error) {
         console.error("Error loading table orders:", error);
         const tbody = document.getElementById("tableOrdersTableBody");
-        if (tbody) {
+        if (tbody && loadId === tableOrdersLoadId) {
             tbody.innerHTML = '<td colspan="7" style="text-align: center; color: #ff6b6b; padding: 20px;">Error loading orders</td>';
         }
     }
@@ -22,10 +22,10 @@ async function safeDbQuery(sql, params = null) {
         if (params && Array.isArray(params) && params.length > 0) {
             // Use parameterized query
             const paramsJson = JSON.stringify(params);
-            response = dbBackend.execute_with_params(sql, paramsJson);
+            response = dbCall(dbBackend, "execute_with_params", sql, paramsJson);
         } else {
             // Use direct query
-            response = dbBackend.execute_query(sql);
+            response = dbCall(dbBackend, "execute_query", sql);
         }
 
         // Handle Promise if returned
@@ -66,7 +66,7 @@ async function safeDbUpdate(sql, params) {
 
     try {
         const paramsJson = JSON.stringify(params);
-        let response = dbBackend.execute_with_params(sql, paramsJson);
+        let response = dbCall(dbBackend, "execute_with_params", sql, paramsJson);
 
         // Handle Promise if returned
         if (response && typeof response.then === 'function') {
@@ -114,8 +114,7 @@ async function loadMenuItems() {
     }
 
     try {
-        const sql = "SELECT id, name, category, price, is_available FROM menu_items WHERE is_available = 1 ORDER BY category, name";
-        const items = await safeDbQuery(sql);
+        const items = (await loadMenuCatalog()).filter(item => item.is_available === 1);
 
         if (!Array.isArray(items)) {
             console.error("Invalid menu items response:", items);
@@ -351,10 +350,10 @@ async function printReceiptDirect() {
         }
 
         const res = JSON.parse(result);
-        if (!res.success) throw new Error(res.error);
+        if (!res.success) throw new Error(printReplyError(res));
         
         if (typeof showAlertModal === 'function') {
-            await showAlertModal("Receipt printed successfully!");
+            await showAlertModal("Receipt sent to printer!");
         }
     } catch (e) {
         if (typeof showAlertModal === 'function') {
@@ -415,10 +414,10 @@ async function printReceiptNow() {
         }
 
         const res = JSON.parse(result);
-        if (!res.success) throw new Error(res.error);
+        if (!res.success) throw new Error(printReplyError(res));
         
         if (typeof showAlertModal === 'function') {
-            await showAlertModal("Receipt printed successfully!");
+            await showAlertModal("Receipt sent to printer!");
         }
     } catch (e) {
         if (typeof showAlertModal === 'function') {
@@ -448,12 +447,18 @@ async function saveOrder(orderType, total, discountPercent = 0) {
         const amountReceivedInput = document.getElementById("amountReceivedInput");
         const amountReceived = amountReceivedInput ? parseFloat(amountReceivedInput.value) : null;
         const amountReceivedVal = (amountReceived != null && !isNaN(amountReceived) && amountReceived > 0) ? amountReceived : null;
-        const balanceReturnVal = amountReceivedVal != null ? (amountReceivedVal - total) : null;
-        const now = new Date().toISOString();
-        const insertOrderSql = `INSERT INTO orders (order_type, total, discount_percentage, created_at, customer_name, order_status, payment_status, order_note, amount_received, balance_return) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`;
-        const result = await safeDbUpdate(insertOrderSql, [orderType, total, discountPercent, now, customerName, 'pending', 'pending', orderNote, amountReceivedVal, balanceReturnVal]);
 
-        console.log("Order insert result:", result);
+        // Write the order and all of its items in one backend call (one transaction)
+        const result = await placeOrder({
+            order_type: orderType,
+            items: orderItemsFromSelection(selectedItems),
+            discount_percentage: discountPercent,
+            customer_name: customerName,
+            order_note: orderNote,
+            amount_received: amountReceivedVal
+        });
+
+        console.log("Order placement result:", result);
 
         if (!result || result.success === false) {
             if (typeof showAlertModal === 'function') {
@@ -464,42 +469,7 @@ async function saveOrder(orderType, total, discountPercent = 0) {
             return;
         }
 
-        // Get order id from backend response - try multiple possible keys
-        let orderId = parseInt(result.last_insert_id || result.lastInsertId || result.id || 0);
-
-        console.log("Order ID from result:", orderId);
-        console.log("Full result:", JSON.stringify(result));
-
-        if (isNaN(orderId) || orderId <= 0) {
-            console.error("Invalid order ID:", orderId, "Full result:", JSON.stringify(result));
-            // Try fallback: query for the last inserted order
-            const lastOrderSql = "SELECT id FROM orders ORDER BY id DESC LIMIT 1";
-            const lastOrder = await safeDbQuery(lastOrderSql);
-            if (lastOrder && lastOrder.length > 0) {
-                const fallbackOrderId = parseInt(lastOrder[0].id);
-                console.log("Using fallback order ID:", fallbackOrderId);
-                if (!isNaN(fallbackOrderId) && fallbackOrderId > 0) {
-                    orderId = fallbackOrderId;
-                } else {
-                    if (typeof showAlertModal === 'function') {
-                        await showAlertModal("Error getting order ID. Please check console for details.");
-                    } else {
-                        alert("Error getting order ID. Please check console for details.");
-                    }
-                    return;
-                }
-            } else {
-                if (typeof showAlertModal === 'function') {
-                    await showAlertModal("Error getting order ID. Please check console for details.");
-                } else {
-                    alert("Error getting order ID. Please check console for details.");
-                }
-                return;
-            }
-        }
-
-        // Insert order items
-        await insertOrderItems(orderId);
+        const orderId = result.order_id;
 
         // Show print receipt popup (dark modal – always ask)
         const wantPrint = await showConfirmModal("Order placed successfully! Would you like to print the receipt?");
@@ -556,19 +526,6 @@ async function saveOrder(orderType, total, discountPercent = 0) {
     }
 }
 
-// Helper function to insert order items
-async function insertOrderItems(orderId) {
-    for (const item of Object.values(selectedItems)) {
-        const insertItemSql = `INSERT INTO order_items (order_id, menu_item_id, quantity, price) VALUES (?, ?, ?, ?)`;
-        const itemResult = await safeDbUpdate(insertItemSql, [orderId, item.id, item.qty, item.price]);
-
-        if (!itemResult || itemResult.success === false) {
-            console.error("Error inserting order item:", itemResult);
-            throw new Error("Failed to insert order item: " + (itemResult?.error || "Unknown error"));
-        }
-    }
-}
-
 document.addEventListener("DOMContentLoaded", () => {
     menuItemsContainer = document.getElementById("menuItems");
     totalAmountEl = document.getElementById("totalAmount");
@@ -669,21 +626,17 @@ document.addEventListener("DOMContentLoaded", () => {
     });
 });
 
-// Load and display all orders in the table
-async function loadTakeawayOrders() {
+// Load and display takeaway orders in the table, one page at a time (cursor: null for the newest page)
+async function loadTakeawayOrders(cursor = null) {
     if (!dbBackend) {
         console.error("Database backend not initialized");
         return;
     }
 
     try {
-        const sql = `
-            SELECT id, customer_name, total, created_at, order_status, payment_status
-            FROM orders
-            WHERE order_type = 'Takeaway'
-            ORDER BY created_at DESC
-        `;
-        const orders = await safeDbQuery(sql);
+        const page = await listOrders({ order_type: 'Takeaway' }, cursor);
+        const orders = page.orders;
+        renderOrdersPager("takeawayOrdersPager", page, loadTakeawayOrders);
 
         const tbody = document.getElementById("takeawayOrdersTableBody");
         if (!tbody) return;
@@ -744,10 +697,9 @@ async function openEditOrderModal(orderId) {
     currentOrderId = orderId;
     selectedItems = {};
 
-    // Load order details
-    const orderSql = `SELECT * FROM orders WHERE id = ?`;
-    const orders = await safeDbQuery(orderSql, [orderId]);
-    if (!orders || orders.length === 0) {
+    // Load order details and items in one call
+    const bundle = await getOrderBundle(orderId);
+    if (!bundle) {
         if (typeof showAlertModal === 'function') {
             await showAlertModal("Order not found");
         } else {
@@ -755,16 +707,8 @@ async function openEditOrderModal(orderId) {
         }
         return;
     }
-    const order = orders[0];
-
-    // Load order items
-    const orderItemsSql = `
-        SELECT oi.id, oi.menu_item_id, oi.quantity, oi.price, mi.name, mi.category
-        FROM order_items oi
-        JOIN menu_items mi ON oi.menu_item_id = mi.id
-        WHERE oi.order_id = ?
-    `;
-    const items = await safeDbQuery(orderItemsSql, [orderId]);
+    const order = bundle.order;
+    const items = bundle.items;
 
     // Populate selectedItems
     items.forEach(item => {
@@ -1089,9 +1033,8 @@ async function markOrderComplete() {
     if (!sure) return;
 
     try {
-        const orderSql = `SELECT total FROM orders WHERE id = ?`;
-        const orders = await safeDbQuery(orderSql, [currentOrderId]);
-        if (!orders || orders.length === 0) {
+        const orders = await runNamedQuery("orders.total", { order_id: currentOrderId });
+        if (!Array.isArray(orders) || orders.length === 0) {
             if (typeof showAlertModal === 'function') {
             await showAlertModal("Order not found");
         } else {
@@ -1193,8 +1136,10 @@ async function cancelOrder(orderId) {
     if (!confirmed) return;
 
     try {
-        const updateStatusSql = `UPDATE orders SET order_status = 'cancelled', payment_status = 'cancelled' WHERE id = ?`;
-        await safeDbUpdate(updateStatusSql, [orderId]);
+        const result = await runNamedQuery("orders.cancel", { order_id: orderId });
+        if (!result.success) {
+            throw new Error(result.error || "Failed to cancel order");
+        }
 
         if (typeof showAlertModal === 'function') {
             await showAlertModal("Order cancelled successfully!");
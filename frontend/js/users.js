@@ -28,9 +28,9 @@ async function safeDbQuery(sql, params = null) {
 
         if (params && Array.isArray(params) && params.length > 0) {
             const paramsJson = JSON.stringify(params);
-            response = dbBackend.execute_with_params(sql, paramsJson);
+            response = dbCall(dbBackend, "execute_with_params", sql, paramsJson);
         } else {
-            response = dbBackend.execute_query(sql);
+            response = dbCall(dbBackend, "execute_query", sql);
         }
 
         if (response && typeof response.then === 'function') {
@@ -67,7 +67,7 @@ async function safeDbUpdate(sql, params) {
 
     try {
         const paramsJson = JSON.stringify(params);
-        let response = dbBackend.execute_with_params(sql, paramsJson);
+        let response = dbCall(dbBackend, "execute_with_params", sql, paramsJson);
 
         if (response && typeof response.then === 'function') {
             response = await response;
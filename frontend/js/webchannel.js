@@ -31,7 +31,11 @@
             // Assign to window (global scope)
             window.menuBackend = channel.objects.menuBackend;
             window.dbBackend = channel.objects.dbBackend;
+            window.orderBackend = channel.objects.orderBackend;
+            window.financeBackend = channel.objects.financeBackend;
             window.printerBackend = channel.objects.printerBackend;
+            window.receiptBackend = channel.objects.receiptBackend;
+            window.exportBackend = channel.objects.exportBackend;
 
             // Also assign to global variables for backward compatibility (only if not already declared)
             if (typeof menuBackend === 'undefined') {
@@ -51,7 +55,11 @@
             console.log("[WebChannel] Available backends:", {
                 menuBackend: !!window.menuBackend,
                 dbBackend: !!window.dbBackend,
-                printerBackend: !!window.printerBackend
+                orderBackend: !!window.orderBackend,
+                financeBackend: !!window.financeBackend,
+                printerBackend: !!window.printerBackend,
+                receiptBackend: !!window.receiptBackend,
+                exportBackend: !!window.exportBackend
             });
 
             // Dispatch custom event to notify other scripts
@@ -59,7 +67,11 @@
                 detail: {
                     menuBackend: window.menuBackend,
                     dbBackend: window.dbBackend,
-                    printerBackend: window.printerBackend
+                    orderBackend: window.orderBackend,
+                    financeBackend: window.financeBackend,
+                    printerBackend: window.printerBackend,
+                    receiptBackend: window.receiptBackend,
+                    exportBackend: window.exportBackend
                 }
             }));
         });
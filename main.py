@@ -4,6 +4,11 @@ from PyQt6.QtGui import QIcon
 from pathlib import Path
 
 from views.main_window import MainWindow
+from database.cursors import cursor_registry
+from database.db import close_connections
+from database.executor import db_executor
+from database.group_commit import group_writer
+from database.query_cache import result_cache
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -23,4 +28,13 @@ with open(BASE_DIR / "assets" / "styles.qss", "r") as f:
 main_window = MainWindow()
 main_window.show()
 
+# Flush queued receipts, stop a running export, finish reads and writes, then release open cursors, the query cache's compile connections and pooled database connections on exit
+app.aboutToQuit.connect(main_window.printer_backend.shutdown)
+app.aboutToQuit.connect(main_window.export_backend.shutdown)
+app.aboutToQuit.connect(db_executor.shutdown)
+app.aboutToQuit.connect(group_writer.stop)
+app.aboutToQuit.connect(cursor_registry.close_all)
+app.aboutToQuit.connect(result_cache.close)
+app.aboutToQuit.connect(close_connections)
+
 sys.exit(app.exec())
@@ -0,0 +1,43 @@
+"""
+Every query the frontend ships must reach orders and order_items through an
+index: SQL literals in frontend/js, the named-query registry and the
+statements the backends compose (see benchmarks/check_query_plans.py).
+
+Run: python -m pytest tests
+"""
+import pytest
+
+from benchmarks import check_query_plans as plans
+from database import db
+
+QUERIES = plans.frontend_queries()
+
+
+@pytest.fixture(scope="module")
+def conn(tmp_path_factory):
+    previous = db.DB_PATH
+    db.set_database_path(tmp_path_factory.mktemp("plans") / "plans.db")
+    try:
+        with db.connection() as conn:
+            yield conn
+    finally:
+        db.set_database_path(previous)
+
+
+def test_page_sql_is_found():
+    origins = {origin for origin, _, _ in plans.page_queries()}
+    assert any(origin.startswith("table_orders.js:") for origin in origins)
+    assert any(origin.startswith("dashboard.js:") for origin in origins)
+
+
+@pytest.mark.parametrize("origin, sql, params", QUERIES, ids=[origin for origin, _, _ in QUERIES])
+def test_no_full_scan(conn, origin, sql, params):
+    scans = plans.check(conn, sql, params)
+    if scans and origin in plans.ALLOWED_SCANS:
+        pytest.skip(plans.ALLOWED_SCANS[origin])
+    assert not scans, f"{origin} scans {', '.join(scans)}"
+
+
+def test_full_scan_is_detected(conn):
+    assert plans.check(conn, "SELECT id FROM orders WHERE customer_name = ?", ["x"])
+    assert plans.check(conn, "SELECT oi.* FROM order_items oi WHERE oi.quantity > ?", [1])
@@ -0,0 +1,278 @@
+"""
+ESC/POS helpers for the receipt printer.
+
+logo_raster() turns a logo image into a GS v 0 raster command using bulk
+Pillow operations (no per-pixel Python loop). Results are cached in memory
+and on disk, keyed by logo path, modification time, width and dither mode,
+so only the first print after the logo changes pays for the conversion.
+
+LogoStore can instead keep the logo in the printer's own graphics memory
+(GS ( L download or NV graphics), so later receipts recall it with a short
+command rather than streaming the whole raster every time.
+"""
+import hashlib
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+GS_V_0 = b"\x1D\x76\x30\x00"  # GS v 0, normal density
+
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "cravehub_escpos"
+
+# Maps gray levels to "ink": 255 where the legacy threshold printed black (p < 128)
+_INK_TABLE = [255] * 128 + [0] * 128
+
+_memory_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _load_grayscale(image_path, width):
+    """Opens the image, flattens transparency onto white and resizes to width (LANCZOS)"""
+    with Image.open(image_path) as img:
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            img = img.convert("RGBA")
+            bg = Image.new("RGB", img.size, (255, 255, 255))
+            bg.paste(img, mask=img.split()[3])
+            img = bg
+        img = img.convert("L")
+
+    w, h = img.size
+    height = max(1, int(h * width / w))
+    try:
+        return img.resize((width, height), Image.Resampling.LANCZOS)
+    except AttributeError:
+        return img.resize((width, height), Image.LANCZOS)
+
+
+def _to_ink_bitmap(gray, dither):
+    """
+    Mode "1" image where a set bit means a printed (black) dot, which is what
+    GS v 0 expects. Row padding bits stay clear, i.e. unprinted.
+    """
+    if dither:
+        # Floyd-Steinberg on the inverted image, so dark areas become set bits
+        return ImageOps.invert(gray).convert("1", dither=Image.Dither.FLOYDSTEINBERG)
+    return gray.point(_INK_TABLE).convert("1", dither=Image.Dither.NONE)
+
+
+def bitmap_to_raster(bitmap):
+    """GS v 0 command for a mode "1" ink bitmap (set bit = black dot)"""
+    width, height = bitmap.size
+    bytes_per_row = (width + 7) // 8
+    header = bytes([
+        bytes_per_row & 0xFF, (bytes_per_row >> 8) & 0xFF,
+        height & 0xFF, (height >> 8) & 0xFF,
+    ])
+    # Mode "1" tobytes() packs 8 pixels per byte, MSB first, rows padded to a byte
+    return GS_V_0 + header + bitmap.tobytes()
+
+
+def _is_raster(data):
+    """True if data is a complete GS v 0 command (guards against torn cache files)"""
+    if len(data) < 8 or data[:4] != GS_V_0:
+        return False
+    bytes_per_row = data[4] | (data[5] << 8)
+    height = data[6] | (data[7] << 8)
+    return len(data) == 8 + bytes_per_row * height
+
+
+def render_logo_raster(image_path, width, dither=False):
+    """Converts an image to a GS v 0 raster command (uncached)"""
+    return bitmap_to_raster(_to_ink_bitmap(_load_grayscale(image_path, width), dither))
+
+
+def _cache_key(image_path, width, dither):
+    path = Path(image_path).resolve()
+    stat = path.stat()
+    return (str(path), stat.st_mtime_ns, stat.st_size, int(width), bool(dither))
+
+
+def logo_raster(image_path, width, dither=False, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    GS v 0 raster for a logo, from the in-memory cache, the on-disk cache
+    (cache_dir, None to disable) or a fresh conversion, in that order.
+    """
+    key = _cache_key(image_path, width, dither)
+    with _cache_lock:
+        data = _memory_cache.get(key)
+    if data is not None:
+        return data
+
+    cache_file = None
+    if cache_dir is not None:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        cache_file = Path(cache_dir) / f"logo_{digest}.bin"
+        try:
+            data = cache_file.read_bytes()
+        except OSError:
+            data = None
+        if data is not None and not _is_raster(data):
+            data = None
+
+    if data is None:
+        data = render_logo_raster(image_path, width, dither)
+        if cache_file is not None:
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cache_file.with_suffix(".tmp")
+                tmp.write_bytes(data)
+                tmp.replace(cache_file)
+            except OSError:
+                pass  # the disk cache is an optimisation only
+
+    with _cache_lock:
+        _memory_cache[key] = data
+    return data
+
+
+def clear_logo_cache():
+    """Drops the in-memory cache (the disk cache is keyed by mtime and self-invalidates)"""
+    with _cache_lock:
+        _memory_cache.clear()
+
+
+# --------------------------------------------------
+# Receipt stream
+# --------------------------------------------------
+ESC_INIT = b"\x1B\x40"           # ESC @ (reset)
+ESC_DEFAULT_SPACING = b"\x1B\x32"  # ESC 2 = default line spacing
+ESC_ALIGN_LEFT = b"\x1B\x61\x00"
+GS_FULL_CUT = b"\x1D\x56\x41\x10"
+
+
+def receipt_bytes(text, logo=b""):
+    """
+    The complete byte stream for one receipt: reset, optional logo commands,
+    the text (cp437) and a feed + cut. Do not set GS W (width) or GS L (margin);
+    the printer's default full width is used.
+    """
+    stream = bytearray(ESC_INIT + ESC_DEFAULT_SPACING + ESC_ALIGN_LEFT)
+    if logo:
+        stream += logo + b"\n\n"
+    stream += text.encode("cp437", errors="replace")
+    stream += b"\n\n\n\n\n"  # extra feed so the bottom isn't cut off
+    stream += ESC_DEFAULT_SPACING + GS_FULL_CUT
+    return bytes(stream)
+
+
+# --------------------------------------------------
+# Graphics stored in the printer (GS ( L)
+# --------------------------------------------------
+LOGO_KEY = b"CH"  # key code (two bytes, 32-126) of the stored receipt logo
+
+# GS ( L function numbers
+_FN_DEFINE_NV = 67
+_FN_PRINT_NV = 69
+_FN_DEFINE_DOWNLOAD = 83
+_FN_PRINT_DOWNLOAD = 85
+
+
+def _graphics_command(fn, payload):
+    """GS ( L, or GS 8 L when the parameters exceed the 16-bit length field"""
+    body = bytes([48, fn]) + payload  # m = 48
+    if len(body) <= 0xFFFF:
+        return b"\x1D\x28\x4C" + len(body).to_bytes(2, "little") + body
+    return b"\x1D\x38\x4C" + len(body).to_bytes(4, "little") + body
+
+
+def _define_graphics(fn, raster, key):
+    """Define command carrying the bitmap of a GS v 0 raster (same row layout)"""
+    bytes_per_row = raster[4] | (raster[5] << 8)
+    height = raster[6] | (raster[7] << 8)
+    width = bytes_per_row * 8
+    payload = (
+        bytes([48]) + key + bytes([1])  # a = 48 (raster), kc1 kc2, b = 1 colour
+        + width.to_bytes(2, "little") + height.to_bytes(2, "little")
+        + bytes([49])  # c = 49 (colour 1)
+        + raster[8:]
+    )
+    return _graphics_command(fn, payload)
+
+
+def define_nv_graphics(raster, key=LOGO_KEY):
+    return _define_graphics(_FN_DEFINE_NV, raster, key)
+
+
+def print_nv_graphics(key=LOGO_KEY):
+    return _graphics_command(_FN_PRINT_NV, key + b"\x01\x01")  # normal size
+
+
+def define_download_graphics(raster, key=LOGO_KEY):
+    return _define_graphics(_FN_DEFINE_DOWNLOAD, raster, key)
+
+
+def print_download_graphics(key=LOGO_KEY):
+    return _graphics_command(_FN_PRINT_DOWNLOAD, key + b"\x01\x01")
+
+
+LOGO_STORAGE_MODES = ("raster", "download", "nv")
+
+
+class LogoStore:
+    """
+    Chooses the logo commands for each receipt:
+    - "raster": stream the GS v 0 raster every time (works on every printer)
+    - "download": upload once per session into volatile download graphics
+      memory, then recall by key (re-uploaded after an app restart)
+    - "nv": upload once per printer into NV graphics memory, then recall by
+      key; uploads are remembered in state_file across restarts, since NV
+      memory survives power cycles and has limited write endurance
+    A printer is re-uploaded whenever the logo raster changes.
+    """
+
+    def __init__(self, mode="raster", state_file=None):
+        if mode not in LOGO_STORAGE_MODES:
+            raise ValueError(f"Unknown logo storage mode: {mode}")
+        self.mode = mode
+        self.state_file = Path(state_file) if state_file else None
+        self._lock = threading.Lock()
+        self._uploaded = self._load_state() if mode == "nv" else {}
+
+    def _load_state(self):
+        if not self.state_file:
+            return {}
+        try:
+            return json.loads(self.state_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            self.state_file.write_text(json.dumps(self._uploaded), encoding="utf-8")
+        except OSError:
+            pass
+
+    def logo_commands(self, printer_name, raster):
+        """Bytes to send for the logo on this receipt"""
+        if self.mode == "raster":
+            return raster
+
+        digest = hashlib.sha1(raster).hexdigest()
+        if self.mode == "nv":
+            define, recall = define_nv_graphics, print_nv_graphics
+        else:
+            define, recall = define_download_graphics, print_download_graphics
+
+        with self._lock:
+            if self._uploaded.get(printer_name) == digest:
+                return recall()
+            self._uploaded[printer_name] = digest
+            if self.mode == "nv":
+                self._save_state()
+        return define(raster) + recall()
+
+    def forget(self, printer_name=None):
+        """Forces a re-upload to one printer (or all), e.g. after swapping printers"""
+        with self._lock:
+            if printer_name is None:
+                self._uploaded.clear()
+            else:
+                self._uploaded.pop(printer_name, None)
+            if self.mode == "nv":
+                self._save_state()
@@ -0,0 +1,199 @@
+"""
+Per-slot latency metrics and a slow-query log for the backends.
+
+Slots decorated with @instrumented are counted under their qualified name
+(e.g. "DatabaseBackend.execute_query"): calls, errors (an exception or an
+error reply), latency percentiles over the last SAMPLE_WINDOW calls, rows
+and bytes returned, and the time spent in each phase of the call. Code
+running inside a slot adds to the current call with phase(name) and
+add_rows(n); the database layer records "connect" (database.db.connection),
+"execute" (DatabaseBackend), "fetch" and "serialize"
+(database.result_format). Outside an instrumented call these are no-ops.
+
+statement(conn, sql, params) times one read statement; one slower than
+slow_query_ms (CRAVEHUB_SLOW_QUERY_MS, default 100) is logged to
+utils.logger and kept in the slow-query log together with its EXPLAIN
+QUERY PLAN. snapshot() returns everything as a dict (DatabaseBackend.get_metrics).
+"""
+import functools
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+SAMPLE_WINDOW = 1000
+SLOW_QUERY_LOG_SIZE = 50
+DEFAULT_SLOW_QUERY_MS = float(os.environ.get("CRAVEHUB_SLOW_QUERY_MS", "100"))
+
+_ERROR_PREFIXES = ('{"error"', '{"success": false')
+
+
+def _percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class _Call:
+    __slots__ = ("name", "phases", "rows", "reply")
+
+    def __init__(self, name):
+        self.name = name
+        self.phases = {}
+        self.rows = 0
+        self.reply = None  # the slot's return value, set by the caller
+
+
+class _SlotStats:
+    __slots__ = ("calls", "errors", "total", "max", "rows", "bytes", "phases", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.phases = {}
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        ms = lambda seconds: round(seconds * 1000, 3)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": ms(self.total / self.calls),
+            "max_ms": ms(self.max),
+            "p50_ms": ms(_percentile(ordered, 0.50)),
+            "p95_ms": ms(_percentile(ordered, 0.95)),
+            "p99_ms": ms(_percentile(ordered, 0.99)),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "phases_ms": {phase: ms(seconds) for phase, seconds in self.phases.items()},
+        }
+
+
+class Metrics:
+    def __init__(self, slow_query_ms=DEFAULT_SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._slow = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+        self._local = threading.local()
+
+    # -- recording -----------------------------------------------------------
+    @contextmanager
+    def call(self, name):
+        """
+        Times one slot call. Yields the _Call that phase() and add_rows() add
+        to; set its reply to the slot's JSON so bytes and error replies count.
+        """
+        outer = getattr(self._local, "call", None)
+        current = self._local.call = _Call(name)
+        start = time.perf_counter()
+        error = True
+        try:
+            yield current
+            error = isinstance(current.reply, str) and current.reply.startswith(_ERROR_PREFIXES)
+        finally:
+            self._local.call = outer
+            nbytes = len(current.reply) if isinstance(current.reply, str) else 0
+            self.observe(name, time.perf_counter() - start, current.rows, nbytes, error, current.phases)
+
+    def observe(self, name, seconds, rows=0, nbytes=0, error=False, phases=None):
+        """Adds one finished call to name's statistics"""
+        with self._lock:
+            stats = self._slots.get(name)
+            if stats is None:
+                stats = self._slots[name] = _SlotStats()
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.rows += rows
+            stats.bytes += nbytes
+            stats.samples.append(seconds)
+            for phase, spent in (phases or {}).items():
+                stats.phases[phase] = stats.phases.get(phase, 0.0) + spent
+
+    @contextmanager
+    def phase(self, name):
+        """Adds the block's time to phase name of the current call (if any)"""
+        current = getattr(self._local, "call", None)
+        if current is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            current.phases[name] = current.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def add_rows(self, count):
+        current = getattr(self._local, "call", None)
+        if current is not None:
+            current.rows += count
+
+    @contextmanager
+    def statement(self, conn, sql, params=()):
+        """Times one read statement run on conn; logs it with its plan if slow"""
+        start = time.perf_counter()
+        yield
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= self.slow_query_ms:
+            self._log_slow(conn, sql, params, elapsed_ms)
+
+    def _log_slow(self, conn, sql, params, elapsed_ms):
+        # Imported here: utils.logger opens cravehub.log when first imported
+        from utils.logger import logger
+
+        try:
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        except Exception as e:
+            plan = [f"(no plan: {e})"]
+        current = getattr(self._local, "call", None)
+        entry = {
+            "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "slot": current.name if current else None,
+            "ms": round(elapsed_ms, 3),
+            "sql": " ".join(sql.split()),
+            "params": params if isinstance(params, dict) else list(params),
+            "plan": plan,
+        }
+        with self._lock:
+            self._slow.append(entry)
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s | params %r | plan: %s",
+            elapsed_ms, entry["slot"], entry["sql"], entry["params"], "; ".join(plan),
+        )
+
+    # -- reporting -----------------------------------------------------------
+    def snapshot(self):
+        """{"slots": {name: {...}}, "slow_queries": [...], "slow_query_ms": threshold}"""
+        with self._lock:
+            slots = {name: stats.summary() for name, stats in sorted(self._slots.items())}
+            slow = list(self._slow)
+        return {"slots": slots, "slow_queries": slow, "slow_query_ms": self.slow_query_ms}
+
+    def reset(self):
+        with self._lock:
+            self._slots.clear()
+            self._slow.clear()
+
+
+metrics = Metrics()
+
+
+def instrumented(fn):
+    """Records a backend slot in metrics under its qualified name (apply below @pyqtSlot)"""
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with metrics.call(name) as call:
+            call.reply = fn(*args, **kwargs)
+            return call.reply
+
+    return wrapper
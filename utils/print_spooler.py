@@ -0,0 +1,121 @@
+"""
+Background print queue.
+
+PrintSpooler owns a worker thread and a bounded job queue in front of one
+printer transport. submit() returns immediately with a job id; the worker
+writes each job (one complete buffer, one transport write), retries failed
+writes with exponential backoff, and reports every status change through the
+on_status(job_id, status, error) callback, called on the worker thread.
+
+Statuses: queued, printing, retrying, done, failed.
+"""
+import itertools
+import queue
+import threading
+import time
+
+QUEUED = "queued"
+PRINTING = "printing"
+RETRYING = "retrying"
+DONE = "done"
+FAILED = "failed"
+
+
+class SpoolerFull(Exception):
+    """Raised by submit() when the job queue is at capacity"""
+
+
+class PrintSpooler:
+    def __init__(self, transport, maxsize=100, retries=3, backoff=0.5, max_backoff=8.0,
+                 on_status=None):
+        self.transport = transport
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.on_status = on_status
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._ids = itertools.count(1)
+        self._stopping = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="print-spooler", daemon=True)
+        self._worker.start()
+
+    def submit(self, data, job_id=None):
+        """Queues one job (bytes). Returns its id; raises SpoolerFull if the queue is full."""
+        if self._stopping.is_set():
+            raise RuntimeError("Print spooler is stopped")
+        job_id = job_id or f"job-{next(self._ids)}"
+        try:
+            self._queue.put_nowait((job_id, bytes(data)))
+        except queue.Full:
+            raise SpoolerFull(f"Print queue is full ({self._queue.maxsize} jobs waiting)")
+        self._report(job_id, QUEUED)
+        return job_id
+
+    def pending(self):
+        """Number of jobs not yet finished"""
+        return self._queue.unfinished_tasks
+
+    def join(self):
+        """Blocks until every submitted job is done or failed"""
+        self._queue.join()
+
+    def stop(self, timeout=5.0):
+        """
+        Finishes queued jobs (up to timeout) and stops the worker, which closes
+        the transport on its way out. Never blocks on a full queue: jobs that
+        have to be dropped to make room for the stop marker are reported failed.
+        """
+        self._stopping.set()
+        while True:
+            try:
+                self._queue.put_nowait((None, None))
+                break
+            except queue.Full:
+                self._drop_one()
+        self._worker.join(timeout)
+
+    def _drop_one(self):
+        try:
+            job_id, _ = self._queue.get_nowait()
+        except queue.Empty:
+            return
+        self._queue.task_done()
+        if job_id is not None:
+            self._report(job_id, FAILED, "Print spooler stopped")
+
+    def _report(self, job_id, status, error=None):
+        if self.on_status is not None:
+            try:
+                self.on_status(job_id, status, error)
+            except Exception as e:
+                print("Print status callback error:", e)
+
+    def _run(self):
+        try:
+            while True:
+                job_id, data = self._queue.get()
+                try:
+                    if job_id is None:
+                        return
+                    self._print(job_id, data)
+                finally:
+                    self._queue.task_done()
+        finally:
+            try:
+                self.transport.close()
+            except Exception as e:
+                print("Printer transport close error:", e)
+
+    def _print(self, job_id, data):
+        self._report(job_id, PRINTING)
+        for attempt in range(self.retries + 1):
+            try:
+                self.transport.write(data)
+                self._report(job_id, DONE)
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    self._report(job_id, FAILED, str(e))
+                    return
+                self._report(job_id, RETRYING, str(e))
+                time.sleep(min(self.backoff * (2 ** attempt), self.max_backoff))
@@ -0,0 +1,262 @@
+"""
+Printer transports: where the bytes of a receipt job go.
+
+Each transport takes one complete job per write() call. The print spooler
+calls write() from its worker thread, retries on error, and calls close()
+on shutdown. transport_from_uri() builds a transport from a printer URI:
+
+    win32:                    default Windows printer (RAW spooler)
+    win32:Printer Name        a named Windows printer
+    tcp://192.168.1.50:9100   network printer, raw TCP (port defaults to 9100);
+                              one persistent connection, add ?persistent=0 to
+                              connect per job or ?status=0 to skip DLE EOT probes
+    device:/dev/usb/lp0       USB/serial device file (device:COM3 on Windows)
+    file:///path/jobs.bin     append every job to a file
+    loopback:                 keep jobs in memory (tests and benchmarks)
+"""
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+RAW_PRINT_PORT = 9100
+
+DLE_EOT_PRINTER_STATUS = b"\x10\x04\x01"  # real-time printer status request
+
+
+class Transport:
+    """Base class: write(data) sends one job, close() releases resources"""
+
+    name = "transport"
+
+    def write(self, data):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class Win32SpoolerTransport(Transport):
+    """Windows print spooler, RAW datatype (one document per job)"""
+
+    def __init__(self, printer_name=None):
+        import win32print  # Windows only
+
+        self._win32print = win32print
+        self.printer_name = printer_name or win32print.GetDefaultPrinter()
+        self.name = f"win32:{self.printer_name}"
+
+    def write(self, data):
+        win32print = self._win32print
+        handle = win32print.OpenPrinter(self.printer_name)
+        try:
+            win32print.StartDocPrinter(handle, 1, ("CraveHub Receipt", None, "RAW"))
+            try:
+                win32print.StartPagePrinter(handle)
+                win32print.WritePrinter(handle, data)
+                win32print.EndPagePrinter(handle)
+            finally:
+                win32print.EndDocPrinter(handle)
+        finally:
+            win32print.ClosePrinter(handle)
+
+
+class TcpTransport(Transport):
+    """Raw TCP (JetDirect / port 9100); one connection per job"""
+
+    def __init__(self, host, port=RAW_PRINT_PORT, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.name = f"tcp://{host}:{port}"
+
+    def write(self, data):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            sock.sendall(data)
+
+
+class PersistentTcpTransport(Transport):
+    """
+    Raw TCP over one long-lived connection, so back-to-back receipts are
+    pipelined on the same socket without a connect per job.
+
+    Dead connections are detected by TCP keepalive, by checking for a closed
+    peer before each write and, after the link has been idle for idle_probe
+    seconds, by a DLE EOT status request the printer must answer within
+    status_timeout. A failed write reconnects and resends the job once, so a
+    receipt interrupted mid-send may print twice rather than not at all.
+    """
+
+    def __init__(self, host, port=RAW_PRINT_PORT, timeout=5.0, status_probe=True,
+                 idle_probe=10.0, status_timeout=1.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.status_probe = status_probe
+        self.idle_probe = idle_probe
+        self.status_timeout = status_timeout
+        self.name = f"tcp://{host}:{port}"
+        self.connects = 0
+        self._sock = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 5)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+        elif hasattr(socket, "SIO_KEEPALIVE_VALS"):
+            sock.ioctl(socket.SIO_KEEPALIVE_VALS, (1, 30000, 5000))  # Windows, in ms
+        self._sock = sock
+        self._last_used = time.monotonic()
+        self.connects += 1
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _peer_closed(self):
+        """Non-blocking check for EOF; also drains unsolicited status bytes"""
+        try:
+            self._sock.setblocking(False)
+            while True:
+                data = self._sock.recv(4096)
+                if not data:
+                    return True
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+        finally:
+            if self._sock is not None:
+                self._sock.settimeout(self.timeout)
+
+    def _printer_responds(self):
+        """Sends DLE EOT 1 and waits for the one-byte status reply"""
+        try:
+            self._sock.sendall(DLE_EOT_PRINTER_STATUS)
+            self._sock.settimeout(self.status_timeout)
+            return bool(self._sock.recv(1))
+        except OSError:
+            return False
+        finally:
+            if self._sock is not None:
+                self._sock.settimeout(self.timeout)
+
+    def _ensure_connected(self):
+        if self._sock is not None:
+            idle = time.monotonic() - self._last_used
+            if self._peer_closed() or (
+                self.status_probe and idle >= self.idle_probe and not self._printer_responds()
+            ):
+                self._disconnect()
+        if self._sock is None:
+            self._connect()
+        return self._sock
+
+    def write(self, data):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    self._ensure_connected().sendall(data)
+                    self._last_used = time.monotonic()
+                    return
+                except OSError:
+                    self._disconnect()
+                    if attempt:
+                        raise
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+
+class DeviceTransport(Transport):
+    """USB/serial printer exposed as a device file (e.g. /dev/usb/lp0, COM3)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = f"device:{path}"
+
+    def write(self, data):
+        with open(self.path, "wb", buffering=0) as device:
+            device.write(data)
+
+
+class FileTransport(Transport):
+    """Appends every job to a file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.name = f"file://{self.path}"
+
+    def write(self, data):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as sink:
+            sink.write(data)
+
+
+class LoopbackTransport(Transport):
+    """Keeps every job in memory"""
+
+    name = "loopback:"
+
+    def __init__(self):
+        self.jobs = []
+        self._lock = threading.Lock()
+
+    def write(self, data):
+        with self._lock:
+            self.jobs.append(bytes(data))
+
+
+def transport_from_uri(uri):
+    """Builds a transport from a printer URI (see the module docstring)"""
+    scheme, _, rest = uri.partition(":")
+    scheme = scheme.lower()
+
+    if scheme == "win32":
+        return Win32SpoolerTransport(rest or None)
+    if scheme == "tcp":
+        parsed = urlparse(uri)
+        if not parsed.hostname:
+            raise ValueError(f"Printer URI has no host: {uri}")
+        options = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        port = parsed.port or RAW_PRINT_PORT
+        if options.get("persistent", "1") == "0":
+            return TcpTransport(parsed.hostname, port)
+        return PersistentTcpTransport(
+            parsed.hostname, port, status_probe=options.get("status", "1") != "0"
+        )
+    if scheme == "device":
+        if not rest:
+            raise ValueError(f"Printer URI has no device path: {uri}")
+        return DeviceTransport(rest)
+    if scheme == "file":
+        path = unquote(urlparse(uri).path) if rest.startswith("//") else rest
+        if len(path) > 2 and path[0] == "/" and path[2] == ":":
+            path = path[1:]  # file:///C:/... on Windows
+        if not path:
+            raise ValueError(f"Printer URI has no file path: {uri}")
+        return FileTransport(path)
+    if scheme == "loopback":
+        return LoopbackTransport()
+    raise ValueError(f"Unsupported printer URI: {uri}")
+
+
+def default_printer_uri():
+    """The Windows default printer on Windows; no default elsewhere"""
+    return "win32:" if sys.platform == "win32" else None
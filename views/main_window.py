@@ -10,7 +10,11 @@ from PyQt6.QtGui import QIcon
 
 from controllers.menu_backend import MenuBackend
 from controllers.db_backend import DatabaseBackend
+from controllers.export_backend import ExportBackend
+from controllers.finance_backend import FinanceBackend
+from controllers.order_backend import OrderBackend
 from controllers.printer_backend import PrinterBackend
+from controllers.receipt_backend import ReceiptBackend
 
 
 def resource_path(relative_path: str) -> Path:
@@ -62,11 +66,19 @@ class MainWindow(QMainWindow):
 
         self.menu_backend = MenuBackend()
         self.db_backend = DatabaseBackend()
+        self.order_backend = OrderBackend()
+        self.finance_backend = FinanceBackend()
         self.printer_backend = PrinterBackend()
+        self.receipt_backend = ReceiptBackend()
+        self.export_backend = ExportBackend()
 
         self.channel.registerObject("menuBackend", self.menu_backend)
         self.channel.registerObject("dbBackend", self.db_backend)
+        self.channel.registerObject("orderBackend", self.order_backend)
+        self.channel.registerObject("financeBackend", self.finance_backend)
         self.channel.registerObject("printerBackend", self.printer_backend)
+        self.channel.registerObject("receiptBackend", self.receipt_backend)
+        self.channel.registerObject("exportBackend", self.export_backend)
 
         self.web.page().setWebChannel(self.channel)
 